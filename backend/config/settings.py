@@ -45,6 +45,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so it times the whole request (see users/middleware.py).
+    "users.middleware.ServerTimingMiddleware",
+    "users.middleware.QueryShapeMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -55,6 +58,23 @@ MIDDLEWARE = [
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
 
+# Share of the requests that get a Server-Timing header and a timing log line.
+SERVER_TIMING_SAMPLE_RATE = env.float("SERVER_TIMING_SAMPLE_RATE", default=0.1)
+# Per-route Prometheus metrics at /metrics (see users/metrics.py). With several
+# worker processes, point METRICS_DIR at a directory they share, emptied at each
+# start; each process writes its totals there every METRICS_FLUSH_INTERVAL seconds.
+# Scrapers must send "Authorization: Bearer <METRICS_TOKEN>"; without a token set,
+# /metrics answers 404.
+METRICS_ENABLED = env.bool("METRICS_ENABLED", default=True)
+METRICS_TOKEN = env.str("METRICS_TOKEN", default="")
+METRICS_DIR = env.str("METRICS_DIR", default="")
+METRICS_FLUSH_INTERVAL = env.float("METRICS_FLUSH_INTERVAL", default=5)
+# Warn about (or, with NPLUSONE_RAISE, fail) requests that run one query shape more
+# than NPLUSONE_THRESHOLD times, the mark of an N+1. For development and staging:
+# 0 turns the check off.
+NPLUSONE_THRESHOLD = env.int("NPLUSONE_THRESHOLD", default=10 if DEBUG else 0)
+NPLUSONE_RAISE = env.bool("NPLUSONE_RAISE", default=False)
+
 ROOT_URLCONF = "config.urls"
 
 TEMPLATES = [
@@ -73,6 +93,8 @@ TEMPLATES = [
 ]
 
 WSGI_APPLICATION = "config.wsgi.application"
+# The invitation event stream needs an ASGI server (e.g. `uvicorn config.asgi:application`).
+ASGI_APPLICATION = "config.asgi.application"
 
 # Database
 DATABASES = {"default": env.db()}
@@ -115,16 +137,71 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 MEDIA_URL = "/media/"
 MEDIA_ROOT = os.path.join(BASE_DIR, "media")
 
+# How users/media.py sends media files. Leave empty to stream them from Django, or
+# set "x-accel-redirect" (nginx, serving MEDIA_ROOT under MEDIA_OFFLOAD_PREFIX as an
+# internal location) or "x-sendfile" (Apache/lighttpd) to let the proxy send them.
+MEDIA_OFFLOAD = env("MEDIA_OFFLOAD", default="")
+MEDIA_OFFLOAD_PREFIX = env("MEDIA_OFFLOAD_PREFIX", default="/protected-media/")
+
+# Uploads are stored once per distinct content (see users/storage.py).
+STORAGES = {
+    "default": {"BACKEND": "users.storage.ContentAddressedStorage"},
+    "staticfiles": {
+        "BACKEND": "django.contrib.staticfiles.storage.StaticFilesStorage"
+    },
+}
+
+# Resumable uploads (see users/uploads.py). Partial files are kept outside MEDIA_ROOT
+# so they are never served, but on the same disk so finalizing is a cheap rename.
+UPLOAD_SESSIONS_ROOT = env(
+    "UPLOAD_SESSIONS_ROOT", default=os.path.join(BASE_DIR, "upload_sessions")
+)
+UPLOAD_MAX_SIZE = env.int("UPLOAD_MAX_SIZE", default=10 * 1024**3)  # 10 GB
+UPLOAD_CHUNK_MAX_SIZE = env.int("UPLOAD_CHUNK_MAX_SIZE", default=64 * 1024**2)  # 64 MB
+
 # CORS Configuration
 CORS_ALLOW_ALL_ORIGINS = True
 
 # Django REST Framework Configuration
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "users.authentication.CachedJWTAuthentication",
     )
 }
 
+# Verified access tokens are mapped to their user in a per-process LRU of this many
+# entries (see users/authentication.py). An entry lives until its token expires but
+# at most AUTH_CACHE_MAX_AGE seconds, the longest another worker may see a stale user.
+AUTH_CACHE_SIZE = env.int("AUTH_CACHE_SIZE", default=10000)
+AUTH_CACHE_MAX_AGE = env.int("AUTH_CACHE_MAX_AGE", default=300)
+
+# Revoked tokens are checked through a Bloom filter (see users/revocation.py),
+# rebuilt from the database every REVOCATION_FILTER_REFRESH seconds.
+REVOCATION_FILTER_REFRESH = env.int("REVOCATION_FILTER_REFRESH", default=30)
+REVOCATION_FILTER_ERROR_RATE = env.float("REVOCATION_FILTER_ERROR_RATE", default=0.01)
+
+# Delivers live invitation events to the SSE stream (see users/events.py).
+# The default broker only works within one process; point this at a shared
+# (e.g. Redis-backed) broker when running several ASGI workers.
+INVITATION_EVENT_BROKER = env(
+    "INVITATION_EVENT_BROKER", default="users.events.LocalBroker"
+)
+
+# The cache shared by all workers, e.g. "locmemcache://" (one process only),
+# "filecache:///var/tmp/studysquad" or "redis://127.0.0.1:6379/1".
+CACHES = {"default": env.cache("CACHE_URL", default="locmemcache://")}
+# Cached public pages (see users/response_cache.py) are served as-is for
+# RESPONSE_CACHE_FRESH seconds, then for up to RESPONSE_CACHE_STALE more seconds
+# while one request rebuilds them.
+RESPONSE_CACHE_FRESH = env.int("RESPONSE_CACHE_FRESH", default=60)
+RESPONSE_CACHE_STALE = env.int("RESPONSE_CACHE_STALE", default=300)
+
+# Background jobs (see users/tasks.py) run on this many threads per process.
+BACKGROUND_TASK_WORKERS = env.int("BACKGROUND_TASK_WORKERS", default=2)
+# Resized image variants (see users/images.py) are rendered in this many worker
+# processes, off the request threads. 0 renders them in the background thread itself.
+IMAGE_VARIANT_WORKERS = env.int("IMAGE_VARIANT_WORKERS", default=2)
+
 # --- Simple JWT Configuration ---
 # This is where we control how long our login sessions last.
 SIMPLE_JWT = {
@@ -155,7 +232,8 @@ SIMPLE_JWT = {
     "USER_ID_CLAIM": "user_id",
     "USER_AUTHENTICATION_RULE": "rest_framework_simplejwt.authentication.default_user_authentication_rule",
 
-    "AUTH_TOKEN_CLASSES": ("rest_framework_simplejwt.tokens.AccessToken",),
+    # These also reject tokens revoked on logout (see users/revocation.py).
+    "AUTH_TOKEN_CLASSES": ("users.tokens.RevocableAccessToken",),
     "TOKEN_TYPE_CLAIM": "token_type",
     "TOKEN_USER_CLASS": "rest_framework_simplejwt.models.TokenUser",
 
@@ -166,7 +244,7 @@ SIMPLE_JWT = {
     "SLIDING_TOKEN_REFRESH_LIFETIME": timedelta(days=1),
 
     "TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainPairSerializer",
-    "TOKEN_REFRESH_SERIALIZER": "rest_framework_simplejwt.serializers.TokenRefreshSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "users.tokens.RevocableTokenRefreshSerializer",
     "TOKEN_VERIFY_SERIALIZER": "rest_framework_simplejwt.serializers.TokenVerifySerializer",
     "TOKEN_BLACKLIST_SERIALIZER": "rest_framework_simplejwt.serializers.TokenBlacklistSerializer",
     "SLIDING_TOKEN_OBTAIN_SERIALIZER": "rest_framework_simplejwt.serializers.TokenObtainSlidingSerializer",
@@ -16,14 +16,17 @@ Including another URLconf
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
 
+import re
+
 from django.contrib import admin
-from django.urls import path, include
+from django.urls import path, include, re_path
 from django.conf import settings
-from django.conf.urls.static import static
 from rest_framework_simplejwt.views import (
     TokenObtainPairView,
     TokenRefreshView,
 )
+from users.media import serve_media
+from users.metrics import metrics_view
 
 urlpatterns = [
     path("admin/", admin.site.urls),
@@ -32,6 +35,12 @@ urlpatterns = [
     # --- TWO URLS FOR TOKEN AUTHENTICATION ---
     path("api/token/", TokenObtainPairView.as_view(), name="token_obtain_pair"),
     path("api/token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    # Per-route request metrics for Prometheus (see users/metrics.py)
+    path("metrics", metrics_view, name="metrics"),
+    # Uploaded files, with Range support (see users/media.py)
+    re_path(
+        r"^%s(?P<path>.*)$" % re.escape(settings.MEDIA_URL.lstrip("/")),
+        serve_media,
+        name="media",
+    ),
 ]
-
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
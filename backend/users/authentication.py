@@ -0,0 +1,146 @@
+# backend/users/authentication.py
+"""
+JWT authentication that doesn't query the database on every request.
+
+simplejwt's JWTAuthentication verifies the token (cheap, in memory) and then loads
+the User row. CachedJWTAuthentication still verifies every token, but keeps the
+user it found in a bounded, per-process LRU keyed by the token's `jti`, so later
+requests with the same token get their request.user without a query.
+
+Each entry is a snapshot of the User's fields plus the IDs views keep looking up:
+the request.user we build from it has `profile_id`, `studio_id` and `is_teacher`
+set. Entries live until the token expires, and no longer than AUTH_CACHE_MAX_AGE
+seconds, which bounds how long another process can serve a snapshot that changed
+after that process cached it. In this process, the signal handlers in signals.py
+drop a user's entries as soon as the user, their profile or their studio changes.
+"""
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db.models import F
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import Studio
+
+UserSnapshot = namedtuple(
+    "UserSnapshot", ["user_id", "db", "values", "profile_id", "studio_id", "expires_at"]
+)
+
+
+def _user_fields():
+    return [field.attname for field in User._meta.concrete_fields]
+
+
+class SnapshotCache:
+    """A thread-safe LRU of UserSnapshots by token `jti`."""
+
+    def __init__(self, max_size):
+        self.max_size = max_size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, jti):
+        with self._lock:
+            snapshot = self._entries.get(jti)
+            if snapshot is None:
+                return None
+            if snapshot.expires_at <= time.time():
+                del self._entries[jti]
+                return None
+            self._entries.move_to_end(jti)
+            return snapshot
+
+    def put(self, jti, snapshot):
+        with self._lock:
+            self._entries[jti] = snapshot
+            self._entries.move_to_end(jti)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def forget_user(self, user_id):
+        """Drops every cached token of a user (e.g. after their profile changed)."""
+        with self._lock:
+            stale = [
+                jti
+                for jti, snapshot in self._entries.items()
+                if snapshot.user_id == user_id
+            ]
+            for jti in stale:
+                del self._entries[jti]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+snapshots = SnapshotCache(settings.AUTH_CACHE_SIZE)
+
+
+class CachedJWTAuthentication(JWTAuthentication):
+    def get_user(self, validated_token):
+        jti = validated_token.get(api_settings.JTI_CLAIM)
+        if jti is None:
+            return super().get_user(validated_token)
+
+        snapshot = snapshots.get(jti)
+        if snapshot is None:
+            snapshot = self.take_snapshot(validated_token)
+            snapshots.put(jti, snapshot)
+        return self.user_from_snapshot(snapshot)
+
+    def take_snapshot(self, validated_token):
+        """Loads the token's user, with their profile and studio IDs, in one query."""
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken("Token contained no recognizable user identification")
+
+        fields = _user_fields()
+        row = (
+            User.objects.filter(**{api_settings.USER_ID_FIELD: user_id})
+            .annotate(_profile_id=F("profile__id"), _studio_id=F("studio__id"))
+            .values_list(*fields, "_profile_id", "_studio_id")
+            .first()
+        )
+        if row is None:
+            raise AuthenticationFailed("User not found", code="user_not_found")
+        values = dict(zip(fields, row))
+        if not values["is_active"]:
+            raise AuthenticationFailed("User is inactive", code="user_inactive")
+
+        expires_at = min(
+            validated_token["exp"], time.time() + settings.AUTH_CACHE_MAX_AGE
+        )
+        return UserSnapshot(
+            user_id=values["id"],
+            db=User.objects.db,
+            values=tuple(row[: len(fields)]),
+            profile_id=row[-2],
+            studio_id=row[-1],
+            expires_at=expires_at,
+        )
+
+    def user_from_snapshot(self, snapshot):
+        # A new instance per request: views may change request.user. Its fields
+        # can be AUTH_CACHE_MAX_AGE seconds old, though, so code that saves a user
+        # loads a fresh row or passes update_fields.
+        user = User.from_db(snapshot.db, _user_fields(), snapshot.values)
+        user.profile_id = snapshot.profile_id
+        user.studio_id = snapshot.studio_id
+        user.is_teacher = snapshot.studio_id is not None
+        return user
+
+
+def studio_id_of(user):
+    """
+    Returns the ID of the user's studio, or None if they have none. It comes from
+    the authentication snapshot when there is one, so it usually costs no query.
+    """
+    if hasattr(user, "studio_id"):
+        return user.studio_id
+    return Studio.objects.filter(owner=user).values_list("id", flat=True).first()
@@ -0,0 +1,114 @@
+# backend/users/cleanup.py
+"""
+Finds files in MEDIA_ROOT that no model points at any more: pictures and lesson
+files that were replaced, or left behind by deleted accounts, studios and lessons.
+Used by the collect_orphaned_media command.
+
+A file is referenced when a FileField/ImageField stores its name, when it is the
+field's default, or when it is a variant of a current image (see images.py).
+Files younger than the grace period are always kept, so uploads that are saved
+but not yet committed (or blobs being reused, see storage.py) are never collected.
+"""
+import os
+import shutil
+
+from django.apps import apps
+from django.conf import settings
+from django.db import models, transaction
+
+from . import images
+from .models import MediaBlob
+from .storage import BLOB_DIR
+
+CHUNK_SIZE = 2000
+
+
+def _file_fields():
+    for model in apps.get_models():
+        for field in model._meta.concrete_fields:
+            if isinstance(field, models.FileField):
+                yield model, field
+
+
+def referenced_names():
+    """Returns the set of every file name (relative to MEDIA_ROOT) still in use."""
+    names = set()
+    for model, field in _file_fields():
+        if isinstance(field.default, str):
+            names.add(field.default)
+        names.update(
+            model._base_manager.exclude(**{field.attname: ""})
+            .exclude(**{f"{field.attname}__isnull": True})
+            .values_list(field.attname, flat=True)
+            .iterator(chunk_size=CHUNK_SIZE)
+        )
+
+    for label, field_names in images.IMAGE_FIELDS.items():
+        model = apps.get_model(label)
+        for field_name in field_names:
+            rows = model._base_manager.values_list(
+                field_name, f"{field_name}_variants"
+            ).iterator(chunk_size=CHUNK_SIZE)
+            for name, variants in rows:
+                # Variants of an image that was since replaced are orphans too.
+                if variants and variants.get("source") == name:
+                    for formats in variants.get("sizes", {}).values():
+                        names.update(formats.values())
+    return names
+
+
+def _walk(directory, skip):
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                if os.path.realpath(entry.path) not in skip:
+                    yield from _walk(entry.path, skip)
+            elif entry.is_file(follow_symlinks=False):
+                yield entry
+
+
+def find_orphans(referenced, older_than, root=None, skip=()):
+    """
+    Yields (name, path, size) for every file under `root` (MEDIA_ROOT by default)
+    whose name is not in `referenced` and that was last modified before the
+    `older_than` timestamp. Directories in `skip` are not walked.
+    """
+    root = root or settings.MEDIA_ROOT
+    skip = {os.path.realpath(path) for path in skip}
+    # Partial uploads live there if it was configured inside MEDIA_ROOT.
+    skip.add(os.path.realpath(settings.UPLOAD_SESSIONS_ROOT))
+    for entry in _walk(root, skip):
+        name = os.path.relpath(entry.path, root).replace(os.sep, "/")
+        info = entry.stat(follow_symlinks=False)
+        if name not in referenced and info.st_mtime < older_than:
+            yield name, entry.path, info.st_size
+
+
+def _remove(name, path, quarantine):
+    if quarantine:
+        target = os.path.join(quarantine, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(path, target)
+    else:
+        os.remove(path)
+
+
+def remove_orphan(name, path, quarantine=None, older_than=None):
+    """
+    Deletes an orphaned file, or moves it under `quarantine` keeping its name.
+    Returns False if the file was kept because it was saved again since it was
+    found (modified after `older_than`).
+    """
+    if not name.startswith(f"{BLOB_DIR}/"):
+        _remove(name, path, quarantine)
+        return True
+    # A blob may be saved again at any moment: hold its row, which storage._save()
+    # locks too, while checking it is still stale and removing it.
+    with transaction.atomic():
+        blob = MediaBlob.objects.select_for_update().filter(name=name).first()
+        if older_than is not None and os.stat(path).st_mtime >= older_than:
+            return False
+        _remove(name, path, quarantine)
+        if blob is not None:
+            blob.delete()
+    return True
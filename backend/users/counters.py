@@ -0,0 +1,180 @@
+# backend/users/counters.py
+"""
+Keeps the denormalized counters in sync with the rows they count: the Studio
+counters (subscribers_count, rating_sum, rating_count and the per-star
+rating_N_count fields) and the likes_count of posts and comments.
+
+Every helper changes the rows and the counters in the same transaction and only
+touches the counters with F() expressions, so concurrent requests can't overwrite
+each other's updates.
+"""
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+from . import response_cache
+from .models import Comment, Post, Studio, StudioRating
+
+STARS = [1, 2, 3, 4, 5]
+
+
+def add_subscriber(studio, user):
+    """
+    Subscribes `user` to `studio`. Returns False if they were already subscribed.
+    """
+    with transaction.atomic():
+        try:
+            # The inner atomic() is a savepoint, so a duplicate doesn't break the outer transaction.
+            with transaction.atomic():
+                Studio.subscribers.through.objects.create(studio=studio, user=user)
+        except IntegrityError:
+            return False
+        Studio.objects.filter(pk=studio.pk).update(
+            subscribers_count=F("subscribers_count") + 1
+        )
+        response_cache.bump("users.Studio", studio.pk)
+    return True
+
+
+def remove_subscriber(studio, user):
+    """
+    Unsubscribes `user` from `studio`. Returns False if they weren't subscribed.
+    """
+    with transaction.atomic():
+        removed, _ = Studio.subscribers.through.objects.filter(
+            studio=studio, user=user
+        ).delete()
+        if removed:
+            Studio.objects.filter(pk=studio.pk).update(
+                subscribers_count=F("subscribers_count") - removed
+            )
+            response_cache.bump("users.Studio", studio.pk)
+    return bool(removed)
+
+
+def rate(studio, user, value):
+    """
+    Creates or updates the rating of `user` for `studio`. Returns True if it was created.
+    """
+    with transaction.atomic():
+        # Locking the studio row makes concurrent ratings of the same studio apply one
+        # at a time, so `previous` can't change under our feet.
+        list(Studio.objects.select_for_update().filter(pk=studio.pk).values_list("pk"))
+        previous = (
+            StudioRating.objects.filter(studio=studio, user=user)
+            .values_list("rating", flat=True)
+            .first()
+        )
+        _, created = StudioRating.objects.update_or_create(
+            studio=studio, user=user, defaults={"rating": value}
+        )
+
+        changes = {}
+        if previous not in STARS:
+            # A new rating, or a legacy row (e.g. the default 0) the counters skip,
+            # as rebuild_counters() does.
+            changes["rating_sum"] = F("rating_sum") + value
+            changes["rating_count"] = F("rating_count") + 1
+            changes[f"rating_{value}_count"] = F(f"rating_{value}_count") + 1
+        elif previous != value:
+            changes["rating_sum"] = F("rating_sum") + (value - previous)
+            changes[f"rating_{previous}_count"] = F(f"rating_{previous}_count") - 1
+            changes[f"rating_{value}_count"] = F(f"rating_{value}_count") + 1
+        if changes:
+            Studio.objects.filter(pk=studio.pk).update(**changes)
+    return created
+
+
+def toggle_like(obj, user):
+    """
+    Likes or unlikes a Post or Comment for `user`.
+    Returns (liked, likes_count) with the stored count after the toggle.
+    """
+    model = type(obj)
+    through = model.likes.through
+    column = model.likes.field.m2m_field_name()
+    with transaction.atomic():
+        # Deleting first doubles as the existence check, through the unique (obj, user) index.
+        removed, _ = through.objects.filter(**{column: obj.pk}, user=user).delete()
+        if removed:
+            liked, delta = False, -removed
+        else:
+            try:
+                with transaction.atomic():
+                    through.objects.create(**{column: obj}, user=user)
+                liked, delta = True, 1
+            except IntegrityError:
+                # A concurrent request of the same user liked it first.
+                liked, delta = True, 0
+        rows = model.objects.filter(pk=obj.pk)
+        if delta:
+            rows.update(likes_count=F("likes_count") + delta)
+            response_cache.bump(model._meta.label, obj.pk)
+        likes_count = rows.values_list("likes_count", flat=True).get()
+    return liked, likes_count
+
+
+def release_user(user):
+    """
+    Takes a user's subscriptions, ratings and likes out of the counters.
+    Call it right before deleting the account, in the same transaction.
+    """
+    for model in (Post, Comment):
+        model.objects.filter(likes=user).update(likes_count=F("likes_count") - 1)
+    Studio.objects.filter(subscribers=user).update(
+        subscribers_count=F("subscribers_count") - 1
+    )
+    for star in STARS:
+        Studio.objects.filter(ratings__user=user, ratings__rating=star).update(
+            rating_sum=F("rating_sum") - star,
+            rating_count=F("rating_count") - 1,
+            **{f"rating_{star}_count": F(f"rating_{star}_count") - 1},
+        )
+
+
+def rebuild_counters(queryset=None):
+    """
+    Recomputes every counter from the subscription and rating rows, in a single UPDATE.
+    Returns the number of studios updated.
+    """
+    queryset = Studio.objects.all() if queryset is None else queryset
+
+    def aggregate(model, expression, **filters):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(studio=OuterRef("pk"), **filters)
+                .values("studio")
+                .annotate(value=expression)
+                .values("value")
+            ),
+            Value(0),
+        )
+
+    ratings = {
+        f"rating_{star}_count": aggregate(StudioRating, Count("*"), rating=star)
+        for star in STARS
+    }
+    return queryset.update(
+        subscribers_count=aggregate(Studio.subscribers.through, Count("*")),
+        rating_sum=aggregate(StudioRating, Sum("rating"), rating__in=STARS),
+        rating_count=aggregate(StudioRating, Count("*"), rating__in=STARS),
+        **ratings,
+    )
+
+
+def rebuild_like_counters():
+    """
+    Recomputes the likes_count of every post and comment, in one UPDATE per model.
+    Returns the number of rows updated.
+    """
+    updated = 0
+    for model in (Post, Comment):
+        column = model.likes.field.m2m_field_name()
+        likes = (
+            model.likes.through.objects.filter(**{column: OuterRef("pk")})
+            .values(column)
+            .annotate(total=Count("*"))
+            .values("total")
+        )
+        updated += model.objects.update(likes_count=Coalesce(Subquery(likes), Value(0)))
+    return updated
@@ -0,0 +1,152 @@
+# backend/users/events.py
+"""
+Publish/subscribe of live invitation events, consumed by the SSE stream
+(`invitation_stream_view`) so clients don't have to poll for new invitations.
+
+The broker is pluggable through the INVITATION_EVENT_BROKER setting (a dotted path).
+The default LocalBroker only delivers events inside the current process, which is
+enough for a single ASGI worker. A deployment with several workers needs a broker
+backed by a shared channel (e.g. Redis pub/sub) with the same two methods:
+
+    publish(user_id, event)      # callable from any thread, never blocks
+    subscribe(user_id)           # returns an object with `async get()` and `close()`
+
+EventSource can't send headers, so a client first asks for a stream ticket (an
+authenticated POST) and opens the stream with it: a random, single-use value that
+only lives for STREAM_TICKET_TIMEOUT seconds, instead of its access token, which
+would end up in server and proxy logs.
+"""
+import asyncio
+import secrets
+import threading
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.module_loading import import_string
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+
+DEFAULT_BROKER = "users.events.LocalBroker"
+
+_brokers = {}
+_brokers_lock = threading.Lock()
+
+
+class LocalSubscription:
+    """
+    One open stream: a bounded queue living on the event loop that created it.
+    """
+
+    max_pending = 100
+
+    def __init__(self, broker, user_id):
+        self.broker = broker
+        self.user_id = user_id
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.max_pending)
+
+    def deliver(self, event):
+        # Runs on self.loop. A client that stopped reading just misses events;
+        # it catches up through the polling endpoint when it reconnects.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            pass
+
+    async def get(self):
+        return await self.queue.get()
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class LocalBroker:
+    """
+    In-process broker. Publishing hands the event to the event loop of every open
+    subscription of the user, so it is safe to call from sync (threaded) views.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def subscribe(self, user_id):
+        subscription = LocalSubscription(self, user_id)
+        with self.lock:
+            self.subscriptions.setdefault(user_id, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self.lock:
+            subscriptions = self.subscriptions.get(subscription.user_id, set())
+            subscriptions.discard(subscription)
+            if not subscriptions:
+                self.subscriptions.pop(subscription.user_id, None)
+
+    def publish(self, user_id, event):
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(user_id, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, event)
+            except RuntimeError:
+                # The loop is closed: the stream is gone and will never read again.
+                self.unsubscribe(subscription)
+
+
+def get_broker():
+    """
+    Returns the broker selected by the INVITATION_EVENT_BROKER setting (one per path).
+    """
+    path = getattr(settings, "INVITATION_EVENT_BROKER", DEFAULT_BROKER)
+    with _brokers_lock:
+        if path not in _brokers:
+            _brokers[path] = import_string(path)()
+        return _brokers[path]
+
+
+def publish_on_commit(user_id, event_type, data):
+    """
+    Sends an event to `user_id` once the current transaction commits, so a client
+    never hears about a row it can't read yet (or that was rolled back).
+    """
+    event = {"type": event_type, "data": data}
+    transaction.on_commit(lambda: get_broker().publish(user_id, event))
+
+
+# --- Stream Tickets ---
+
+STREAM_TICKET_TIMEOUT = 30
+
+
+def _ticket_key(ticket):
+    return f"invitations:stream-ticket:{ticket}"
+
+
+def stream_grant(user_id, token):
+    """
+    What a stream opened with the access token `token` may do: receive `user_id`'s
+    events until the token expires or is revoked.
+    """
+    return {
+        "user_id": user_id,
+        "jti": token.get(jwt_settings.JTI_CLAIM),
+        "expires_at": token["exp"],
+    }
+
+
+def issue_stream_ticket(user_id, token):
+    """Returns a new ticket that opens the stream once, with stream_grant()."""
+    ticket = secrets.token_urlsafe(32)
+    cache.set(_ticket_key(ticket), stream_grant(user_id, token), STREAM_TICKET_TIMEOUT)
+    return ticket
+
+
+def redeem_stream_ticket(ticket):
+    """Returns the grant of a ticket and invalidates it, or None if it isn't valid."""
+    key = _ticket_key(ticket)
+    grant = cache.get(key)
+    # Two requests may read the same ticket: only the one that deletes it wins.
+    if grant is None or not cache.delete(key):
+        return None
+    return grant
@@ -0,0 +1,157 @@
+# backend/users/images.py
+"""
+Resized WebP/JPEG variants of uploaded images (profile pictures, studio and lesson
+covers), so cards can load a 200px thumbnail instead of a multi-MB original.
+
+Saving a new image schedules generate_variants() in the background (see tasks.py
+and signals.py). Decoding and resizing is CPU-bound, so it runs in a process pool
+(IMAGE_VARIANT_WORKERS processes; 0 renders in the calling thread). The result is
+stored next to the image in its `<field>_variants` JSON field:
+
+    {"source": "studio_covers/a.jpg",
+     "sizes": {"200": {"webp": "studio_covers/variants/a_200.webp", "jpeg": ...}}}
+
+`source` records which upload the variants belong to, so stale variants of a
+replaced image are never served.
+"""
+import io
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+
+from django.apps import apps
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps
+
+from . import response_cache
+
+VARIANT_WIDTHS = (200, 480, 960)
+VARIANT_FORMATS = {"webp": "WEBP", "jpeg": "JPEG"}
+VARIANT_QUALITY = 80
+
+# The image fields we make variants for, by model label.
+IMAGE_FIELDS = {
+    "users.Profile": ("profile_picture",),
+    "users.Studio": ("cover_image",),
+    "users.Lesson": ("cover_image",),
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # Forking a threaded server copies whatever locks its other threads
+            # held (database connections, logging), so workers start from a clean
+            # process instead. render_variants() needs nothing but its arguments.
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context(
+                "forkserver" if "forkserver" in methods else "spawn"
+            )
+            _pool = ProcessPoolExecutor(
+                max_workers=settings.IMAGE_VARIANT_WORKERS, mp_context=context
+            )
+        return _pool
+
+
+def render_variants(data, widths=VARIANT_WIDTHS):
+    """
+    Decodes an image and encodes it at every width in `widths` smaller than the
+    original, in each of VARIANT_FORMATS. Returns {width: {format: bytes}}.
+    This is a plain function of bytes so it can run in a worker process.
+    """
+    with Image.open(io.BytesIO(data)) as original:
+        # Phone pictures are often stored sideways with an EXIF rotation flag.
+        image = ImageOps.exif_transpose(original)
+        image.load()
+
+    rendered = {}
+    for width in widths:
+        if width >= image.width:
+            continue
+        height = max(1, round(image.height * width / image.width))
+        resized = image.resize((width, height), Image.Resampling.LANCZOS)
+        rendered[width] = {}
+        for name, pil_format in VARIANT_FORMATS.items():
+            frame = resized
+            if pil_format == "JPEG" and frame.mode not in ("RGB", "L"):
+                frame = frame.convert("RGB")
+            buffer = io.BytesIO()
+            frame.save(buffer, pil_format, quality=VARIANT_QUALITY, optimize=True)
+            rendered[width][name] = buffer.getvalue()
+    return rendered
+
+
+def needs_variants(instance, field_name):
+    """Tells whether the image in `field_name` has no up-to-date variants yet."""
+    file = getattr(instance, field_name)
+    if not file or file.name == instance._meta.get_field(field_name).default:
+        # Nothing uploaded (or the shared default picture): clients use the original.
+        return False
+    variants = getattr(instance, f"{field_name}_variants") or {}
+    return variants.get("source") != file.name
+
+
+def generate_variants(model_label, pk, field_name):
+    """
+    Renders and stores the variants of one image field. Meant to run in the background.
+    """
+    model = apps.get_model(model_label)
+    instance = model.objects.filter(pk=pk).first()
+    if instance is None or not needs_variants(instance, field_name):
+        return
+
+    file = getattr(instance, field_name)
+    source = file.name
+    with file.open("rb") as f:
+        data = f.read()
+
+    if settings.IMAGE_VARIANT_WORKERS:
+        rendered = _get_pool().submit(render_variants, data).result()
+    else:
+        rendered = render_variants(data)
+
+    stem, _ = os.path.splitext(os.path.basename(source))
+    folder = os.path.join(os.path.dirname(source), "variants")
+    sizes = {}
+    for width, encoded in rendered.items():
+        sizes[str(width)] = {
+            name: file.storage.save(
+                os.path.join(folder, f"{stem}_{width}.{name}"), ContentFile(content)
+            )
+            for name, content in encoded.items()
+        }
+
+    # Only record the variants if the image wasn't replaced while we were working.
+    updated = model.objects.filter(pk=pk, **{field_name: source}).update(
+        **{f"{field_name}_variants": {"source": source, "sizes": sizes}}
+    )
+    if updated:
+        # update() sends no signals, so cached pages showing the image are
+        # invalidated here.
+        response_cache.bump(model_label, pk)
+
+
+def variant_urls(instance, field_name, request=None):
+    """
+    Returns {"<width>": {"webp": url, "jpeg": url}} for the current image of
+    `field_name`, or {} when there are no up-to-date variants.
+    """
+    file = getattr(instance, field_name)
+    variants = getattr(instance, f"{field_name}_variants") or {}
+    if not file or variants.get("source") != file.name:
+        return {}
+
+    def url(name):
+        url = file.storage.url(name)
+        return request.build_absolute_uri(url) if request is not None else url
+
+    return {
+        width: {fmt: url(name) for fmt, name in formats.items()}
+        for width, formats in variants.get("sizes", {}).items()
+    }
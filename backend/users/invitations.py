@@ -0,0 +1,115 @@
+# backend/users/invitations.py
+"""
+Bulk creation of meeting invitations.
+
+Invitations are inserted with bulk_create() in batches of INVITE_BATCH_SIZE, so
+inviting N users costs about N / INVITE_BATCH_SIZE round trips instead of N.
+Inviting a whole studio runs in the background (see tasks.py) and reads its
+subscribers in batches, so neither the request nor the memory use grows with
+the size of the audience.
+
+It also keeps a cached count of each user's unread invitations, which the
+notification badge polls. Whatever creates or answers invitations must call
+forget_unread_counts() for the affected users.
+"""
+from itertools import islice
+
+from django.core.cache import cache
+from django.db import transaction
+
+from . import events
+from .models import Invitation, Meeting, Studio
+from .serializers import InvitationSerializer
+
+INVITE_BATCH_SIZE = 500
+
+# The counts are invalidated explicitly; the timeout only bounds how long a count
+# can stay wrong after a change we don't hear about (e.g. a cascade delete).
+UNREAD_COUNT_TIMEOUT = 5 * 60
+
+
+def _batches(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def invite_users(meeting, user_ids):
+    """
+    Invites `user_ids` to `meeting`, skipping the host and anyone already invited,
+    and notifies the invitees once the transaction commits.
+    """
+    for batch in _batches(user_ids, INVITE_BATCH_SIZE):
+        batch = [user_id for user_id in batch if user_id != meeting.host_id]
+        with transaction.atomic():
+            # Those already invited were notified back then, so we leave them out.
+            invited = set(
+                Invitation.objects.filter(
+                    meeting=meeting, invitee_id__in=batch
+                ).values_list("invitee_id", flat=True)
+            )
+            batch = [user_id for user_id in batch if user_id not in invited]
+            if not batch:
+                continue
+            # ignore_conflicts skips the pairs a concurrent request just inserted.
+            Invitation.objects.bulk_create(
+                [Invitation(meeting=meeting, invitee_id=user_id) for user_id in batch],
+                ignore_conflicts=True,
+            )
+            # bulk_create() can't return the IDs when it ignores conflicts,
+            # so we read the batch back (one query) to build the events.
+            invitations = Invitation.objects.filter(
+                meeting=meeting, invitee_id__in=batch, status="pending"
+            )
+            for invitation in invitations:
+                invitation.meeting = meeting
+                events.publish_on_commit(
+                    invitation.invitee_id,
+                    "invitation.created",
+                    InvitationSerializer(invitation).data,
+                )
+            forget_unread_counts(batch)
+
+
+def invite_studio_subscribers(meeting_id, studio_id):
+    """
+    Invites every subscriber of a studio to a meeting. Meant to run in the background.
+    """
+    meeting = Meeting.objects.select_related("host__profile", "host__studio").get(pk=meeting_id)
+    subscriber_ids = (
+        Studio.subscribers.through.objects.filter(studio_id=studio_id)
+        .order_by("pk")
+        .values_list("user_id", flat=True)
+        .iterator(chunk_size=INVITE_BATCH_SIZE)
+    )
+    invite_users(meeting, subscriber_ids)
+
+
+# --- Unread Counts ---
+
+
+def _unread_count_key(user_id):
+    return f"invitations:unread:{user_id}"
+
+
+def unread_count(user_id):
+    """
+    Returns how many pending, unread invitations `user_id` has, from the cache if possible.
+    """
+    key = _unread_count_key(user_id)
+    count = cache.get(key)
+    if count is None:
+        count = Invitation.objects.filter(
+            invitee_id=user_id, status="pending", is_read=False
+        ).count()
+        cache.set(key, count, UNREAD_COUNT_TIMEOUT)
+    return count
+
+
+def forget_unread_counts(user_ids):
+    """
+    Drops the cached counts of `user_ids` once the current transaction commits
+    (dropping them earlier would let a concurrent request cache the old count again).
+    """
+    keys = [_unread_count_key(user_id) for user_id in user_ids]
+    transaction.on_commit(lambda: cache.delete_many(keys))
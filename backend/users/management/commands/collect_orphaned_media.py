@@ -0,0 +1,83 @@
+# backend/users/management/commands/collect_orphaned_media.py
+import os
+import time
+from collections import defaultdict
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+
+from users import cleanup
+
+
+def _size(size):
+    # filesizeformat() uses a non-breaking space, made for HTML.
+    return filesizeformat(size).replace("\xa0", " ")
+
+
+class Command(BaseCommand):
+    help = (
+        "Finds media files no model refers to any more (replaced pictures, files of "
+        "deleted accounts, studios and lessons) and reports how much space they take. "
+        "Pass --delete or --quarantine to reclaim it."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--grace-days",
+            type=float,
+            default=7,
+            help="Only collect files last modified more than this many days ago.",
+        )
+        action = parser.add_mutually_exclusive_group()
+        action.add_argument(
+            "--delete", action="store_true", help="Delete the orphaned files."
+        )
+        action.add_argument(
+            "--quarantine",
+            metavar="DIR",
+            help="Move the orphaned files under DIR instead of deleting them.",
+        )
+
+    def handle(self, *args, **options):
+        if options["grace_days"] < 0:
+            raise CommandError("--grace-days can't be negative.")
+        quarantine = options["quarantine"]
+        if quarantine:
+            quarantine = os.path.abspath(quarantine)
+
+        # Snapshot the references first: anything uploaded after this is younger
+        # than the grace period and won't be touched.
+        older_than = time.time() - options["grace_days"] * 86400
+        referenced = cleanup.referenced_names()
+
+        totals = defaultdict(lambda: [0, 0])
+        skip = [quarantine] if quarantine else []
+        for name, path, size in cleanup.find_orphans(referenced, older_than, skip=skip):
+            if options["delete"] or quarantine:
+                try:
+                    removed = cleanup.remove_orphan(name, path, quarantine, older_than)
+                except OSError as error:
+                    self.stderr.write(f"Skipped {name}: {error}")
+                    continue
+                if not removed:
+                    continue  # saved again since it was found
+            if options["verbosity"] > 1:
+                self.stdout.write(f"{name} ({_size(size)})")
+            folder = name.split("/", 1)[0] if "/" in name else "."
+            totals[folder][0] += 1
+            totals[folder][1] += size
+
+        for folder, (count, size) in sorted(totals.items()):
+            self.stdout.write(f"  {folder}/: {count} files, {_size(size)}")
+        count = sum(count for count, _ in totals.values())
+        size = sum(size for _, size in totals.values())
+        if options["delete"]:
+            summary = f"Deleted {count} orphaned files, {_size(size)} reclaimed."
+        elif quarantine:
+            summary = f"Moved {count} orphaned files ({_size(size)}) to {quarantine}."
+        else:
+            summary = (
+                f"Dry run: {count} orphaned files, {_size(size)} reclaimable. "
+                "Run again with --delete or --quarantine to remove them."
+            )
+        self.stdout.write(self.style.SUCCESS(summary))
@@ -0,0 +1,32 @@
+# backend/users/management/commands/generate_image_variants.py
+from django.apps import apps
+from django.core.management.base import BaseCommand
+
+from users import images
+
+
+class Command(BaseCommand):
+    help = (
+        "Renders the missing resized variants of every profile picture and cover image "
+        "(e.g. for images uploaded before variants existed)."
+    )
+
+    def handle(self, *args, **options):
+        rendered = 0
+        for label, field_names in images.IMAGE_FIELDS.items():
+            model = apps.get_model(label)
+            for field_name in field_names:
+                queryset = model.objects.exclude(**{field_name: ""}).exclude(
+                    **{f"{field_name}__isnull": True}
+                )
+                for instance in queryset.iterator(chunk_size=200):
+                    if images.needs_variants(instance, field_name):
+                        try:
+                            images.generate_variants(label, instance.pk, field_name)
+                        except (OSError, ValueError) as error:
+                            self.stderr.write(
+                                f"Skipped {label} #{instance.pk} ({field_name}): {error}"
+                            )
+                            continue
+                        rendered += 1
+        self.stdout.write(self.style.SUCCESS(f"Rendered variants for {rendered} images."))
@@ -0,0 +1,14 @@
+# backend/users/management/commands/rebuild_like_counters.py
+from django.core.management.base import BaseCommand
+
+from users.counters import rebuild_like_counters
+
+
+class Command(BaseCommand):
+    help = "Recomputes the stored like counters of every post and comment."
+
+    def handle(self, *args, **options):
+        updated = rebuild_like_counters()
+        self.stdout.write(
+            self.style.SUCCESS(f"Rebuilt the like counters of {updated} posts and comments.")
+        )
@@ -0,0 +1,12 @@
+# backend/users/management/commands/rebuild_search_index.py
+from django.core.management.base import BaseCommand
+
+from users import search
+
+
+class Command(BaseCommand):
+    help = "Rebuilds the full-text search index for studios and lessons."
+
+    def handle(self, *args, **options):
+        indexed = search.rebuild_index()
+        self.stdout.write(self.style.SUCCESS(f"Indexed {indexed} studios and lessons."))
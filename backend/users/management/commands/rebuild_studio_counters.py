@@ -0,0 +1,12 @@
+# backend/users/management/commands/rebuild_studio_counters.py
+from django.core.management.base import BaseCommand
+
+from users.counters import rebuild_counters
+
+
+class Command(BaseCommand):
+    help = "Recomputes the stored subscriber and rating counters of every studio."
+
+    def handle(self, *args, **options):
+        updated = rebuild_counters()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt the counters of {updated} studios."))
@@ -0,0 +1,182 @@
+# backend/users/media.py
+"""
+Serves the files in MEDIA_ROOT (lesson videos, covers, profile pictures).
+
+Unlike django.views.static.serve, this view is meant for production:
+- it answers `Range` requests with 206 Partial Content, so seeking in a lesson
+  video only fetches the bytes the player needs;
+- it sends ETag/Last-Modified and answers conditional requests with 304;
+- the file goes out through the WSGI server's `wsgi.file_wrapper`, which servers
+  like gunicorn and uWSGI turn into an os.sendfile() call (zero-copy, bounded by
+  the Content-Length we set for the range);
+- with MEDIA_OFFLOAD set, it only checks the request and hands the transfer to the
+  front proxy (nginx `X-Accel-Redirect` or Apache/lighttpd `X-Sendfile`), so no
+  Django worker is held while a video streams.
+"""
+import mimetypes
+import os
+import re
+import stat
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+from .storage import BLOB_DIR
+
+RANGE_RE = re.compile(r"^bytes=(\d*)-(\d*)$")
+BLOB_NAME_RE = re.compile(
+    rf"^{BLOB_DIR}/[0-9a-f]{{2}}/(?P<sha256>[0-9a-f]{{64}})(\.[^/.]*)?$"
+)
+STREAM_BLOCK_SIZE = 64 * 1024
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+def parse_range(header, size):
+    """
+    Returns the (first, last) byte positions, both inclusive, asked for by a
+    `Range` header, or None when the whole file should be sent. Multi-range and
+    malformed headers are ignored, as RFC 9110 allows.
+    """
+    match = RANGE_RE.match(header.strip())
+    if not match or match.groups() == ("", ""):
+        return None
+    first, last = match.groups()
+    if first == "":
+        # A suffix range: the last N bytes.
+        length = int(last)
+        if length == 0 or size == 0:
+            raise RangeNotSatisfiable
+        return max(0, size - length), size - 1
+    first = int(first)
+    last = size - 1 if last == "" else min(int(last), size - 1)
+    if first >= size:
+        raise RangeNotSatisfiable
+    if first > last:
+        return None
+    return first, last
+
+
+def _if_range_matches(request, etag, last_modified):
+    """Tells whether a `Range` may be honored given the request's `If-Range`."""
+    if_range = request.headers.get("If-Range")
+    if if_range is None:
+        return True
+    if if_range.startswith(('"', "W/")):
+        # Only a strong, exact match: a weak ETag never validates a range.
+        return if_range == etag
+    return parse_http_date_safe(if_range) == last_modified
+
+
+class FileRange:
+    """
+    A read-only view of `length` bytes of an open file, starting at the file's
+    current position. It keeps fileno() so a sendfile-capable `wsgi.file_wrapper`
+    can transfer it without copying through Python.
+    """
+
+    def __init__(self, file, length):
+        self.file = file
+        self.name = file.name
+        self.remaining = length
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def _offload(response, path, fullpath):
+    if settings.MEDIA_OFFLOAD == "x-accel-redirect":
+        response["X-Accel-Redirect"] = settings.MEDIA_OFFLOAD_PREFIX + quote(path)
+    elif settings.MEDIA_OFFLOAD == "x-sendfile":
+        response["X-Sendfile"] = fullpath
+    else:
+        raise ValueError(f"Unknown MEDIA_OFFLOAD mode {settings.MEDIA_OFFLOAD!r}.")
+    return response
+
+
+@require_safe
+def serve_media(request, path):
+    try:
+        fullpath = safe_join(settings.MEDIA_ROOT, path)
+        info = os.stat(fullpath)
+    except (SuspiciousFileOperation, OSError, ValueError):
+        raise Http404("File not found.")
+    if not stat.S_ISREG(info.st_mode):
+        raise Http404("File not found.")
+
+    size = info.st_size
+    last_modified = int(info.st_mtime)
+    etag = f'"{info.st_mtime_ns:x}-{size:x}"'
+    blob = BLOB_NAME_RE.match(path)
+    if blob:
+        # Blob names come from their content (see storage.py): the digest is a
+        # strong ETag that survives the mtime changes of a reused blob.
+        etag = f'"{blob["sha256"]}"'
+    validators = {"ETag": etag, "Last-Modified": http_date(last_modified)}
+    if blob:
+        # ...and the file behind a blob name never changes.
+        validators["Cache-Control"] = "public, max-age=31536000, immutable"
+
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is not None:
+        for header, value in validators.items():
+            response[header] = value
+        return response
+
+    content_type, encoding = mimetypes.guess_type(fullpath)
+    if encoding:
+        # Don't let browsers transparently decompress a .gz upload.
+        content_type = "application/octet-stream"
+    content_type = content_type or "application/octet-stream"
+
+    if settings.MEDIA_OFFLOAD:
+        # The proxy handles Range and streams the bytes itself.
+        response = _offload(HttpResponse(content_type=content_type), path, fullpath)
+    else:
+        try:
+            byte_range = None
+            if "Range" in request.headers and _if_range_matches(
+                request, etag, last_modified
+            ):
+                byte_range = parse_range(request.headers["Range"], size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response["Content-Range"] = f"bytes */{size}"
+            return response
+
+        first, last = byte_range or (0, size - 1)
+        file = open(fullpath, "rb")
+        file.seek(first)
+        response = FileResponse(
+            FileRange(file, last - first + 1), content_type=content_type
+        )
+        response.block_size = STREAM_BLOCK_SIZE
+        response["Content-Length"] = last - first + 1
+        if byte_range is not None:
+            response.status_code = 206
+            response["Content-Range"] = f"bytes {first}-{last}/{size}"
+
+    response["Accept-Ranges"] = "bytes"
+    for header, value in validators.items():
+        response[header] = value
+    return response
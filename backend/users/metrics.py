@@ -0,0 +1,325 @@
+# backend/users/metrics.py
+"""
+Per-route request metrics, served at /metrics in the Prometheus text format.
+
+For every named route (e.g. "explore", "my-invitations") and method we keep:
+- http_requests_total and http_request_errors_total (5xx responses);
+- http_request_duration_seconds, a latency histogram;
+- http_request_db_queries, a histogram of the queries each request ran.
+ServerTimingMiddleware (see middleware.py) measures the requests and calls observe().
+Methods other than the standard ones are all counted as "other", so made-up
+methods can't grow the tables without bound.
+
+/metrics is only served to scrapers that send the METRICS_TOKEN setting as a
+bearer token, and answers 404 while no token is set.
+
+Recording takes no lock: every thread counts into its own table, and a scrape adds
+the tables up. A scrape may catch a request half-counted, which only shifts it to
+the next scrape.
+
+Each worker process has its own counters. With several of them (gunicorn, uWSGI),
+set METRICS_DIR to a directory they all share: every process then writes its
+totals there at most every METRICS_FLUSH_INTERVAL seconds, and /metrics adds up the
+files of all processes, including those that exited, so counters never go back.
+Empty the directory when the server starts, as with prometheus_client.
+"""
+import atexit
+import hmac
+import json
+import os
+import threading
+import time
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
+from django.views.decorators.http import require_safe
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200, 500)
+METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+
+def _bucket(buckets, value):
+    for index, bound in enumerate(buckets):
+        if value <= bound:
+            return index
+    return len(buckets)  # +Inf
+
+
+class RouteStats:
+    """The counters of one (route, method). Histogram buckets aren't cumulative."""
+
+    __slots__ = (
+        "requests",
+        "errors",
+        "latency",
+        "latency_sum",
+        "queries",
+        "queries_sum",
+    )
+
+    def __init__(self):
+        self.requests = 0
+        self.errors = 0
+        self.latency = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.latency_sum = 0.0
+        self.queries = [0] * (len(QUERY_BUCKETS) + 1)
+        self.queries_sum = 0
+
+    def merge(self, other):
+        self.requests += other.requests
+        self.errors += other.errors
+        self.latency = [a + b for a, b in zip(self.latency, other.latency)]
+        self.latency_sum += other.latency_sum
+        self.queries = [a + b for a, b in zip(self.queries, other.queries)]
+        self.queries_sum += other.queries_sum
+
+    def to_list(self):
+        return [
+            self.requests,
+            self.errors,
+            self.latency,
+            self.latency_sum,
+            self.queries,
+            self.queries_sum,
+        ]
+
+    @classmethod
+    def from_list(cls, values):
+        stats = cls()
+        (
+            stats.requests,
+            stats.errors,
+            stats.latency,
+            stats.latency_sum,
+            stats.queries,
+            stats.queries_sum,
+        ) = values
+        return stats
+
+
+# --- Per-thread tables ---
+
+_local = threading.local()
+_lock = threading.Lock()  # guards _tables and _retired, never taken by observe()
+_tables = []  # (thread, {(route, method): RouteStats})
+_retired = {}  # what threads that exited had counted
+
+
+def _table():
+    try:
+        return _local.table
+    except AttributeError:
+        table = _local.table = {}
+        with _lock:
+            _tables.append((threading.current_thread(), table))
+        return table
+
+
+def observe(route, method, status, duration, queries):
+    """Counts one request: its status, duration (in seconds) and query count."""
+    if method not in METHODS:
+        method = "other"
+    table = _table()
+    stats = table.get((route, method))
+    if stats is None:
+        stats = table[(route, method)] = RouteStats()
+    stats.requests += 1
+    if status >= 500:
+        stats.errors += 1
+    stats.latency[_bucket(LATENCY_BUCKETS, duration)] += 1
+    stats.latency_sum += duration
+    stats.queries[_bucket(QUERY_BUCKETS, queries)] += 1
+    stats.queries_sum += queries
+
+    if settings.METRICS_DIR and time.monotonic() >= _next_flush:
+        flush()
+
+
+def _add(totals, key, stats):
+    if key not in totals:
+        totals[key] = RouteStats()
+    totals[key].merge(stats)
+
+
+def collect():
+    """Returns this process's totals, as {(route, method): RouteStats}."""
+    totals = {}
+    with _lock:
+        # The tables of threads that exited won't change anymore: fold them away,
+        # so servers that start a thread per connection don't pile them up.
+        for thread, table in [entry for entry in _tables if not entry[0].is_alive()]:
+            _tables.remove((thread, table))
+            for key, stats in table.items():
+                _add(_retired, key, stats)
+        for key, stats in _retired.items():
+            _add(totals, key, stats)
+        live = [table.copy() for _, table in _tables]
+    for table in live:
+        for key, stats in table.items():
+            _add(totals, key, stats)
+    return totals
+
+
+def reset():
+    """Forgets everything this process counted (for tests)."""
+    with _lock:
+        _retired.clear()
+        for _, table in _tables:
+            table.clear()
+
+
+# --- Multiprocess mode ---
+
+_file = None  # (pid, file name)
+_next_flush = 0.0
+_flush_lock = threading.Lock()
+
+
+def _file_name():
+    # A new name after a fork, or when a PID is reused, so no process ever
+    # overwrites the totals of another one.
+    global _file
+    pid = os.getpid()
+    if _file is None or _file[0] != pid:
+        _file = (pid, f"{pid}-{time.time_ns()}.json")
+    return _file[1]
+
+
+def flush():
+    """Writes this process's totals to METRICS_DIR."""
+    global _next_flush
+    directory = settings.METRICS_DIR
+    if not directory or not _flush_lock.acquire(blocking=False):
+        return
+    try:
+        _next_flush = time.monotonic() + settings.METRICS_FLUSH_INTERVAL
+        totals = collect()
+        if not totals:
+            return  # e.g. a management command
+        data = {
+            "buckets": [LATENCY_BUCKETS, QUERY_BUCKETS],
+            "routes": [
+                [route, method, *stats.to_list()]
+                for (route, method), stats in totals.items()
+            ],
+        }
+        os.makedirs(directory, exist_ok=True)
+        path = os.path.join(directory, _file_name())
+        with open(f"{path}.tmp", "w") as f:
+            json.dump(data, f)
+        os.replace(f"{path}.tmp", path)
+    finally:
+        _flush_lock.release()
+
+
+atexit.register(flush)
+
+
+def _collect_all():
+    totals = collect()
+    directory = settings.METRICS_DIR
+    if not directory:
+        return totals
+    own = _file_name()
+    try:
+        names = [name for name in os.listdir(directory) if name.endswith(".json")]
+    except FileNotFoundError:
+        names = []
+    for name in names:
+        if name == own:
+            continue  # our live counters are newer
+        try:
+            with open(os.path.join(directory, name)) as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            continue
+        if data["buckets"] != [list(LATENCY_BUCKETS), list(QUERY_BUCKETS)]:
+            continue  # written by a release with other buckets
+        for route, method, *values in data["routes"]:
+            _add(totals, (route, method), RouteStats.from_list(values))
+    return totals
+
+
+# --- Exposition ---
+
+
+def _labels(route, method, **extra):
+    pairs = {"route": route, "method": method, **extra}
+    return ",".join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n"),
+        )
+        for name, value in pairs.items()
+    )
+
+
+def _histogram(lines, name, buckets, counts, total, labels):
+    cumulative = 0
+    for bound, count in zip((*buckets, "+Inf"), counts):
+        cumulative += count
+        lines.append(f"{name}_bucket{{{_labels(*labels, le=bound)}}} {cumulative}")
+    lines.append(f"{name}_sum{{{_labels(*labels)}}} {total}")
+    lines.append(f"{name}_count{{{_labels(*labels)}}} {cumulative}")
+
+
+def render():
+    """Returns all the metrics in the Prometheus text format."""
+    routes = sorted(_collect_all().items())
+    lines = [
+        "# HELP http_requests_total Requests handled, by route.",
+        "# TYPE http_requests_total counter",
+    ]
+    lines += [
+        f"http_requests_total{{{_labels(*key)}}} {stats.requests}"
+        for key, stats in routes
+    ]
+    lines += [
+        "# HELP http_request_errors_total Requests answered with a 5xx status.",
+        "# TYPE http_request_errors_total counter",
+    ]
+    lines += [
+        f"http_request_errors_total{{{_labels(*key)}}} {stats.errors}"
+        for key, stats in routes
+    ]
+    lines += [
+        "# HELP http_request_duration_seconds Time spent handling the request.",
+        "# TYPE http_request_duration_seconds histogram",
+    ]
+    for key, stats in routes:
+        _histogram(
+            lines,
+            "http_request_duration_seconds",
+            LATENCY_BUCKETS,
+            stats.latency,
+            stats.latency_sum,
+            key,
+        )
+    lines += [
+        "# HELP http_request_db_queries Database queries run by the request.",
+        "# TYPE http_request_db_queries histogram",
+    ]
+    for key, stats in routes:
+        _histogram(
+            lines,
+            "http_request_db_queries",
+            QUERY_BUCKETS,
+            stats.queries,
+            stats.queries_sum,
+            key,
+        )
+    return "\n".join(lines) + "\n"
+
+
+@require_safe
+def metrics_view(request):
+    token = settings.METRICS_TOKEN
+    if not token:
+        raise Http404
+    given = request.headers.get("Authorization", "").encode()
+    if not hmac.compare_digest(given, f"Bearer {token}".encode()):
+        return HttpResponse("Unauthorized\n", status=401, content_type="text/plain")
+    return HttpResponse(
+        render(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
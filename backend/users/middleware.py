@@ -0,0 +1,263 @@
+# backend/users/middleware.py
+import inspect
+import json
+import logging
+import os
+import random
+import re
+import time
+import traceback
+from collections import Counter
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from rest_framework.fields import Field, SerializerMethodField
+
+from . import metrics
+
+logger = logging.getLogger(__name__)
+
+
+def track_queries(wrapper):
+    """Installs a database execute_wrapper on every connection, as a context manager."""
+    stack = ExitStack()
+    for alias in connections:
+        stack.enter_context(connections[alias].execute_wrapper(wrapper))
+    return stack
+
+
+class RequestTiming:
+    """The time one request spent in the database, in JSON encoding, and in total."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.render_time = 0.0
+        self._render_started = None
+
+    def __call__(self, execute, sql, params, many, context):
+        # A database execute_wrapper: counts and times every query.
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - started
+            self.queries += 1
+
+    def render_started(self):
+        self._render_started = time.perf_counter()
+
+    def render_finished(self, response):
+        self.render_time += time.perf_counter() - self._render_started
+
+
+class ServerTimingMiddleware:
+    """
+    Measures a sample of the requests (SERVER_TIMING_SAMPLE_RATE, from 0 to 1):
+    their query count and database time, the time spent encoding the DRF
+    Response to JSON ("render"), and the total time. Serializers run inside the
+    view (serializer.data), so their time counts in the total but not in
+    "render". The numbers are sent back in a `Server-Timing`
+    header (shown by the browser's devtools) and logged as one JSON line, tagged
+    with the URL name (e.g. "explore"), on the "users.middleware" logger.
+
+    With METRICS_ENABLED, every request is also measured and counted in the
+    /metrics histograms (see metrics.py); only the sampled ones get the header
+    and the log line.
+
+    Queries run by async views happen on other threads and aren't counted.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        rate = settings.SERVER_TIMING_SAMPLE_RATE
+        return rate >= 1 or (rate > 0 and random.random() < rate)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        sampled = self._sampled()
+        if not (sampled or settings.METRICS_ENABLED):
+            return self.get_response(request)
+        request.server_timing = timing = RequestTiming()
+        with track_queries(timing):
+            response = self.get_response(request)
+        return self.finish(request, response, timing, sampled)
+
+    async def __acall__(self, request):
+        sampled = self._sampled()
+        if not (sampled or settings.METRICS_ENABLED):
+            return await self.get_response(request)
+        request.server_timing = timing = RequestTiming()
+        response = await self.get_response(request)
+        return self.finish(request, response, timing, sampled)
+
+    def process_template_response(self, request, response):
+        # DRF Responses are rendered right after this hook: by then the view has
+        # built response.data, so this only times the JSON encoding.
+        timing = getattr(request, "server_timing", None)
+        if timing is not None:
+            timing.render_started()
+            response.add_post_render_callback(timing.render_finished)
+        return response
+
+    def finish(self, request, response, timing, sampled):
+        total = (time.perf_counter() - timing.started) * 1000
+        match = request.resolver_match
+        route = match.url_name if match else None
+        if settings.METRICS_ENABLED:
+            metrics.observe(
+                route or "unmatched",
+                request.method,
+                response.status_code,
+                total / 1000,
+                timing.queries,
+            )
+        if not sampled:
+            return response
+
+        db, render = timing.db_time * 1000, timing.render_time * 1000
+        entries = [
+            f'db;dur={db:.1f};desc="{timing.queries} queries"',
+            f'render;dur={render:.1f};desc="JSON encoding"',
+            f"total;dur={total:.1f}",
+        ]
+        if response.has_header("Server-Timing"):
+            entries.insert(0, response["Server-Timing"])
+        response["Server-Timing"] = ", ".join(entries)
+
+        if logger.isEnabledFor(logging.INFO):
+            logger.info(
+                json.dumps(
+                    {
+                        "route": route,
+                        "method": request.method,
+                        "status": response.status_code,
+                        "queries": timing.queries,
+                        "db_ms": round(db, 1),
+                        "render_ms": round(render, 1),
+                        "total_ms": round(total, 1),
+                    }
+                )
+            )
+        return response
+
+
+# --- N+1 detection ---
+
+SHAPE_PATTERNS = [
+    (re.compile(r"'(?:[^']|'')*'"), "?"),  # string literals
+    (re.compile(r"\b\d+(?:\.\d+)?\b"), "?"),  # numbers
+    (re.compile(r"%s"), "?"),  # parameters
+    (re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)"), "(...)"),  # IN lists of any length
+    (re.compile(r"\s+"), " "),
+]
+STACK_EXCERPT_FRAMES = 5
+
+
+def query_shape(sql):
+    """The SQL with its values taken out, so the queries of an N+1 all look alike."""
+    for pattern, replacement in SHAPE_PATTERNS:
+        sql = pattern.sub(replacement, sql)
+    return sql.strip()
+
+
+class RepeatedQueryError(Exception):
+    pass
+
+
+def _serializer_field():
+    # The innermost serializer field being rendered, e.g. "UserSerializer.is_teacher".
+    frame = inspect.currentframe()
+    while frame is not None:
+        field = frame.f_locals.get("self")
+        if isinstance(field, Field) and frame.f_code.co_name in (
+            "to_representation",
+            "get_attribute",
+        ):
+            name = type(field).__name__
+            if field.parent is not None:
+                name = f"{type(field.parent).__name__}.{field.field_name}"
+            if isinstance(field, SerializerMethodField):
+                name += f" ({field.method_name})"
+            return name
+        frame = frame.f_back
+    return None
+
+
+def _stack_excerpt():
+    # The last few frames of our own code, leaving out Django, DRF and this file.
+    base_dir = str(settings.BASE_DIR)
+    frames = [
+        frame
+        for frame in traceback.extract_stack()
+        if frame.filename.startswith(base_dir)
+        and "site-packages" not in frame.filename
+        and frame.filename != __file__
+    ]
+    for frame in frames:
+        frame.filename = os.path.relpath(frame.filename, base_dir)
+    return "".join(traceback.format_list(frames[-STACK_EXCERPT_FRAMES:]))
+
+
+class QueryShapes:
+    """
+    A database execute_wrapper that counts the queries of a request by shape, and
+    remembers where each shape was when it went over the threshold.
+    """
+
+    def __init__(self, threshold):
+        self.threshold = threshold
+        self.counts = Counter()
+        self.repeated = {}  # shape: (serializer field, stack excerpt)
+
+    def __call__(self, execute, sql, params, many, context):
+        shape = query_shape(sql)
+        self.counts[shape] += 1
+        if self.counts[shape] == self.threshold + 1:
+            self.repeated[shape] = (_serializer_field(), _stack_excerpt())
+            if settings.NPLUSONE_RAISE:
+                raise RepeatedQueryError(self.describe(shape))
+        return execute(sql, params, many, context)
+
+    def describe(self, shape):
+        field, stack = self.repeated[shape]
+        return (
+            f"Query ran {self.counts[shape]} times: {shape}\n"
+            f"From {field or 'outside a serializer field'}:\n{stack}"
+        )
+
+
+class QueryShapeMiddleware:
+    """
+    Flags N+1 queries in development and staging: when one query shape runs more
+    than NPLUSONE_THRESHOLD times in a request, logs a warning (or, with
+    NPLUSONE_RAISE, raises RepeatedQueryError) naming the serializer field that
+    ran it, with a stack excerpt. NPLUSONE_THRESHOLD = 0 turns it off.
+    """
+
+    def __init__(self, get_response):
+        if not settings.NPLUSONE_THRESHOLD:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        shapes = QueryShapes(settings.NPLUSONE_THRESHOLD)
+        with track_queries(shapes):
+            response = self.get_response(request)
+        for shape in shapes.repeated:
+            logger.warning(
+                "N+1 in %s %s. %s", request.method, request.path, shapes.describe(shape)
+            )
+        return response
@@ -0,0 +1,83 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:43
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# (model table, FTS5 table, title column, body column, tags through table, fk column)
+INDEXED_TABLES = (
+    ("users_studio", "users_studio_fts", "name", "description", "users_studio_tags", "studio_id"),
+    ("users_lesson", "users_lesson_fts", "title", "description", "users_lesson_tags", "lesson_id"),
+)
+
+
+def create_search_index(apps, schema_editor):
+    """
+    Creates the backend-specific search structures and fills them with the existing rows.
+    PostgreSQL gets a GIN index on the tsvector column, SQLite gets an FTS5 table.
+    """
+    vendor = schema_editor.connection.vendor
+    for table, fts_table, title, body, tags_table, fk in INDEXED_TABLES:
+        tag_names = (
+            "SELECT {agg} FROM {tags_table} JOIN users_tag ON users_tag.id = {tags_table}.tag_id "
+            "WHERE {tags_table}.{fk} = {table}.id"
+        )
+        if vendor == "postgresql":
+            schema_editor.execute(
+                f"CREATE INDEX {table}_search_gin ON {table} USING gin (search_vector)"
+            )
+            tags_sql = tag_names.format(
+                agg="string_agg(users_tag.name, ' ')", tags_table=tags_table, fk=fk, table=table
+            )
+            schema_editor.execute(
+                f"UPDATE {table} SET search_vector = "
+                f"setweight(to_tsvector('english', coalesce({title}, '')), 'A') || "
+                f"setweight(to_tsvector('english', coalesce(({tags_sql}), '')), 'A') || "
+                f"setweight(to_tsvector('english', coalesce({body}, '')), 'B')"
+            )
+        elif vendor == "sqlite":
+            schema_editor.execute(
+                f"CREATE VIRTUAL TABLE {fts_table} USING fts5("
+                f"title, body, tags, tokenize = 'porter unicode61')"
+            )
+            tags_sql = tag_names.format(
+                agg="group_concat(users_tag.name, ' ')", tags_table=tags_table, fk=fk, table=table
+            )
+            schema_editor.execute(
+                f"INSERT INTO {fts_table} (rowid, title, body, tags) "
+                f"SELECT id, coalesce({title}, ''), coalesce({body}, ''), "
+                f"coalesce(({tags_sql}), '') FROM {table}"
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for table, fts_table, *_ in INDEXED_TABLES:
+        if vendor == "postgresql":
+            schema_editor.execute(f"DROP INDEX IF EXISTS {table}_search_gin")
+        elif vendor == "sqlite":
+            schema_editor.execute(f"DROP TABLE IF EXISTS {fts_table}")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0023_alter_studio_owner"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lesson",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.AddField(
+            model_name="studio",
+            name="search_vector",
+            field=django.contrib.postgres.search.SearchVectorField(
+                editable=False, null=True
+            ),
+        ),
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    """
+    Indexes the Studio/Lesson tag M2M tables by tag first, so "which studios/lessons
+    have tag X" (tag filters and facet counts on the Explore page) is an index-only lookup.
+    Django's automatic indexes only cover (studio_id, tag_id) and tag_id on its own.
+    """
+
+    dependencies = [
+        ("users", "0024_search_index"),
+    ]
+
+    operations = [
+        migrations.RunSQL(
+            "CREATE INDEX users_studio_tags_tag_studio_idx "
+            "ON users_studio_tags (tag_id, studio_id)",
+            "DROP INDEX users_studio_tags_tag_studio_idx",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX users_lesson_tags_tag_lesson_idx "
+            "ON users_lesson_tags (tag_id, lesson_id)",
+            "DROP INDEX users_lesson_tags_tag_lesson_idx",
+        ),
+    ]
@@ -0,0 +1,86 @@
+# Generated by Django 5.2.5 on 2026-10-17 00:47
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_studio_counters(apps, schema_editor):
+    """
+    Computes the new counters from the existing subscriptions and ratings.
+    """
+    Studio = apps.get_model("users", "Studio")
+    StudioRating = apps.get_model("users", "StudioRating")
+
+    def aggregate(model, expression, **filters):
+        return Coalesce(
+            Subquery(
+                model.objects.filter(studio=OuterRef("pk"), **filters)
+                .values("studio")
+                .annotate(value=expression)
+                .values("value")
+            ),
+            Value(0),
+        )
+
+    stars = [1, 2, 3, 4, 5]
+    Studio.objects.update(
+        subscribers_count=aggregate(Studio.subscribers.through, Count("*")),
+        rating_sum=aggregate(StudioRating, Sum("rating"), rating__in=stars),
+        rating_count=aggregate(StudioRating, Count("*"), rating__in=stars),
+        **{
+            f"rating_{star}_count": aggregate(StudioRating, Count("*"), rating=star)
+            for star in stars
+        },
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0025_tag_posting_indexes"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="studio",
+            name="rating_1_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="studio",
+            name="rating_2_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="studio",
+            name="rating_3_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="studio",
+            name="rating_4_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="studio",
+            name="rating_5_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="studio",
+            name="rating_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="studio",
+            name="rating_sum",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="studio",
+            name="subscribers_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_studio_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.5 on 2026-10-17 01:32
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+
+
+def fill_like_counters(apps, schema_editor):
+    """
+    Computes the new like counters from the existing likes.
+    """
+    for model_name, column in (("Post", "post"), ("Comment", "comment")):
+        model = apps.get_model("users", model_name)
+        likes = (
+            model.likes.through.objects.filter(**{column: OuterRef("pk")})
+            .values(column)
+            .annotate(total=Count("*"))
+            .values("total")
+        )
+        model.objects.update(likes_count=Coalesce(Subquery(likes), Value(0)))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0026_studio_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="post",
+            name="likes_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="likes_count",
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_like_counters, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,67 @@
+# Generated by Django 5.2.5 on 2026-10-17 02:05
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    """
+    Adds composite indexes for the hot query shapes of our views (see
+    users/tests/test_query_plans.py), plus user-first indexes on the subscriber
+    and like M2M tables. Django only indexes those as (studio|post|comment, user)
+    and user_id alone, so "which of these did this user like/subscribe to" had to
+    visit the table rows instead of staying in the index.
+    """
+
+    dependencies = [
+        ("users", "0027_like_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "timestamp", "id"], name="users_comment_thread_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="invitation",
+            index=models.Index(
+                condition=models.Q(("is_read", False), ("status", "pending")),
+                fields=["invitee", "created_at"],
+                name="users_invitation_inbox_idx",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="lesson",
+            index=models.Index(
+                fields=["studio", "created_at"], name="users_lesson_studio_new_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(fields=["timestamp", "id"], name="users_post_feed_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="post",
+            index=models.Index(
+                fields=["author", "timestamp"], name="users_post_author_idx"
+            ),
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX users_studio_subscribers_user_studio_idx "
+            "ON users_studio_subscribers (user_id, studio_id)",
+            "DROP INDEX users_studio_subscribers_user_studio_idx",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX users_post_likes_user_post_idx "
+            "ON users_post_likes (user_id, post_id)",
+            "DROP INDEX users_post_likes_user_post_idx",
+        ),
+        migrations.RunSQL(
+            "CREATE INDEX users_comment_likes_user_comment_idx "
+            "ON users_comment_likes (user_id, comment_id)",
+            "DROP INDEX users_comment_likes_user_comment_idx",
+        ),
+    ]
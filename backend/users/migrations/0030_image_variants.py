@@ -0,0 +1,28 @@
+# Generated by Django 5.2.5 on 2026-10-17 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0029_upload_sessions"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="lesson",
+            name="cover_image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="profile",
+            name="profile_picture_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AddField(
+            model_name="studio",
+            name="cover_image_variants",
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.5 on 2026-10-17 14:20
+
+from django.db import migrations
+
+# (model table, FTS5 table)
+INDEXED_TABLES = (
+    ("users_studio", "users_studio_fts"),
+    ("users_lesson", "users_lesson_fts"),
+)
+
+
+def create_delete_triggers(apps, schema_editor):
+    """
+    On SQLite, drops a row's search document inside the DELETE itself, so deleting
+    a studio and its lessons doesn't cost one more query per row.
+    PostgreSQL keeps the document in the row, so it needs nothing.
+    """
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table, fts_table in INDEXED_TABLES:
+        schema_editor.execute(
+            f"CREATE TRIGGER {fts_table}_delete AFTER DELETE ON {table} BEGIN "
+            f"DELETE FROM {fts_table} WHERE rowid = old.id; END"
+        )
+
+
+def drop_delete_triggers(apps, schema_editor):
+    if schema_editor.connection.vendor != "sqlite":
+        return
+    for table, fts_table in INDEXED_TABLES:
+        schema_editor.execute(f"DROP TRIGGER IF EXISTS {fts_table}_delete")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0032_revoked_tokens"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_delete_triggers, drop_delete_triggers),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.5 on 2026-10-17 15:05
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("users", "0033_search_index_delete_triggers"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="mediablob",
+            name="refcount",
+        ),
+    ]
@@ -1,7 +1,12 @@
 # backend/users/models.py
 
+import os
+
+from django.conf import settings
 from django.db import models
 from django.contrib.auth.models import User
+from django.contrib.postgres.search import SearchVectorField
+from django.db.models.functions import Coalesce
 
 # We import the validator to check file extensions
 from django.core.validators import FileExtensionValidator
@@ -17,6 +22,8 @@ class Profile(models.Model):
         null=True,
         blank=True,
     )
+    # Resized versions of the picture, maintained by users/images.py.
+    profile_picture_variants = models.JSONField(default=dict, blank=True, editable=False)
     # ✅ RENAMED: from about_me to headline
     headline = models.CharField(max_length=250, blank=True)
     contact_email = models.EmailField(max_length=255, blank=True)
@@ -55,11 +62,23 @@ class Tag(models.Model):
 
 # Model 3: The Studio model for teachers
 #
+class StudioQuerySet(models.QuerySet):
+    def for_cards(self):
+        """
+        Loads everything the studio serializers display in a constant number of queries:
+        the owner with their profile and the tags. Subscriber and rating numbers are
+        stored on the studio itself (see the counters below).
+        """
+        return self.select_related("owner__profile").prefetch_related("tags")
+
+
 class Studio(models.Model):
     owner = models.OneToOneField(User, on_delete=models.CASCADE)
     name = models.CharField(max_length=200)
 
     cover_image = models.ImageField(upload_to="studio_covers/", null=True, blank=True)
+    # Resized versions of the cover, maintained by users/images.py.
+    cover_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     description = models.TextField()
     tags = models.ManyToManyField(Tag, blank=True)
 
@@ -71,9 +90,35 @@ class Studio(models.Model):
 
     created_at = models.DateTimeField(auto_now_add=True)
 
+    # Full-text search document (PostgreSQL only), maintained by users/search.py.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    # --- Denormalized counters ---
+    # Maintained by users/counters.py with atomic F() updates, so reading them never
+    # needs a COUNT or AVG. `manage.py rebuild_studio_counters` recomputes them.
+    subscribers_count = models.IntegerField(default=0, editable=False)
+    rating_sum = models.IntegerField(default=0, editable=False)
+    rating_count = models.IntegerField(default=0, editable=False)
+    # One counter per star, for the rating histogram.
+    rating_1_count = models.IntegerField(default=0, editable=False)
+    rating_2_count = models.IntegerField(default=0, editable=False)
+    rating_3_count = models.IntegerField(default=0, editable=False)
+    rating_4_count = models.IntegerField(default=0, editable=False)
+    rating_5_count = models.IntegerField(default=0, editable=False)
+
+    objects = StudioQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
+    @property
+    def average_rating(self):
+        return self.rating_sum / self.rating_count if self.rating_count else 0
+
+    @property
+    def rating_histogram(self):
+        return {star: getattr(self, f"rating_{star}_count") for star in range(1, 6)}
+
 
 # --- StudioRating MODEL ---
 # This new model will handle the ratings for each studio.
@@ -93,6 +138,14 @@ class StudioRating(models.Model):
 
 # Model 4: The Lesson model for content inside a Studio
 # This is our main "container" model for any type of course content.
+class LessonQuerySet(models.QuerySet):
+    def for_cards(self):
+        """
+        Loads the studio, its owner (with profile) and the tags shown on lesson cards.
+        """
+        return self.select_related("studio__owner__profile").prefetch_related("tags")
+
+
 class Lesson(models.Model):
     """
     Represents a single course or piece of content within a Studio.
@@ -117,6 +170,8 @@ class Lesson(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField(blank=True, null=True)
     cover_image = models.ImageField(upload_to="lesson_covers/", null=True, blank=True)
+    # Resized versions of the cover, maintained by users/images.py.
+    cover_image_variants = models.JSONField(default=dict, blank=True, editable=False)
     tags = models.ManyToManyField(Tag, blank=True)
     created_at = models.DateTimeField(auto_now_add=True, null=True, blank=True)
 
@@ -145,11 +200,62 @@ class Lesson(models.Model):
         help_text="A single video file for the lesson.",
     )
 
+    # Full-text search document (PostgreSQL only), maintained by users/search.py.
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    objects = LessonQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # A studio's lessons, newest first (dashboard, "my courses").
+            models.Index(
+                fields=["studio", "created_at"], name="users_lesson_studio_new_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.title
 
 
 # Model 5 & 6: Post and Comment for the Squad Hub
+class PostQuerySet(models.QuerySet):
+    # How many of the latest comments are shown on each feed card.
+    COMMENT_PREVIEW_SIZE = 3
+
+    def with_details(self):
+        """
+        Loads the author (with profile and studio) and the tags, and annotates the
+        comment count, so serializing a post needs no extra query per post.
+        """
+        comments = (
+            Comment.objects.filter(post=models.OuterRef("pk"))
+            .values("post")
+            .annotate(total=models.Count("*"))
+            .values("total")
+        )
+        return (
+            self.select_related("author__profile", "author__studio")
+            .prefetch_related("tags")
+            .annotate(comments_count=Coalesce(models.Subquery(comments), 0))
+        )
+
+    def for_feed(self):
+        """
+        Loads the post cards of the SquadHub feed in a constant number of queries:
+        everything from with_details(), plus the latest comments of every post in
+        `latest_comments`.
+        """
+        # A sliced prefetch is fetched with a single ROW_NUMBER() window query.
+        latest_comments = Comment.objects.select_related(
+            "author__profile", "author__studio"
+        ).order_by("-timestamp", "-id")[: self.COMMENT_PREVIEW_SIZE]
+        return self.with_details().prefetch_related(
+            models.Prefetch(
+                "comments", queryset=latest_comments, to_attr="latest_comments"
+            )
+        )
+
+
 class Post(models.Model):
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     title = models.CharField(max_length=255, default="Untitled Post")
@@ -165,17 +271,52 @@ class Post(models.Model):
     )
     timestamp = models.DateTimeField(auto_now_add=True)
     likes = models.ManyToManyField(User, related_name="liked_posts", blank=True)
+    # Denormalized size of `likes`, maintained by counters.toggle_like().
+    # `manage.py rebuild_like_counters` recomputes it.
+    likes_count = models.IntegerField(default=0, editable=False)
+
+    objects = PostQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # The SquadHub feed pages through (timestamp, id).
+            models.Index(fields=["timestamp", "id"], name="users_post_feed_idx"),
+            # A user's own posts, newest first.
+            models.Index(fields=["author", "timestamp"], name="users_post_author_idx"),
+        ]
 
     def __str__(self):
         return f'"{self.title}" by {self.author.username}'
 
 
+class CommentQuerySet(models.QuerySet):
+    def for_thread(self):
+        """
+        Loads the author (with profile and studio) of each comment, for the paginated
+        comment threads.
+        """
+        return self.select_related("author__profile", "author__studio")
+
+
 class Comment(models.Model):
     post = models.ForeignKey(Post, on_delete=models.CASCADE, related_name="comments")
     author = models.ForeignKey(User, on_delete=models.CASCADE)
     content = models.TextField()
     timestamp = models.DateTimeField(auto_now_add=True)
     likes = models.ManyToManyField(User, related_name="liked_comments", blank=True)
+    # Denormalized size of `likes`, maintained by counters.toggle_like().
+    # `manage.py rebuild_like_counters` recomputes it.
+    likes_count = models.IntegerField(default=0, editable=False)
+
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # A post's comment thread, paged through (timestamp, id).
+            models.Index(
+                fields=["post", "timestamp", "id"], name="users_comment_thread_idx"
+            ),
+        ]
 
     def __str__(self):
         return f"Comment by {self.author.username} on {self.post}"
@@ -227,6 +368,96 @@ class Invitation(models.Model):
     class Meta:
         # A user can only be invited to the same meeting once.
         unique_together = ("meeting", "invitee")
+        indexes = [
+            # A user's pending, unread invitations, newest first (list and count).
+            # Partial, since answered invitations are never listed again.
+            models.Index(
+                fields=["invitee", "created_at"],
+                condition=models.Q(status="pending", is_read=False),
+                name="users_invitation_inbox_idx",
+            ),
+        ]
 
     def __str__(self):
         return f'Invitation for {self.invitee.username} to "{self.meeting.title}"'
+
+
+# --- Resumable Uploads ---
+
+
+class UploadSession(models.Model):
+    """
+    A resumable, chunked upload of a large lesson file or video (see users/uploads.py).
+    The bytes received so far live in `temp_path` until the session is finalized.
+    """
+
+    FIELD_CHOICES = (
+        ("lesson_video", "Lesson Video"),
+        ("lesson_file", "Lesson File"),
+    )
+    STATUS_CHOICES = (
+        ("uploading", "Uploading"),
+        ("complete", "Complete"),
+    )
+
+    # A random ID, so a session can't be guessed from another one.
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    owner = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="upload_sessions"
+    )
+    lesson = models.ForeignKey(
+        Lesson, on_delete=models.CASCADE, related_name="upload_sessions"
+    )
+    # The Lesson file field the upload is attached to once finalized.
+    field = models.CharField(max_length=20, choices=FIELD_CHOICES)
+    filename = models.CharField(max_length=255)
+    size = models.BigIntegerField()
+    # The expected SHA-256 (hex) of the whole file, if the client sent it up front.
+    sha256 = models.CharField(max_length=64, blank=True)
+    received = models.BigIntegerField(default=0)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default="uploading")
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    @property
+    def temp_path(self):
+        return os.path.join(settings.UPLOAD_SESSIONS_ROOT, f"{self.id}.part")
+
+    def __str__(self):
+        return f"Upload of {self.filename} ({self.received}/{self.size} bytes)"
+
+
+# --- Media Storage ---
+
+
+class MediaBlob(models.Model):
+    """
+    One stored file of ContentAddressedStorage (see users/storage.py), shared by
+    every upload with the same bytes. Deleted by collect_orphaned_media, together
+    with its file, once no file field points at it.
+    """
+
+    sha256 = models.CharField(max_length=64, primary_key=True)
+    name = models.CharField(max_length=255, unique=True)
+    size = models.BigIntegerField()
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return self.name
+
+
+# --- Authentication ---
+
+
+class RevokedToken(models.Model):
+    """
+    A JWT (access or refresh) that was revoked before it expired, e.g. on logout.
+    Checked through the Bloom filter in users/revocation.py.
+    """
+
+    jti = models.CharField(max_length=255, primary_key=True)
+    # When the token would have expired anyway; the row is useless after that.
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f"Revoked token {self.jti}"
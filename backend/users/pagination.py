@@ -0,0 +1,116 @@
+# backend/users/pagination.py
+import base64
+import datetime
+import json
+
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor (keyset) pagination for our list endpoints.
+
+    Rows are sorted by `ordering` (e.g. ("-created_at", "-id")) and the `next` cursor is
+    an opaque token holding the sort values of the last row on the page. The next page
+    is fetched with a plain WHERE on those values instead of an OFFSET, so page N costs
+    the same as page 1 and rows inserted in the meantime never shift the pages.
+
+    The last ordering field must be unique (usually "id"), and none of them may be NULL.
+    """
+
+    cursor_query_param = "cursor"
+    limit_query_param = "limit"
+    default_limit = 20
+    max_limit = 100
+
+    def __init__(self, ordering, default_limit=None, max_limit=None):
+        self.ordering = tuple(ordering)
+        self.default_limit = default_limit or self.default_limit
+        self.max_limit = max_limit or self.max_limit
+        self.next_cursor = None
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.limit = self.get_limit(request)
+        position = self.decode_cursor(request, queryset)
+
+        queryset = queryset.order_by(*self.ordering)
+        if position is not None:
+            queryset = queryset.filter(self.after(position))
+
+        # We fetch one extra row to know if there is a next page.
+        rows = list(queryset[: self.limit + 1])
+        page = rows[: self.limit]
+        if len(rows) > self.limit:
+            self.next_cursor = self.encode_cursor(page[-1])
+        return page
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.next_cursor, "results": data})
+
+    def get_limit(self, request):
+        try:
+            limit = int(request.query_params[self.limit_query_param])
+        except (KeyError, ValueError):
+            return self.default_limit
+        return max(1, min(limit, self.max_limit))
+
+    def after(self, position):
+        """
+        Builds the "comes after `position`" condition for the current ordering.
+        For ("-a", "-b") this is: a < x OR (a = x AND b < y).
+        """
+        condition = Q()
+        equal_so_far = Q()
+        for field, value in zip(self.ordering, position):
+            name = field.lstrip("-")
+            lookup = "lt" if field.startswith("-") else "gt"
+            condition |= equal_so_far & Q(**{f"{name}__{lookup}": value})
+            equal_so_far &= Q(**{name: value})
+        return condition
+
+    # --- Cursor encoding ---
+
+    def encode_cursor(self, obj):
+        values = []
+        for field in self.ordering:
+            value = getattr(obj, field.lstrip("-"))
+            if isinstance(value, datetime.datetime):
+                value = value.isoformat()
+            values.append(value)
+        raw = json.dumps(values, separators=(",", ":")).encode()
+        return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+    def decode_cursor(self, request, queryset):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+            position = json.loads(raw)
+        except ValueError:
+            raise NotFound("Invalid cursor.")
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound("Invalid cursor.")
+        # Each value goes through its field, so a tampered cursor is a 404 and not a
+        # database error (or a comparison of mismatched types).
+        try:
+            position = [
+                self.sort_field(queryset, field.lstrip("-")).to_python(value)
+                for field, value in zip(self.ordering, position)
+            ]
+        except (ValidationError, TypeError):
+            raise NotFound("Invalid cursor.")
+        if None in position:
+            raise NotFound("Invalid cursor.")
+        return position
+
+    def sort_field(self, queryset, name):
+        """Returns the model field, or the annotation's output field, called `name`."""
+        annotation = queryset.query.annotations.get(name)
+        if annotation is not None:
+            return annotation.output_field
+        return queryset.model._meta.get_field(name)
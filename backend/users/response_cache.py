@@ -0,0 +1,107 @@
+# backend/users/response_cache.py
+"""
+A shared cache for the data of our busiest public read endpoints: the studio page,
+the course page, the post page and the first page of the explore lists.
+
+Keys are versioned. Every cached Studio, Lesson and Post has a version number in
+the cache, and so has every model as a whole; signals.py bumps them when a row (or
+something shown with it) changes. A response is stored under the versions it was
+built from, so after a bump the next request simply misses and rebuilds it.
+Changes that show up on most pages (tags, profiles, usernames) bump a model-wide
+version that every key includes.
+
+Entries are fresh for RESPONSE_CACHE_FRESH seconds. For RESPONSE_CACHE_STALE more
+seconds, one request rebuilds an expired entry while the others keep getting the
+stale copy (stale-while-revalidate), so a popular page is never rebuilt by every
+worker at once. This also bounds how long rows changed with queryset.update(),
+which sends no signals, can be served out of date.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+# Models shown on most cached pages, which get a single version for the whole model.
+SHARED_DEPENDENCIES = (("users.Tag",), ("users.Profile",), ("auth.User",))
+
+# How long one request may take to rebuild an entry before another one tries.
+REBUILD_LOCK_TIMEOUT = 30
+
+
+def _version_key(label, pk=None):
+    return f"version:{label}" if pk is None else f"version:{label}:{pk}"
+
+
+def _versions(keys):
+    versions = cache.get_many(keys)
+    missing = [key for key in keys if key not in versions]
+    if missing:
+        # A version that was evicted (or never set) restarts from the clock, so it
+        # can't come back to a number an old entry was stored under.
+        now = time.time_ns()
+        for key in missing:
+            cache.add(key, now, timeout=None)
+        versions.update(cache.get_many(missing))
+    return [versions.get(key, 0) for key in keys]
+
+
+def _increment(keys):
+    for key in keys:
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Not set: the next reader starts it from the clock (see _versions).
+            pass
+
+
+def bump(label, pk=None):
+    """
+    Invalidates the cached data built from the `label` row with this `pk` (e.g.
+    bump("users.Studio", 3)), and the lists built from the whole model.
+    """
+    keys = [_version_key(label)]
+    if pk is not None:
+        keys.append(_version_key(label, pk))
+    _increment(keys)
+    # Once more after the commit: a request may have cached the old rows under the
+    # new version while our transaction was still open.
+    transaction.on_commit(lambda: _increment(keys))
+
+
+def get_or_build(request, name, args, dependencies, build):
+    """
+    Returns the data cached as `name` for `args`, or calls build() and caches what
+    it returns. `dependencies` lists the rows, as (label, pk), and whole models, as
+    (label,), that the data is made of. A None result (e.g. "not found") isn't cached.
+    """
+    keys = [
+        _version_key(*dependency)
+        for dependency in (*dependencies, *SHARED_DEPENDENCIES)
+    ]
+    # Serializers build absolute URLs, so the host is part of the key.
+    parts = [request.scheme, request.get_host(), *args, *_versions(keys)]
+    digest = hashlib.md5(repr(parts).encode(), usedforsecurity=False).hexdigest()
+    key = f"response:{name}:{digest}"
+
+    entry = cache.get(key)
+    now = time.time()
+    if entry is not None:
+        data, fresh_until = entry
+        if now < fresh_until:
+            return data
+        if not cache.add(f"{key}:rebuilding", True, REBUILD_LOCK_TIMEOUT):
+            # Someone else is already rebuilding it.
+            return data
+
+    data = build()
+    if data is not None:
+        cache.set(
+            key,
+            (data, now + settings.RESPONSE_CACHE_FRESH),
+            settings.RESPONSE_CACHE_FRESH + settings.RESPONSE_CACHE_STALE,
+        )
+    if entry is not None:
+        cache.delete(f"{key}:rebuilding")
+    return data
@@ -0,0 +1,167 @@
+# backend/users/revocation.py
+"""
+Revocation of JWTs before they expire (logout, account deletion).
+
+Revoked token IDs (`jti`) are stored in the RevokedToken table until the token
+would have expired. Checking that table on every request would cost a query per
+request, so each process keeps a Bloom filter of the revoked IDs in front of it:
+a token that isn't in the filter is certainly not revoked, and only the rare
+filter hits (revoked tokens, plus about REVOCATION_FILTER_ERROR_RATE of the
+others) go to the database.
+
+The filter is rebuilt from the table in a background thread every
+REVOCATION_FILTER_REFRESH seconds, which is how revocations made by other
+processes reach this one. Revocations made in this process are added right away.
+"""
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.db import connections
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from . import tasks
+from .models import RevokedToken
+
+MIN_CAPACITY = 1024
+
+
+class BloomFilter:
+    """
+    A fixed-size Bloom filter of strings. Answers "maybe present" or "certainly absent".
+    """
+
+    def __init__(self, size, hashes):
+        self.size = size
+        self.hashes = hashes
+        self.bits = bytearray((size + 7) // 8)
+
+    @classmethod
+    def for_capacity(cls, capacity, error_rate):
+        """Sizes a filter for `capacity` items with `error_rate` false positives."""
+        capacity = max(capacity, MIN_CAPACITY)
+        size = math.ceil(-capacity * math.log(error_rate) / math.log(2) ** 2)
+        hashes = max(1, round(size / capacity * math.log(2)))
+        return cls(size, hashes)
+
+    def _positions(self, item):
+        # Double hashing: k positions from the two halves of a single digest.
+        digest = hashlib.blake2b(item.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * step) % self.size for i in range(self.hashes))
+
+    def add(self, item):
+        for position in self._positions(item):
+            self.bits[position >> 3] |= 1 << (position & 7)
+
+    def __contains__(self, item):
+        bits = self.bits
+        return all(
+            bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(item)
+        )
+
+
+_lock = threading.Lock()
+_filter = None
+_built_at = 0.0
+_rebuilding = False
+# Revocations made here while a rebuild is pending, re-added to its result.
+_added_during_rebuild = []
+
+
+def _build_filter():
+    jtis = list(
+        RevokedToken.objects.filter(expires_at__gt=timezone.now()).values_list(
+            "jti", flat=True
+        )
+    )
+    # Room to grow until the next rebuild.
+    bloom = BloomFilter.for_capacity(
+        2 * len(jtis), settings.REVOCATION_FILTER_ERROR_RATE
+    )
+    for jti in jtis:
+        bloom.add(jti)
+    return bloom
+
+
+def _begin_rebuild():
+    """Marks a rebuild as pending (call with _lock held). False if one already is."""
+    global _rebuilding
+    if _rebuilding:
+        return False
+    _rebuilding = True
+    # Emptied now rather than when the rebuild starts reading the table: a token
+    # revoked in between may not be committed, so its query could miss it.
+    _added_during_rebuild.clear()
+    return True
+
+
+def rebuild_filter():
+    """Rebuilds this process's filter from the RevokedToken table."""
+    global _filter, _built_at, _rebuilding
+    started = time.monotonic()
+    with _lock:
+        _begin_rebuild()
+    try:
+        bloom = _build_filter()
+        with _lock:
+            for jti in _added_during_rebuild:
+                bloom.add(jti)
+            _filter, _built_at = bloom, started
+    finally:
+        with _lock:
+            _rebuilding = False
+
+
+def _rebuild_in_background():
+    try:
+        rebuild_filter()
+    finally:
+        # This runs on a worker thread, whose connection we must not leak.
+        connections.close_all()
+
+
+def _current_filter():
+    if _filter is None:
+        # The first check in this process: we can't answer without the table.
+        rebuild_filter()
+    elif time.monotonic() - _built_at > settings.REVOCATION_FILTER_REFRESH:
+        with _lock:
+            start = _begin_rebuild()
+        if start:
+            tasks.run_soon(_rebuild_in_background)
+    return _filter
+
+
+def is_revoked(jti):
+    """Tells whether the token with this `jti` was revoked."""
+    if not jti or jti not in _current_filter():
+        return False
+    return RevokedToken.objects.filter(jti=jti, expires_at__gt=timezone.now()).exists()
+
+
+def revoke(*tokens):
+    """Revokes simplejwt tokens (e.g. request.auth) until they expire."""
+    rows = [
+        RevokedToken(
+            jti=token[api_settings.JTI_CLAIM],
+            expires_at=datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc),
+        )
+        for token in tokens
+    ]
+    # Logouts are rare, so this is a good time to drop the rows of expired tokens.
+    RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    RevokedToken.objects.bulk_create(rows, ignore_conflicts=True)
+
+    _current_filter()
+    with _lock:
+        for row in rows:
+            _filter.add(row.jti)
+            if _rebuilding:
+                _added_during_rebuild.append(row.jti)
@@ -0,0 +1,191 @@
+# backend/users/search.py
+"""
+Full-text search for the Explore page.
+
+Studios and lessons each keep a search document made of their title, description
+and tag names. On PostgreSQL the document lives in the `search_vector` column
+(a weighted tsvector backed by a GIN index). On SQLite, which we use for local
+development and tests, it lives in an FTS5 virtual table keyed by the row id.
+
+The index is kept up to date by the signal handlers in `users/signals.py`, and can
+be rebuilt from scratch with `python manage.py rebuild_search_index`. Deleted rows
+take their document with them: on PostgreSQL it's a column of the row, and on
+SQLite a trigger (see migration 0033) deletes it.
+"""
+import re
+
+from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVector
+from django.db import connection
+from django.db.models import BigIntegerField, Count, F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast, Round
+
+from .models import Lesson, Studio, Tag
+
+SEARCH_CONFIG = "english"
+
+# We only keep the first few words of a query, which is plenty for the search bar.
+MAX_QUERY_TERMS = 8
+
+# For each indexed model: the FTS5 table name, the "title" field and the "body" field.
+INDEXED_MODELS = {
+    Studio: ("users_studio_fts", "name", "description"),
+    Lesson: ("users_lesson_fts", "title", "description"),
+}
+
+# Ranks are kept as integers (the score times RANK_SCALE), so they compare exactly:
+# the explore page sorts by rank and its page cursors resume from one.
+RANK_SCALE = 10**6
+
+_TERM_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _terms(query):
+    """Splits a raw search string into safe, lowercase search terms."""
+    return _TERM_RE.findall(query.lower())[:MAX_QUERY_TERMS]
+
+
+def update_index(instance):
+    """
+    (Re)builds the search document of a single Studio or Lesson.
+    """
+    table, title_field, body_field = INDEXED_MODELS[type(instance)]
+    tag_names = " ".join(instance.tags.values_list("name", flat=True))
+
+    if connection.vendor == "postgresql":
+        # The title and the tags weigh more than the description in the ranking.
+        type(instance).objects.filter(pk=instance.pk).update(
+            search_vector=SearchVector(title_field, weight="A", config=SEARCH_CONFIG)
+            + SearchVector(Value(tag_names), weight="A", config=SEARCH_CONFIG)
+            + SearchVector(body_field, weight="B", config=SEARCH_CONFIG)
+        )
+    elif connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {table} WHERE rowid = %s", [instance.pk])
+            cursor.execute(
+                f"INSERT INTO {table} (rowid, title, body, tags) VALUES (%s, %s, %s, %s)",
+                [
+                    instance.pk,
+                    getattr(instance, title_field) or "",
+                    getattr(instance, body_field) or "",
+                    tag_names,
+                ],
+            )
+
+
+def rebuild_index():
+    """
+    Rebuilds every search document. Returns the number of indexed rows.
+    """
+    if connection.vendor == "sqlite":
+        with connection.cursor() as cursor:
+            for table, _, _ in INDEXED_MODELS.values():
+                cursor.execute(f"DELETE FROM {table}")
+
+    indexed = 0
+    for model in INDEXED_MODELS:
+        for instance in model.objects.all().iterator(chunk_size=500):
+            update_index(instance)
+            indexed += 1
+    return indexed
+
+
+def _fixed_rank(score):
+    return Cast(Round(score * RANK_SCALE), BigIntegerField())
+
+
+def search(queryset, query):
+    """
+    Restricts a Studio or Lesson queryset to the rows matching `query` and annotates
+    each row with an integer `rank` (higher is more relevant). Every term is treated
+    as a prefix, so results update nicely while the user is still typing.
+    """
+    terms = _terms(query)
+    if not terms:
+        return queryset.annotate(rank=Value(0, output_field=BigIntegerField())).none()
+
+    model = queryset.model
+    table, title_field, body_field = INDEXED_MODELS[model]
+
+    if connection.vendor == "postgresql":
+        ts_query = SearchQuery(
+            " & ".join(f"{term}:*" for term in terms),
+            search_type="raw",
+            config=SEARCH_CONFIG,
+        )
+        return queryset.filter(search_vector=ts_query).annotate(
+            rank=_fixed_rank(SearchRank(F("search_vector"), ts_query))
+        )
+
+    if connection.vendor == "sqlite":
+        match = " ".join(f'"{term}"*' for term in terms)
+        # bm25() returns "more negative is better", so we flip its sign.
+        # The weights follow the column order: title, body, tags.
+        score = RawSQL(
+            f"SELECT -bm25({table}, 10.0, 2.0, 5.0) FROM {table} "
+            f'WHERE {table} MATCH %s AND rowid = "{model._meta.db_table}"."id"',
+            (match,),
+            output_field=FloatField(),
+        )
+        return queryset.filter(
+            pk__in=RawSQL(f"SELECT rowid FROM {table} WHERE {table} MATCH %s", (match,))
+        ).annotate(rank=_fixed_rank(score))
+
+    # Any other database: fall back to a plain (unranked) substring search.
+    condition = Q()
+    for term in terms:
+        condition &= (
+            Q(**{f"{title_field}__icontains": term})
+            | Q(**{f"{body_field}__icontains": term})
+            | Q(tags__name__icontains=term)
+        )
+    return (
+        queryset.filter(condition)
+        .distinct()
+        .annotate(rank=Value(0, output_field=BigIntegerField()))
+    )
+
+
+# --- Tag Filtering & Facets ---
+# Both helpers work directly on the Studio/Lesson tag M2M tables ("postings"),
+# which are indexed on (tag_id, <studio|lesson>_id) by migration 0025.
+
+
+def _postings(model):
+    """Returns the tag M2M (through) model of `model` and its column pointing at `model`."""
+    return model.tags.through, f"{model._meta.model_name}_id"
+
+
+def filter_by_tags(queryset, tag_names, match_all=True):
+    """
+    Keeps the rows tagged with all of `tag_names` (match_all) or with any of them.
+    """
+    tag_names = set(tag_names)
+    tag_ids = list(Tag.objects.filter(name__in=tag_names).values_list("id", flat=True))
+    if match_all and len(tag_ids) < len(tag_names):
+        # At least one of the requested tags doesn't exist, so nothing can have them all.
+        return queryset.none()
+
+    through, column = _postings(queryset.model)
+    postings = through.objects.filter(tag_id__in=tag_ids)
+    if match_all and len(tag_ids) > 1:
+        postings = (
+            postings.values(column)
+            .annotate(matched=Count("tag_id"))
+            .filter(matched=len(tag_ids))
+        )
+    return queryset.filter(pk__in=postings.values(column))
+
+
+def tag_facets(queryset, limit=20):
+    """
+    Counts how many rows of `queryset` carry each tag, in a single aggregate query.
+    Returns the `limit` most common tags as [{"name": ..., "count": ...}].
+    """
+    through, column = _postings(queryset.model)
+    return list(
+        through.objects.filter(**{f"{column}__in": queryset.values("pk")})
+        .values(name=F("tag__name"))
+        .annotate(count=Count(column))
+        .order_by("-count", "name")[:limit]
+    )
@@ -2,6 +2,7 @@
 import json
 from rest_framework import serializers
 from django.contrib.auth.models import User
+from . import images
 from .models import (
     Invitation,
     Meeting,
@@ -12,20 +13,62 @@ from .models import (
     Post,
     Comment,
     StudioRating,
+    UploadSession,
 )
 from django.utils import timezone
 from datetime import timedelta
-from django.db.models import Avg
 
 
 # This file has been reverted to its pre-Cloudinary state.
 # All `SerializerMethodField` logic for URLs has been removed.
 
 
+
+def user_has_relation(serializer, obj, context_key, relation):
+    """
+    Tells whether the requesting user is in `obj.<relation>` (e.g. a post's likes).
+
+    List views resolve this for the whole page in one query and pass the matching
+    object IDs in the context under `context_key`; otherwise we fall back to an
+    EXISTS query for this object.
+    """
+    ids = serializer.context.get(context_key)
+    if ids is not None:
+        return obj.id in ids
+    request = serializer.context.get("request")
+    user = request.user if request else None
+    if user and user.is_authenticated:
+        return getattr(obj, relation).filter(pk=user.pk).exists()
+    return False
+
+
+class ImageVariantsField(serializers.Field):
+    """
+    A read-only map of the resized versions of an image field (see users/images.py),
+    like {"200": {"webp": url, "jpeg": url}}. It's empty until they are rendered.
+    """
+
+    def __init__(self, image_field, **kwargs):
+        self.image_field = image_field
+        super().__init__(source="*", read_only=True, **kwargs)
+
+    def to_representation(self, value):
+        return images.variant_urls(value, self.image_field, self.context.get("request"))
+
+
 class ProfileSerializer(serializers.ModelSerializer):
+    profile_picture_variants = ImageVariantsField("profile_picture")
+
     class Meta:
         model = Profile
-        fields = ["profile_picture", "headline", "contact_email", "cv_file", "degrees"]
+        fields = [
+            "profile_picture",
+            "profile_picture_variants",
+            "headline",
+            "contact_email",
+            "cv_file",
+            "degrees",
+        ]
 
 
 class TagSerializer(serializers.ModelSerializer):
@@ -73,8 +116,9 @@ class UserSerializer(serializers.ModelSerializer):
 class StudioCardSerializer(serializers.ModelSerializer):
     owner = UserSerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
-    subscribers_count = serializers.SerializerMethodField()
-    average_rating = serializers.SerializerMethodField()
+    # subscribers_count and average_rating are stored on the studio (see users/counters.py).
+    average_rating = serializers.FloatField(read_only=True)
+    cover_image_variants = ImageVariantsField("cover_image")
 
     class Meta:
         model = Studio
@@ -83,26 +127,22 @@ class StudioCardSerializer(serializers.ModelSerializer):
             "name",
             "description",
             "cover_image",
+            "cover_image_variants",
             "owner",
             "tags",
             "subscribers_count",
             "average_rating",
         ]
 
-    def get_subscribers_count(self, obj):
-        return obj.subscribers.count()
-
-    def get_average_rating(self, obj):
-        return obj.ratings.aggregate(Avg("rating")).get("rating__avg", 0) or 0
-
 
 class StudioSerializer(serializers.ModelSerializer):
     owner = UserSerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
-    subscribers_count = serializers.SerializerMethodField()
-    average_rating = serializers.SerializerMethodField()
+    average_rating = serializers.FloatField(read_only=True)
+    rating_histogram = serializers.DictField(child=serializers.IntegerField(), read_only=True)
     is_subscribed = serializers.SerializerMethodField()
     lessons = lessons = serializers.SerializerMethodField()
+    cover_image_variants = ImageVariantsField("cover_image")
 
     class Meta:
         model = Studio
@@ -111,27 +151,21 @@ class StudioSerializer(serializers.ModelSerializer):
             "name",
             "description",
             "cover_image",
+            "cover_image_variants",
             "owner",
             "tags",
             "created_at",
             "subscribers_count",
             "average_rating",
+            "rating_count",
+            "rating_histogram",
             "is_subscribed",
             "lessons",
         ]
 
-    def get_subscribers_count(self, obj):
-        return obj.subscribers.count()
-
-    def get_average_rating(self, obj):
-        return obj.ratings.aggregate(Avg("rating")).get("rating__avg", 0) or 0
-
     def get_is_subscribed(self, obj):
-        user = self.context.get("request").user  # type: ignore
-        if user and user.is_authenticated:
-            # This checks if the user is in the set of subscribers for the studio
-            return obj.subscribers.filter(pk=user.pk).exists()
-        return False
+        # This checks if the user is in the set of subscribers for the studio
+        return user_has_relation(self, obj, "subscribed_studio_ids", "subscribers")
 
     def get_lessons(self, obj):
         return LessonCardSerializer(obj.lessons.all(), many=True).data
@@ -158,6 +192,7 @@ class CourseStudioSerializer(serializers.ModelSerializer):
 class LessonCardSerializer(serializers.ModelSerializer):
     studio = CourseStudioSerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
+    cover_image_variants = ImageVariantsField("cover_image")
 
     class Meta:
         model = Lesson
@@ -167,6 +202,7 @@ class LessonCardSerializer(serializers.ModelSerializer):
             "studio",
             "tags",
             "cover_image",
+            "cover_image_variants",
             "description",
             "created_at",
             "lesson_type",
@@ -175,6 +211,7 @@ class LessonCardSerializer(serializers.ModelSerializer):
 
 class LessonDetailSerializer(serializers.ModelSerializer):
     tags = serializers.SerializerMethodField()
+    cover_image_variants = ImageVariantsField("cover_image")
 
     class Meta:
         model = Lesson
@@ -183,6 +220,7 @@ class LessonDetailSerializer(serializers.ModelSerializer):
             "title",
             "description",
             "cover_image",
+            "cover_image_variants",
             "lesson_type",
             "markdown_content",
             "lesson_file",
@@ -203,7 +241,8 @@ class TeacherCardSerializer(serializers.ModelSerializer):
         fields = ["id", "username", "first_name", "last_name", "profile", "studio_id"]
 
     def get_studio_id(self, obj):
-        studio = Studio.objects.filter(owner=obj).first()
+        # The explore view loads the studio with select_related("studio").
+        studio = getattr(obj, "studio", None)
         return studio.id if studio else None  # type: ignore
 
 
@@ -306,7 +345,9 @@ class ProfileUpdateSerializer(serializers.ModelSerializer):
         user_data = validated_data.pop("user", {})
         if "username" in user_data and instance.user.username != user_data["username"]:
             instance.user.username = user_data["username"]
-            instance.user.save()
+            # The user may come from an authentication snapshot (see
+            # authentication.py), whose other fields can be out of date.
+            instance.user.save(update_fields=["username"])
             instance.username_last_changed = timezone.now()
         super().update(instance, validated_data)
         return instance
@@ -331,11 +372,11 @@ class StudioCreateSerializer(serializers.ModelSerializer):
 
 
 class StudioDashboardSerializer(serializers.ModelSerializer):
-    subscribers_count = serializers.SerializerMethodField()
-    average_rating = serializers.SerializerMethodField()
+    average_rating = serializers.FloatField(read_only=True)
     lessons_count = serializers.SerializerMethodField()
     owner = UserSerializer(read_only=True)
     lessons = serializers.SerializerMethodField()
+    cover_image_variants = ImageVariantsField("cover_image")
 
     class Meta:
         model = Studio
@@ -344,6 +385,7 @@ class StudioDashboardSerializer(serializers.ModelSerializer):
             "name",
             "description",
             "cover_image",
+            "cover_image_variants",
             "owner",
             "subscribers_count",
             "average_rating",
@@ -351,17 +393,11 @@ class StudioDashboardSerializer(serializers.ModelSerializer):
             "lessons",
         ]
 
-    def get_subscribers_count(self, obj):
-        return obj.subscribers.count()
-
-    def get_average_rating(self, obj):
-        return obj.ratings.aggregate(Avg("rating")).get("rating__avg", 0) or 0
-
     def get_lessons_count(self, obj):
         return obj.lessons.count()
 
     def get_lessons(self, obj):
-        recent_lessons = obj.lessons.order_by("-created_at")[:5]
+        recent_lessons = obj.lessons.prefetch_related("tags").order_by("-created_at")[:5]
         return LessonCardSerializer(recent_lessons, many=True).data
 
 
@@ -462,7 +498,6 @@ class CommentSerializer(serializers.ModelSerializer):
     """
 
     author = UserSerializer(read_only=True)
-    likes_count = serializers.SerializerMethodField()
     is_liked = serializers.SerializerMethodField()
 
     class Meta:
@@ -477,27 +512,21 @@ class CommentSerializer(serializers.ModelSerializer):
             "is_liked",
         ]
 
-    def get_likes_count(self, obj):
-        return obj.likes.count()
-
     def get_is_liked(self, obj):
-        user = self.context.get("request").user  # type: ignore
-        if user and user.is_authenticated:
-            return obj.likes.filter(pk=user.pk).exists()
-        return False
+        return user_has_relation(self, obj, "liked_comment_ids", "likes")
 
 
 class PostSerializer(serializers.ModelSerializer):
     """
     A detailed serializer for reading a single post.
-    It includes the author's details, tags, and all associated comments.
+    It includes the author's details, tags and counts. The comments are paginated
+    separately (see post_detail_view). Expects a post loaded with Post.objects.with_details().
     """
 
     author = UserSerializer(read_only=True)
     tags = TagSerializer(many=True, read_only=True)
-    # We nest the CommentSerializer to include all comments directly in the post data.
-    comments = CommentSerializer(many=True, read_only=True)
-    likes_count = serializers.SerializerMethodField()
+    likes_count = serializers.IntegerField(read_only=True)
+    comments_count = serializers.IntegerField(read_only=True)
     is_liked = serializers.SerializerMethodField()
 
     class Meta:
@@ -511,18 +540,58 @@ class PostSerializer(serializers.ModelSerializer):
             "content",
             "timestamp",
             "likes_count",
-            "comments",
+            "comments_count",
             "is_liked",
         ]
 
-    def get_likes_count(self, obj):
-        return obj.likes.count()
+    def get_is_liked(self, obj):
+        return user_has_relation(self, obj, "liked_post_ids", "likes")
+
+
+class CommentPreviewSerializer(serializers.ModelSerializer):
+    """
+    A short version of a comment, for the previews on the feed cards.
+    """
+
+    author = UserSerializer(read_only=True)
+
+    class Meta:
+        model = Comment
+        fields = ["id", "author", "content", "timestamp"]
+
+
+class PostCardSerializer(serializers.ModelSerializer):
+    """
+    A lighter serializer for the SquadHub feed.
+    Instead of every comment, it carries the comment count and the latest few comments.
+    Expects posts loaded with Post.objects.for_feed().
+    """
+
+    author = UserSerializer(read_only=True)
+    tags = TagSerializer(many=True, read_only=True)
+    comments_count = serializers.IntegerField(read_only=True)
+    likes_count = serializers.IntegerField(read_only=True)
+    latest_comments = CommentPreviewSerializer(many=True, read_only=True)
+    is_liked = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Post
+        fields = [
+            "id",
+            "author",
+            "title",
+            "tags",
+            "file_attachment",
+            "content",
+            "timestamp",
+            "likes_count",
+            "comments_count",
+            "latest_comments",
+            "is_liked",
+        ]
 
     def get_is_liked(self, obj):
-        user = self.context.get("request").user  # type: ignore
-        if user and user.is_authenticated:
-            return obj.likes.filter(pk=user.pk).exists()
-        return False
+        return user_has_relation(self, obj, "liked_post_ids", "likes")
 
 
 class PostCreateSerializer(serializers.ModelSerializer):
@@ -594,3 +663,24 @@ class UserSearchSerializer(serializers.ModelSerializer):
     class Meta:
         model = User
         fields = ["id", "username", "first_name", "last_name", "profile"]
+
+
+class UploadSessionSerializer(serializers.ModelSerializer):
+    """
+    Serializer for resumable upload sessions. `received` tells a client where to resume.
+    """
+
+    class Meta:
+        model = UploadSession
+        fields = [
+            "id",
+            "lesson",
+            "field",
+            "filename",
+            "size",
+            "sha256",
+            "received",
+            "status",
+            "created_at",
+        ]
+        read_only_fields = ["received", "status", "created_at"]
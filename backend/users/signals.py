@@ -0,0 +1,147 @@
+# backend/users/signals.py
+"""
+Signal handlers that keep derived data (like the search index) in sync with our models.
+They are connected in UsersConfig.ready().
+"""
+from django.contrib.auth.models import User
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from . import authentication, images, response_cache, search, tasks
+from .models import Comment, Lesson, Post, Profile, Studio, StudioRating, Tag
+
+
+# --- Search Index ---
+
+
+@receiver(post_save, sender=Studio)
+@receiver(post_save, sender=Lesson)
+def index_on_save(sender, instance, raw=False, **kwargs):
+    # `raw` is True while loading fixtures, when related rows may not exist yet.
+    if not raw:
+        search.update_index(instance)
+
+
+@receiver(m2m_changed, sender=Studio.tags.through)
+@receiver(m2m_changed, sender=Lesson.tags.through)
+def index_on_tags_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    """
+    Re-indexes a Studio/Lesson when its tags change.
+    When the change comes from the Tag side (`reverse`), every affected row is re-indexed.
+    """
+    if not reverse:
+        if action in ("post_add", "post_remove", "post_clear"):
+            search.update_index(instance)
+        return
+
+    if action == "pre_clear":
+        # The rows are gone once "post_clear" fires, so we remember them now.
+        related = getattr(instance, f"{model._meta.model_name}_set")
+        instance._search_pks_to_reindex = list(related.values_list("pk", flat=True))
+    elif action in ("post_add", "post_remove"):
+        _reindex(model, pk_set)
+    elif action == "post_clear":
+        _reindex(model, getattr(instance, "_search_pks_to_reindex", []))
+
+
+@receiver(post_save, sender=Tag)
+def index_on_tag_renamed(sender, instance, created, raw=False, **kwargs):
+    if not created and not raw:
+        _reindex(Studio, instance.studio_set.values_list("pk", flat=True))
+        _reindex(Lesson, instance.lesson_set.values_list("pk", flat=True))
+
+
+@receiver(pre_delete, sender=Tag)
+def index_on_tag_deleted(sender, instance, **kwargs):
+    # Deleting a tag silently removes its rows from the M2M tables, so we
+    # re-index the affected studios and lessons once the delete is committed.
+    studio_pks = list(instance.studio_set.values_list("pk", flat=True))
+    lesson_pks = list(instance.lesson_set.values_list("pk", flat=True))
+    transaction.on_commit(
+        lambda: (_reindex(Studio, studio_pks), _reindex(Lesson, lesson_pks))
+    )
+
+
+def _reindex(model, pks):
+    for instance in model.objects.filter(pk__in=list(pks or [])):
+        search.update_index(instance)
+
+
+# --- Image Variants ---
+
+
+@receiver(post_save, sender=Profile)
+@receiver(post_save, sender=Studio)
+@receiver(post_save, sender=Lesson)
+def make_image_variants(sender, instance, raw=False, **kwargs):
+    # A newly saved image gets its resized variants rendered in the background.
+    if raw:
+        return
+    for field_name in images.IMAGE_FIELDS[sender._meta.label]:
+        if images.needs_variants(instance, field_name):
+            tasks.run_after_commit(
+                images.generate_variants, sender._meta.label, instance.pk, field_name
+            )
+
+
+# --- Response Cache ---
+
+# Rows that are shown on the cached page of another row (see response_cache.py).
+_SHOWN_ON = {
+    Lesson: ("users.Studio", "studio_id"),
+    StudioRating: ("users.Studio", "studio_id"),
+    Comment: ("users.Post", "post_id"),
+}
+
+
+@receiver([post_save, post_delete], sender=Studio)
+@receiver([post_save, post_delete], sender=Lesson)
+@receiver([post_save, post_delete], sender=Post)
+@receiver([post_save, post_delete], sender=Comment)
+@receiver([post_save, post_delete], sender=StudioRating)
+@receiver([post_save, post_delete], sender=Tag)
+@receiver([post_save, post_delete], sender=Profile)
+@receiver([post_save, post_delete], sender=User)
+def uncache_on_change(sender, instance, **kwargs):
+    response_cache.bump(sender._meta.label, instance.pk)
+    if sender in _SHOWN_ON:
+        label, attname = _SHOWN_ON[sender]
+        response_cache.bump(label, getattr(instance, attname))
+
+
+@receiver(m2m_changed, sender=Studio.tags.through)
+@receiver(m2m_changed, sender=Lesson.tags.through)
+@receiver(m2m_changed, sender=Post.tags.through)
+@receiver(m2m_changed, sender=Studio.subscribers.through)
+@receiver(m2m_changed, sender=Post.likes.through)
+def uncache_on_m2m_changed(sender, instance, action, reverse, model, pk_set, **kwargs):
+    if not action.startswith("post_"):
+        return
+    if not reverse:
+        uncache_on_change(type(instance), instance)
+    elif pk_set:
+        for pk in pk_set:
+            response_cache.bump(model._meta.label, pk)
+    else:
+        # A clear() from the Tag or User side: every cached page depends on the
+        # whole model (see response_cache.SHARED_DEPENDENCIES).
+        uncache_on_change(type(instance), instance)
+
+
+# --- Authentication Cache ---
+
+
+@receiver([post_save, post_delete], sender=User)
+def forget_auth_snapshots_of_user(sender, instance, **kwargs):
+    authentication.snapshots.forget_user(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def forget_auth_snapshots_of_profile(sender, instance, **kwargs):
+    authentication.snapshots.forget_user(instance.user_id)
+
+
+@receiver([post_save, post_delete], sender=Studio)
+def forget_auth_snapshots_of_studio(sender, instance, **kwargs):
+    authentication.snapshots.forget_user(instance.owner_id)
@@ -0,0 +1,100 @@
+# backend/users/storage.py
+"""
+A deduplicating, content-addressed storage backend for user uploads.
+
+Files are stored under their SHA-256 (blobs/ab/abcdef....jpeg), so uploading the
+same bytes twice (the same profile picture, a re-uploaded cover) keeps a single
+copy on disk. Each blob has a MediaBlob row, and any number of file fields may
+point at it, so delete() leaves blobs alone: collect_orphaned_media (cleanup.py)
+is the only thing that removes them, once no field refers to them any more.
+
+Files saved before this backend existed keep their old names and behave exactly
+as with FileSystemStorage.
+"""
+import hashlib
+import os
+import uuid
+
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+
+from .models import MediaBlob
+
+BLOB_DIR = "blobs"
+
+
+def file_sha256(content):
+    """Returns (sha256 hex digest, size) of a Django File, reading it in chunks."""
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in content.chunks():
+        digest.update(chunk)
+        size += len(chunk)
+    return digest.hexdigest(), size
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    def blob_name(self, digest, name):
+        _, extension = os.path.splitext(name)
+        return f"{BLOB_DIR}/{digest[:2]}/{digest}{extension.lower()}"
+
+    def get_available_name(self, name, max_length=None):
+        # Names come from the content, so there is nothing to make unique here.
+        return name
+
+    def _save(self, name, content):
+        # Callers that already hashed the file (e.g. uploads.finalize) pass it along.
+        digest = getattr(content, "sha256", None)
+        if digest:
+            size = content.size
+        else:
+            digest, size = file_sha256(content)
+
+        with transaction.atomic():
+            blob, created = MediaBlob.objects.select_for_update().get_or_create(
+                sha256=digest,
+                defaults={"name": self.blob_name(digest, name), "size": size},
+            )
+            # A new row always gets its bytes written, even if a file is on disk:
+            # it may be one collect_orphaned_media is about to remove.
+            if created or not self.exists(blob.name):
+                self._write_blob(blob.name, content)
+            else:
+                self._touch(blob.name)
+        return blob.name
+
+    def _write_blob(self, name, content):
+        # FileSystemStorage._save() opens with O_EXCL and retries under a new name
+        # when the file exists, which a blob (whose name is fixed) never gets. So
+        # the bytes go to a unique temporary name that is then renamed over the
+        # blob: a concurrent save of the same bytes just replaces an identical file.
+        temp_name = f"{name}.{uuid.uuid4().hex}.tmp"
+        super()._save(temp_name, content)
+        os.replace(self.path(temp_name), self.path(name))
+
+    def delete(self, name):
+        if name.startswith(f"{BLOB_DIR}/"):
+            return  # other fields may share it; collect_orphaned_media reclaims it
+        # A file saved before this backend.
+        super().delete(name)
+
+    def stored_blob(self, digest):
+        """Returns the MediaBlob with this SHA-256 if its file is stored, else None."""
+        blob = MediaBlob.objects.filter(sha256=digest).first()
+        return blob if blob is not None and self.exists(blob.name) else None
+
+    def link(self, blob):
+        """
+        Reuses an already stored blob, for a file field that points at it without
+        uploading the bytes again. Returns the name to store in the field.
+        """
+        self._touch(blob.name)
+        return blob.name
+
+    def _touch(self, name):
+        # A reused blob counts as new for collect_orphaned_media's grace period,
+        # so it isn't collected before the field pointing at it is saved.
+        try:
+            os.utime(self.path(name))
+        except FileNotFoundError:
+            pass
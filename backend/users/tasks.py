@@ -0,0 +1,60 @@
+# backend/users/tasks.py
+"""
+A tiny background runner for work that must not scale the HTTP request with it
+(e.g. inviting every subscriber of a studio).
+
+Jobs run on a small thread pool once the current transaction commits, so they
+always see the rows the request created. Set BACKGROUND_TASKS_EAGER = True to
+run them inline instead (handy in tests and management commands).
+"""
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(
+                max_workers=settings.BACKGROUND_TASK_WORKERS,
+                thread_name_prefix="users-tasks",
+            )
+        return _executor
+
+
+def _run(func, args, kwargs):
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", func.__name__)
+    finally:
+        # Each worker thread has its own DB connection, which we must not leak.
+        close_old_connections()
+
+
+def run_after_commit(func, *args, **kwargs):
+    """
+    Schedules `func(*args, **kwargs)` to run in the background after the commit.
+    Pass IDs rather than model instances, since the job runs in another thread.
+    """
+    if getattr(settings, "BACKGROUND_TASKS_EAGER", False):
+        transaction.on_commit(lambda: func(*args, **kwargs))
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_run, func, args, kwargs))
+
+
+def run_soon(func, *args, **kwargs):
+    """
+    Runs `func(*args, **kwargs)` in the background right away, whatever the current
+    transaction. Only for jobs that don't depend on rows the caller is writing.
+    """
+    _get_executor().submit(_run, func, args, kwargs)
@@ -0,0 +1,91 @@
+# backend/users/tests/test_authentication.py
+from types import SimpleNamespace
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from users.authentication import CachedJWTAuthentication, snapshots
+from users.models import Profile, Studio
+from users.serializers import ProfileUpdateSerializer
+
+
+class CachedJWTAuthenticationTest(APITestCase):
+    """
+    Test suite for the cached user lookups of CachedJWTAuthentication.
+    """
+
+    def setUp(self):
+        snapshots.clear()
+        self.user = User.objects.create_user(username="teacher", password="pw123456")
+        self.profile = Profile.objects.create(user=self.user)
+        self.studio = Studio.objects.create(owner=self.user, name="S", description="")
+        self.token = AccessToken.for_user(self.user)
+        self.authenticator = CachedJWTAuthentication()
+
+    def authenticate(self):
+        return self.authenticator.get_user(self.token)
+
+    def test_repeated_tokens_need_no_queries(self):
+        self.authenticate()
+
+        with CaptureQueriesContext(connection) as queries:
+            user = self.authenticate()
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual((user.pk, user.username), (self.user.pk, "teacher"))
+        self.assertEqual(user.profile_id, self.profile.pk)
+        self.assertEqual(user.studio_id, self.studio.pk)
+        self.assertTrue(user.is_teacher)
+
+    def test_changes_to_the_user_drop_the_snapshot(self):
+        self.authenticate()
+
+        # --- ACT ---
+        self.studio.delete()
+        self.user.username = "renamed"
+        self.user.save()
+
+        # --- ASSERT ---
+        user = self.authenticate()
+        self.assertEqual(user.username, "renamed")
+        self.assertIsNone(user.studio_id)
+        self.assertFalse(user.is_teacher)
+
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(
+            "/api/auth/user/", HTTP_AUTHORIZATION=f"Bearer {self.token}"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_requests_get_a_fresh_user_instance(self):
+        first = self.authenticate()
+        first.username = "changed in memory"
+
+        self.assertEqual(self.authenticate().username, "teacher")
+
+    def test_renaming_a_snapshot_user_keeps_newer_fields(self):
+        # --- ARRANGE ---
+        user = self.authenticate()
+        # Another process changes the user: this process's snapshot doesn't hear of it.
+        User.objects.filter(pk=self.user.pk).update(email="new@example.com")
+        profile = Profile.objects.get(pk=self.profile.pk)
+        profile.user = user
+
+        # --- ACT ---
+        serializer = ProfileUpdateSerializer(
+            instance=profile,
+            data={"username": "renamed"},
+            partial=True,
+            context={"request": SimpleNamespace(user=user)},
+        )
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        serializer.save()
+
+        # --- ASSERT ---
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.username, "renamed")
+        self.assertEqual(self.user.email, "new@example.com")
@@ -0,0 +1,105 @@
+# backend/users/tests/test_cleanup.py
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from users import cleanup
+from users.models import Lesson, MediaBlob, Studio
+
+MEDIA_ROOT = tempfile.mkdtemp()
+QUARANTINE = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT)
+class CollectOrphanedMediaTest(TestCase):
+    """
+    Test suite for the collect_orphaned_media command.
+    """
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(QUARANTINE, ignore_errors=True)
+
+    def setUp(self):
+        teacher = User.objects.create_user(username="teacher", password="pw123456")
+        studio = Studio.objects.create(owner=teacher, name="Studio", description="")
+        self.lesson = Lesson.objects.create(studio=studio, title="Notes")
+
+        self.lesson.lesson_file.save("v1.pdf", ContentFile(b"first draft"))
+        self.replaced = self.lesson.lesson_file.name
+        # Replacing the file leaves the first version on disk.
+        self.lesson.lesson_file.save("v2.pdf", ContentFile(b"final version"))
+        self.kept = self.lesson.lesson_file.name
+
+        self.stray = os.path.join(MEDIA_ROOT, "lesson_files", "deleted-lesson.pdf")
+        os.makedirs(os.path.dirname(self.stray), exist_ok=True)
+        with open(self.stray, "wb") as f:
+            f.write(b"left behind")
+
+        self.path = lambda name: os.path.join(MEDIA_ROOT, name)
+        self.age(self.path(self.replaced), self.path(self.kept), self.stray)
+
+    def tearDown(self):
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        os.makedirs(MEDIA_ROOT)
+
+    def age(self, *paths, days=30):
+        old = time.time() - days * 86400
+        for path in paths:
+            os.utime(path, (old, old))
+
+    def collect(self, *args):
+        out = StringIO()
+        call_command("collect_orphaned_media", *args, stdout=out)
+        return out.getvalue()
+
+    def test_dry_run_only_reports(self):
+        output = self.collect()
+
+        self.assertIn("Dry run: 2 orphaned files, 22 bytes reclaimable.", output)
+        self.assertTrue(os.path.exists(self.path(self.replaced)))
+        self.assertTrue(os.path.exists(self.stray))
+
+    def test_delete_removes_orphans_and_their_blobs(self):
+        # --- ACT ---
+        output = self.collect("--delete")
+
+        # --- ASSERT ---
+        self.assertIn("Deleted 2 orphaned files", output)
+        self.assertFalse(os.path.exists(self.path(self.replaced)))
+        self.assertFalse(os.path.exists(self.stray))
+        self.assertTrue(os.path.exists(self.path(self.kept)))
+        self.assertEqual(
+            list(MediaBlob.objects.values_list("name", flat=True)), [self.kept]
+        )
+
+    def test_recent_files_are_kept_and_quarantine_keeps_names(self):
+        self.age(self.stray, days=1)
+
+        self.collect("--quarantine", QUARANTINE)
+
+        self.assertTrue(os.path.exists(self.stray))
+        self.assertTrue(os.path.exists(os.path.join(QUARANTINE, self.replaced)))
+
+    def test_blob_saved_again_after_the_scan_is_kept(self):
+        # --- ARRANGE ---
+        path = self.path(self.replaced)
+        older_than = time.time() - 7 * 86400
+        # Someone uploads the same bytes between the scan and the removal.
+        self.lesson.lesson_file.save("v1-again.pdf", ContentFile(b"first draft"))
+
+        # --- ACT ---
+        removed = cleanup.remove_orphan(self.replaced, path, older_than=older_than)
+
+        # --- ASSERT ---
+        self.assertFalse(removed)
+        self.assertTrue(os.path.exists(path))
+        self.assertTrue(MediaBlob.objects.filter(name=self.replaced).exists())
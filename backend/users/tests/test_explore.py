@@ -0,0 +1,241 @@
+# backend/users/tests/test_explore.py
+import base64
+import json
+
+from rest_framework.test import APITestCase
+from rest_framework import status
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from users.models import Lesson, Profile, Studio, StudioRating, Tag
+
+
+class ExploreSearchAPITest(APITestCase):
+    """
+    Test suite for the full-text search behind the Explore page.
+    """
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username="teacher", password="pw123456")
+        self.other_teacher = User.objects.create_user(
+            username="other", password="pw123456"
+        )
+        self.python_studio = Studio.objects.create(
+            owner=self.teacher,
+            name="Python Basics",
+            description="Learn variables, loops and functions.",
+        )
+        self.art_studio = Studio.objects.create(
+            owner=self.other_teacher,
+            name="Drawing Club",
+            description="Sketching for people who also like python scripts.",
+        )
+
+    def search(self, query, search_type="studio"):
+        response = self.client.get("/api/explore/", {"type": search_type, "q": query})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item["id"] for item in response.data["results"]]  # type: ignore
+
+    def test_matches_are_ranked_by_relevance(self):
+        """
+        A match in the name should rank above a match in the description.
+        """
+        self.assertEqual(
+            self.search("python"), [self.python_studio.id, self.art_studio.id]
+        )
+
+    def test_terms_are_matched_as_prefixes(self):
+        self.assertEqual(self.search("sketch"), [self.art_studio.id])
+        self.assertEqual(self.search("draw clu"), [self.art_studio.id])
+
+    def test_index_follows_updates_and_tag_changes(self):
+        # Renaming a studio replaces its old search document.
+        self.art_studio.name = "Painting Club"
+        self.art_studio.save()
+        self.assertEqual(self.search("drawing"), [])
+        self.assertEqual(self.search("painting"), [self.art_studio.id])
+
+        # Adding a tag makes the studio searchable by that tag.
+        self.python_studio.tags.add(Tag.objects.create(name="programming"))
+        self.assertEqual(self.search("programming"), [self.python_studio.id])
+
+        # Deleting a studio removes it from the index.
+        self.python_studio.delete()
+        self.assertEqual(self.search("programming"), [])
+
+    def test_deleted_rows_take_their_search_documents_along(self):
+        if connection.vendor != "sqlite":
+            self.skipTest("PostgreSQL keeps the document in the row itself.")
+        lesson = Lesson.objects.create(studio=self.python_studio, title="Intro")
+        documents = (
+            ("users_studio_fts", self.python_studio.pk),
+            ("users_lesson_fts", lesson.pk),
+        )
+
+        def count(table, pk):
+            with connection.cursor() as cursor:
+                cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE rowid = %s", [pk])
+                return cursor.fetchone()[0]
+
+        self.assertEqual([count(*document) for document in documents], [1, 1])
+        # Deleting the studio cascades to its lessons.
+        self.python_studio.delete()
+        self.assertEqual([count(*document) for document in documents], [0, 0])
+
+    def test_course_search_covers_description_and_tags(self):
+        lesson = Lesson.objects.create(
+            studio=self.python_studio,
+            title="Intro",
+            description="A gentle introduction to recursion.",
+        )
+        lesson.tags.add(Tag.objects.create(name="algorithms"))
+
+        self.assertEqual(self.search("recursion", "course"), [lesson.id])
+        self.assertEqual(self.search("algorithms", "course"), [lesson.id])
+        self.assertEqual(self.search("!!!", "course"), [])
+
+
+class ExplorePaginationAPITest(APITestCase):
+    """
+    Test suite for the cursor pagination of the Explore page.
+    """
+
+    def setUp(self):
+        for i in range(5):
+            owner = User.objects.create_user(username=f"teacher{i}", password="pw123456")
+            Studio.objects.create(owner=owner, name=f"Studio {i}", description="")
+
+    def test_pages_follow_the_next_cursor_without_gaps(self):
+        # --- ARRANGE ---
+        expected = list(
+            Studio.objects.order_by("-created_at", "-id").values_list("id", flat=True)
+        )
+        seen = []
+        params = {"type": "studio", "limit": 2}
+
+        # --- ACT ---
+        while True:
+            response = self.client.get("/api/explore/", params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertLessEqual(len(response.data["results"]), 2)  # type: ignore
+            seen += [item["id"] for item in response.data["results"]]  # type: ignore
+            if not response.data["next"]:  # type: ignore
+                break
+            params["cursor"] = response.data["next"]  # type: ignore
+
+        # --- ASSERT ---
+        self.assertEqual(seen, expected)
+
+    def test_search_results_page_by_rank_without_gaps(self):
+        # Every studio matches "studio" equally well, so the pages rely on the
+        # cursor's rank comparing equal to the rank of the next query.
+        seen = []
+        params = {"type": "studio", "q": "studio", "limit": 2}
+        while True:
+            response = self.client.get("/api/explore/", params)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            seen += [item["id"] for item in response.data["results"]]  # type: ignore
+            if not response.data["next"]:  # type: ignore
+                break
+            params["cursor"] = response.data["next"]  # type: ignore
+
+        expected = Studio.objects.values_list("id", flat=True)
+        self.assertEqual(sorted(seen), sorted(expected))
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_limit_is_capped_and_bad_cursors_are_rejected(self):
+        response = self.client.get("/api/explore/", {"type": "teacher", "limit": 10000})
+        self.assertEqual(len(response.data["results"]), 5)  # type: ignore
+
+        response = self.client.get("/api/explore/", {"cursor": "not-a-cursor"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        # Well-formed cursors with values that don't fit the sort fields.
+        for values in (["yesterday", 1], ["2026-01-01T00:00:00+00:00", "x"], [None, 1]):
+            cursor = base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+            response = self.client.get("/api/explore/", {"cursor": cursor})
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class ExploreTagFilterAPITest(APITestCase):
+    """
+    Test suite for the server-side tag filters and tag facets of the Explore page.
+    """
+
+    def setUp(self):
+        python, django, art = (
+            Tag.objects.create(name=name) for name in ("python", "django", "art")
+        )
+        self.studios = {}
+        for name, tags in (
+            ("web", [python, django]),
+            ("scripting", [python]),
+            ("drawing", [art]),
+        ):
+            owner = User.objects.create_user(username=name, password="pw123456")
+            studio = Studio.objects.create(owner=owner, name=name, description="")
+            studio.tags.set(tags)
+            self.studios[name] = studio.id
+
+    def explore(self, **params):
+        response = self.client.get("/api/explore/", {"type": "studio", **params})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data  # type: ignore
+
+    def test_all_mode_requires_every_tag(self):
+        data = self.explore(tags=["python", "django"])
+        self.assertEqual([s["id"] for s in data["results"]], [self.studios["web"]])
+
+        data = self.explore(tags=["python", "unknown"])
+        self.assertEqual(data["results"], [])
+
+    def test_any_mode_accepts_one_of_the_tags(self):
+        data = self.explore(tags=["django", "art"], tag_mode="any")
+        self.assertEqual(
+            {s["id"] for s in data["results"]},
+            {self.studios["web"], self.studios["drawing"]},
+        )
+
+    def test_facets_count_tags_across_the_result_set(self):
+        data = self.explore(tags=["python"], limit=1)
+        self.assertEqual(
+            data["facets"], [{"name": "python", "count": 2}, {"name": "django", "count": 1}]
+        )
+
+        # Facets are only computed for the first page.
+        self.assertNotIn("facets", self.explore(tags=["python"], cursor=data["next"]))
+
+
+class ExploreQueryCountTest(APITestCase):
+    """
+    Ensures the Explore page costs the same number of queries however many cards it shows.
+    """
+
+    def add_studio(self, i):
+        owner = User.objects.create_user(username=f"teacher{i}", password="pw123456")
+        Profile.objects.create(user=owner)
+        studio = Studio.objects.create(owner=owner, name=f"Studio {i}", description="")
+        studio.tags.add(Tag.objects.get_or_create(name=f"tag{i % 3}")[0])
+        studio.subscribers.add(self.student)
+        StudioRating.objects.create(studio=studio, user=self.student, rating=4)
+        Lesson.objects.create(studio=studio, title=f"Lesson {i}").tags.add(
+            *studio.tags.all()
+        )
+
+    def count_queries(self, search_type):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/explore/", {"type": search_type})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_the_page(self):
+        self.student = User.objects.create_user(username="student", password="pw123456")
+        for i in range(2):
+            self.add_studio(i)
+        small = {t: self.count_queries(t) for t in ("studio", "course", "teacher")}
+
+        for i in range(2, 8):
+            self.add_studio(i)
+        large = {t: self.count_queries(t) for t in ("studio", "course", "teacher")}
+
+        self.assertEqual(small, large)
@@ -0,0 +1,76 @@
+# backend/users/tests/test_images.py
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import override_settings
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.models import Studio
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+def make_image(width, height, name="cover.png"):
+    buffer = io.BytesIO()
+    Image.new("RGBA", (width, height), (200, 30, 30, 255)).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT, BACKGROUND_TASKS_EAGER=True, IMAGE_VARIANT_WORKERS=0
+)
+class ImageVariantsTest(APITestCase):
+    """
+    Test suite for the resized variants of cover images and profile pictures.
+    """
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username="teacher", password="pw123456")
+
+    def create_studio(self, cover):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Studio.objects.create(
+                owner=self.teacher, name="Studio", description="", cover_image=cover
+            )
+
+    def test_variants_are_rendered_below_the_original_size(self):
+        studio = self.create_studio(make_image(800, 400))
+
+        studio.refresh_from_db()
+        sizes = studio.cover_image_variants["sizes"]
+        self.assertEqual(sorted(sizes), ["200", "480"])
+        with studio.cover_image.storage.open(sizes["200"]["webp"]) as f:
+            with Image.open(f) as thumbnail:
+                self.assertEqual(thumbnail.size, (200, 100))
+                self.assertEqual(thumbnail.format, "WEBP")
+
+    def test_cards_expose_the_variant_urls(self):
+        self.create_studio(make_image(600, 600))
+
+        response = self.client.get("/api/explore/", {"type": "studio"})
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        variants = response.data["results"][0]["cover_image_variants"]  # type: ignore
+        self.assertEqual(sorted(variants), ["200", "480"])
+        self.assertTrue(variants["200"]["jpeg"].endswith(".jpeg"))
+
+    def test_replaced_images_drop_their_stale_variants(self):
+        studio = self.create_studio(make_image(600, 600))
+        studio.refresh_from_db()
+
+        # A new cover too small to need variants: the old ones must not be served.
+        studio.cover_image = make_image(100, 100, name="small.png")
+        with self.captureOnCommitCallbacks(execute=True):
+            studio.save()
+
+        response = self.client.get(f"/api/studios/{studio.id}/")
+        self.assertEqual(response.data["cover_image_variants"], {})  # type: ignore
@@ -0,0 +1,299 @@
+# backend/users/tests/test_invitations.py
+import asyncio
+import json
+from datetime import timedelta
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APIClient, APITestCase
+from rest_framework_simplejwt.tokens import AccessToken
+from users.events import get_broker
+from users.models import Invitation, Meeting, Studio
+
+
+class RecordingBroker:
+    """A broker that only remembers what was published, for the tests below."""
+
+    def __init__(self):
+        self.published = []
+
+    def publish(self, user_id, event):
+        self.published.append((user_id, event["type"]))
+
+
+@override_settings(
+    INVITATION_EVENT_BROKER="users.tests.test_invitations.RecordingBroker"
+)
+class InvitationEventsAPITest(APITestCase):
+    """
+    Test suite for the invitation events published by the meeting views.
+    """
+
+    def setUp(self):
+        self.host = User.objects.create_user(username="host", password="pw123456")
+        self.guest = User.objects.create_user(username="guest", password="pw123456")
+        self.broker = get_broker()
+        self.broker.published.clear()
+
+    def test_events_are_published_once_the_transaction_commits(self):
+        self.client.force_authenticate(user=self.host)  # type: ignore
+
+        # --- ACT ---
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                "/api/meetings/create/",
+                {"title": "Sync", "invitees": ["guest"]},
+                format="json",
+            )
+        invitation = Invitation.objects.get(invitee=self.guest)
+
+        self.client.force_authenticate(user=self.guest)  # type: ignore
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/api/invitations/{invitation.id}/update/",
+                {"status": "accepted"},
+                format="json",
+            )
+
+        # --- ASSERT ---
+        self.assertEqual(
+            sorted(self.broker.published),
+            sorted(
+                [
+                    (self.guest.id, "invitation.created"),
+                    (self.guest.id, "invitation.updated"),
+                    (self.host.id, "invitation.updated"),
+                ]
+            ),
+        )
+
+    def test_polling_fallback_supports_since(self):
+        meeting = Meeting.objects.create(host=self.host, title="Sync")
+        old = Invitation.objects.create(meeting=meeting, invitee=self.guest)
+        Invitation.objects.filter(pk=old.pk).update(
+            created_at=old.created_at - timedelta(hours=1)
+        )
+        other = Meeting.objects.create(host=self.host, title="Retro")
+        new = Invitation.objects.create(meeting=other, invitee=self.guest)
+        self.client.force_authenticate(user=self.guest)  # type: ignore
+
+        since = (new.created_at - timedelta(minutes=1)).isoformat()
+        response = self.client.get("/api/invitations/", {"since": since})
+        self.assertEqual([i["id"] for i in response.data], [new.id])  # type: ignore
+
+        response = self.client.get("/api/invitations/", {"since": "yesterday"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+@override_settings(
+    INVITATION_EVENT_BROKER="users.tests.test_invitations.RecordingBroker",
+    BACKGROUND_TASKS_EAGER=True,
+)
+class BulkInvitationAPITest(APITestCase):
+    """
+    Test suite for the bulk invitations of meeting_create_view.
+    """
+
+    def setUp(self):
+        self.host = User.objects.create_user(username="host", password="pw123456")
+        self.students = [
+            User.objects.create_user(username=f"student{i}", password="pw123456")
+            for i in range(6)
+        ]
+        self.client.force_authenticate(user=self.host)  # type: ignore
+
+    def create_meeting(self, **data):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                "/api/meetings/create/", {"title": "Class", **data}, format="json"
+            )
+        return response
+
+    def test_query_count_does_not_grow_with_the_invitee_list(self):
+        # Warms up the host's cached profile/studio lookups, shared by both requests.
+        self.create_meeting(invitees=["student0"])
+
+        with CaptureQueriesContext(connection) as small:
+            self.create_meeting(invitees=["student0"])
+        with CaptureQueriesContext(connection) as large:
+            self.create_meeting(invitees=[s.username for s in self.students] + ["host"])
+
+        self.assertEqual(len(small), len(large))
+        # The host is never invited to their own meeting.
+        self.assertEqual(Invitation.objects.filter(invitee=self.host).count(), 0)
+        self.assertEqual(Invitation.objects.count(), 2 + len(self.students))
+
+    def test_invite_subscribers_reaches_the_whole_studio_once(self):
+        studio = Studio.objects.create(owner=self.host, name="Class", description="")
+        studio.subscribers.add(*self.students[:4])
+
+        response = self.create_meeting(
+            invitees=["student0", "student5"], invite_subscribers=True
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        invitees = Invitation.objects.filter(
+            meeting_id=response.data["id"]  # type: ignore
+        ).values_list("invitee__username", flat=True)
+        self.assertEqual(
+            sorted(invitees), ["student0", "student1", "student2", "student3", "student5"]
+        )
+
+    @override_settings(
+        INVITATION_EVENT_BROKER="users.tests.test_invitations.RecordingBroker"
+    )
+    def test_invitees_are_notified_once(self):
+        # --- ARRANGE ---
+        studio = Studio.objects.create(owner=self.host, name="Class", description="")
+        studio.subscribers.add(self.students[0], self.students[1])
+        broker = get_broker()
+        broker.published.clear()
+
+        # --- ACT ---
+        # student0 is invited by name, then again as a subscriber.
+        self.create_meeting(invitees=["student0"], invite_subscribers=True)
+
+        # --- ASSERT ---
+        self.assertEqual(
+            sorted(broker.published),
+            [
+                (self.students[0].id, "invitation.created"),
+                (self.students[1].id, "invitation.created"),
+            ],
+        )
+
+    def test_invite_subscribers_requires_a_studio(self):
+        response = self.create_meeting(invite_subscribers=True)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class InvitationCountAPITest(APITestCase):
+    """
+    Test suite for the cached unread-invitation counter and its conditional GET.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.host = User.objects.create_user(username="host", password="pw123456")
+        self.guest = User.objects.create_user(username="guest", password="pw123456")
+        token = AccessToken.for_user(self.guest)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")  # type: ignore
+
+    def invite(self):
+        host_client = APIClient()
+        host_client.force_authenticate(user=self.host)
+        with self.captureOnCommitCallbacks(execute=True):
+            host_client.post(
+                "/api/meetings/create/",
+                {"title": "Sync", "invitees": ["guest"]},
+                format="json",
+            )
+
+    def unread(self):
+        return self.client.get("/api/invitations/count/").data["unread"]  # type: ignore
+
+    def test_unchanged_count_answers_not_modified_without_queries(self):
+        self.invite()
+        response = self.client.get("/api/invitations/count/")
+        self.assertEqual(response.data, {"unread": 1})  # type: ignore
+        etag = response["ETag"]
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get("/api/invitations/count/", HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(len(queries), 0)
+
+    def test_new_and_answered_invitations_invalidate_the_count(self):
+        self.assertEqual(self.unread(), 0)
+
+        self.invite()
+        self.assertEqual(self.unread(), 1)
+
+        invitation = Invitation.objects.get(invitee=self.guest)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(
+                f"/api/invitations/{invitation.id}/update/",
+                {"status": "declined"},
+                format="json",
+            )
+        self.assertEqual(self.unread(), 0)
+
+
+class InvitationStreamTest(APITestCase):
+    """
+    Test suite for the Server-Sent Events stream of invitation events.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="guest", password="pw123456")
+
+    def ticket(self, token=None):
+        token = token or AccessToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {token}")  # type: ignore
+        response = self.client.post("/api/invitations/stream/ticket/")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return response.data["ticket"]  # type: ignore
+
+    async def test_stream_requires_a_valid_ticket(self):
+        response = await self.async_client.get(
+            "/api/invitations/stream/", {"ticket": "nope"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # Access tokens aren't accepted in the query string.
+        token = await sync_to_async(AccessToken.for_user)(self.user)
+        response = await self.async_client.get(
+            "/api/invitations/stream/", {"token": str(token)}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_tickets_are_single_use(self):
+        ticket = await sync_to_async(self.ticket)()
+
+        response = await self.async_client.get(
+            "/api/invitations/stream/", {"ticket": ticket}
+        )
+        await response.streaming_content.aclose()  # type: ignore
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = await self.async_client.get(
+            "/api/invitations/stream/", {"ticket": ticket}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    async def test_stream_ends_when_the_token_expires(self):
+        token = await sync_to_async(AccessToken.for_user)(self.user)
+        token.set_exp(lifetime=timedelta(seconds=1))
+        ticket = await sync_to_async(self.ticket)(token)
+
+        response = await self.async_client.get(
+            "/api/invitations/stream/", {"ticket": ticket}
+        )
+        chunks = [chunk async for chunk in response.streaming_content]  # type: ignore
+
+        self.assertEqual(chunks, [b"retry: 5000\n\n"])
+
+    async def test_stream_delivers_published_events(self):
+        ticket = await sync_to_async(self.ticket)()
+
+        response = await self.async_client.get(
+            "/api/invitations/stream/", {"ticket": ticket}
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        stream = aiter(response.streaming_content)
+
+        # The first chunk is sent as soon as the subscription is open.
+        self.assertEqual(await anext(stream), b"retry: 5000\n\n")
+        get_broker().publish(
+            self.user.id, {"type": "invitation.created", "data": {"id": 7}}
+        )
+        chunk = await asyncio.wait_for(anext(stream), timeout=5)
+        await stream.aclose()
+
+        event, data = chunk.decode().strip().split("\n")
+        self.assertEqual(event, "event: invitation.created")
+        self.assertEqual(json.loads(data.removeprefix("data: ")), {"id": 7})
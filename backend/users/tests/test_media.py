@@ -0,0 +1,120 @@
+# backend/users/tests/test_media.py
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+from rest_framework import status
+
+MEDIA_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, MEDIA_OFFLOAD="")
+class MediaServingTest(SimpleTestCase):
+    """
+    Test suite for the media view: byte ranges, validators and proxy offload.
+    """
+
+    payload = bytes(range(256)) * 4
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        os.makedirs(os.path.join(MEDIA_ROOT, "lesson_videos"), exist_ok=True)
+        with open(os.path.join(MEDIA_ROOT, "lesson_videos", "intro.mp4"), "wb") as f:
+            f.write(cls.payload)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+
+    def get(self, **headers):
+        return self.client.get("/media/lesson_videos/intro.mp4", headers=headers)
+
+    def body(self, response):
+        return b"".join(response.streaming_content)
+
+    def test_whole_file_advertises_ranges_and_validators(self):
+        response = self.get()
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.body(response), self.payload)
+        self.assertEqual(response["Content-Type"], "video/mp4")
+        self.assertEqual(response["Accept-Ranges"], "bytes")
+        self.assertEqual(int(response["Content-Length"]), len(self.payload))
+        self.assertIn("ETag", response)
+        self.assertIn("Last-Modified", response)
+
+    def test_byte_ranges(self):
+        # --- ACT ---
+        middle = self.get(Range="bytes=100-199")
+        tail = self.get(Range="bytes=-24")
+        open_ended = self.get(Range="bytes=1000-")
+
+        # --- ASSERT ---
+        self.assertEqual(middle.status_code, status.HTTP_206_PARTIAL_CONTENT)
+        self.assertEqual(middle["Content-Range"], "bytes 100-199/1024")
+        self.assertEqual(middle["Content-Length"], "100")
+        self.assertEqual(self.body(middle), self.payload[100:200])
+        self.assertEqual(self.body(tail), self.payload[-24:])
+        self.assertEqual(open_ended["Content-Range"], "bytes 1000-1023/1024")
+        self.assertEqual(self.body(open_ended), self.payload[1000:])
+
+    def test_unsatisfiable_range(self):
+        response = self.get(Range="bytes=2048-")
+
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response["Content-Range"], "bytes */1024")
+
+    def test_conditional_requests(self):
+        etag = self.get()["ETag"]
+
+        self.assertEqual(
+            self.get(**{"If-None-Match": etag}).status_code,
+            status.HTTP_304_NOT_MODIFIED,
+        )
+        # A stale If-Range turns the range request into a full download.
+        response = self.get(Range="bytes=0-9", **{"If-Range": '"stale"'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.body(response), self.payload)
+        response = self.get(Range="bytes=0-9", **{"If-Range": etag})
+        self.assertEqual(response.status_code, status.HTTP_206_PARTIAL_CONTENT)
+
+    @override_settings(MEDIA_OFFLOAD="x-accel-redirect")
+    def test_offload_hands_the_transfer_to_the_proxy(self):
+        response = self.get(Range="bytes=0-9")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response["X-Accel-Redirect"], "/protected-media/lesson_videos/intro.mp4"
+        )
+        self.assertEqual(response.content, b"")
+
+    def test_paths_outside_media_root_are_not_served(self):
+        response = self.client.get("/media/../config/settings.py")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get("/media/lesson_videos/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_blobs_get_their_digest_as_etag(self):
+        # --- ARRANGE ---
+        digest = hashlib.sha256(self.payload).hexdigest()
+        name = f"blobs/{digest[:2]}/{digest}.mp4"
+        os.makedirs(os.path.join(MEDIA_ROOT, os.path.dirname(name)), exist_ok=True)
+        with open(os.path.join(MEDIA_ROOT, name), "wb") as f:
+            f.write(self.payload)
+
+        # --- ACT ---
+        response = self.client.get(f"/media/{name}")
+        # Reusing the blob touches the file, which must not invalidate caches.
+        os.utime(os.path.join(MEDIA_ROOT, name), (0, 0))
+        revalidated = self.client.get(
+            f"/media/{name}", headers={"If-None-Match": f'"{digest}"'}
+        )
+
+        # --- ASSERT ---
+        self.assertEqual(response["ETag"], f'"{digest}"')
+        self.assertIn("immutable", response["Cache-Control"])
+        self.assertEqual(revalidated.status_code, status.HTTP_304_NOT_MODIFIED)
@@ -0,0 +1,93 @@
+# backend/users/tests/test_metrics.py
+import json
+import os
+import shutil
+import tempfile
+
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users import metrics
+
+
+@override_settings(
+    METRICS_ENABLED=True, METRICS_TOKEN="scraper-secret", SERVER_TIMING_SAMPLE_RATE=0
+)
+class MetricsTest(APITestCase):
+    """
+    Test suite for the per-route Prometheus metrics.
+    """
+
+    def setUp(self):
+        metrics.reset()
+        self.addCleanup(metrics.reset)
+
+    def scrape(self):
+        response = self.client.get(
+            "/metrics", HTTP_AUTHORIZATION="Bearer scraper-secret"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.content.decode()
+
+    def test_requests_are_counted_by_route(self):
+        self.client.get("/api/explore/")
+        self.client.get("/api/explore/")
+        self.client.get("/api/invitations/count/")
+
+        text = self.scrape()
+
+        self.assertIn('http_requests_total{route="explore",method="GET"} 2', text)
+        self.assertIn(
+            'http_request_errors_total{route="explore",method="GET"} 0', text
+        )
+        self.assertIn(
+            'http_request_duration_seconds_bucket{route="explore",method="GET",'
+            'le="+Inf"} 2',
+            text,
+        )
+        self.assertIn(
+            'http_request_db_queries_count{route="explore",method="GET"} 2', text
+        )
+        # Unauthenticated, but still counted under its route.
+        self.assertIn(
+            'http_requests_total{route="invitation-count",method="GET"} 1', text
+        )
+
+    def test_totals_of_other_processes_are_added(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory, ignore_errors=True)
+        other = {
+            "buckets": [list(metrics.LATENCY_BUCKETS), list(metrics.QUERY_BUCKETS)],
+            "routes": [["explore", "GET", *metrics.RouteStats().to_list()]],
+        }
+        other["routes"][0][2] = 5  # requests
+        with open(os.path.join(directory, "1-1.json"), "w") as f:
+            json.dump(other, f)
+
+        with override_settings(METRICS_DIR=directory):
+            self.client.get("/api/explore/")
+            text = self.scrape()
+
+        self.assertIn('http_requests_total{route="explore",method="GET"} 6', text)
+        # This process wrote its own totals next to the other one's.
+        self.assertEqual(len(os.listdir(directory)), 2)
+
+    def test_unknown_methods_share_one_series(self):
+        self.client.generic("BREW", "/api/explore/")
+        self.client.generic("PROPFIND", "/api/explore/")
+
+        text = self.scrape()
+
+        self.assertIn('http_requests_total{route="explore",method="other"} 2', text)
+        self.assertNotIn("BREW", text)
+
+    def test_scrapes_need_the_token(self):
+        response = self.client.get("/metrics", HTTP_AUTHORIZATION="Bearer wrong")
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # Without a token configured, the endpoint doesn't exist.
+        with override_settings(METRICS_TOKEN=""):
+            response = self.client.get(
+                "/metrics", HTTP_AUTHORIZATION="Bearer scraper-secret"
+            )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
@@ -0,0 +1,101 @@
+# backend/users/tests/test_middleware.py
+import json
+
+from django.contrib.auth.models import User
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import JsonResponse
+from django.test import RequestFactory, TestCase, override_settings
+from rest_framework import serializers
+from rest_framework.test import APITestCase
+from users.middleware import QueryShapeMiddleware, RepeatedQueryError, query_shape
+from users.models import Studio
+
+
+class ServerTimingMiddlewareTest(APITestCase):
+    """
+    Test suite for the per-request timing header and log line.
+    """
+
+    def setUp(self):
+        teacher = User.objects.create_user(username="teacher", password="pw123456")
+        Studio.objects.create(owner=teacher, name="Studio", description="")
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=1)
+    def test_sampled_requests_report_their_timings(self):
+        with self.assertLogs("users.middleware", "INFO") as logs:
+            response = self.client.get("/api/explore/", {"q": "studio"})
+
+        metrics = dict(
+            metric.strip().split(";", 1)
+            for metric in response["Server-Timing"].split(",")
+        )
+        self.assertEqual(sorted(metrics), ["db", "render", "total"])
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record["route"], "explore")
+        self.assertEqual(record["status"], 200)
+        self.assertGreater(record["queries"], 0)
+        self.assertIn(f'desc="{record["queries"]} queries"', metrics["db"])
+
+    @override_settings(SERVER_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_left_alone(self):
+        response = self.client.get("/api/explore/")
+
+        self.assertFalse(response.has_header("Server-Timing"))
+
+
+class OwnerNameSerializer(serializers.ModelSerializer):
+    owner_name = serializers.SerializerMethodField()
+
+    class Meta:
+        model = Studio
+        fields = ["id", "owner_name"]
+
+    def get_owner_name(self, obj):
+        # One query per studio: the N+1 we want flagged.
+        return User.objects.get(pk=obj.owner_id).username
+
+
+def studio_names_view(request):
+    studios = Studio.objects.order_by("id")
+    return JsonResponse(OwnerNameSerializer(studios, many=True).data, safe=False)
+
+
+@override_settings(NPLUSONE_THRESHOLD=3, NPLUSONE_RAISE=False)
+class QueryShapeMiddlewareTest(TestCase):
+    """
+    Test suite for the N+1 query detector.
+    """
+
+    def setUp(self):
+        for i in range(5):
+            owner = User.objects.create_user(username=f"teacher{i}", password="pw")
+            Studio.objects.create(owner=owner, name=f"Studio {i}", description="")
+        self.middleware = QueryShapeMiddleware(studio_names_view)
+        self.request = RequestFactory().get("/studios/names/")
+
+    def test_query_shapes_ignore_values(self):
+        self.assertEqual(
+            query_shape("SELECT * FROM t WHERE id IN (%s, %s) AND name = 'x'"),
+            query_shape("SELECT *  FROM t WHERE id IN (%s) AND name = 'y'"),
+        )
+
+    def test_repeated_shapes_are_logged_with_their_field(self):
+        with self.assertLogs("users.middleware", "WARNING") as logs:
+            self.middleware(self.request)
+
+        # --- ASSERT ---
+        self.assertEqual(len(logs.records), 1)
+        message = logs.records[0].getMessage()
+        self.assertIn("Query ran 5 times", message)
+        self.assertIn("OwnerNameSerializer.owner_name (get_owner_name)", message)
+        self.assertIn("get_owner_name", message.split(":\n", 1)[1])
+
+    @override_settings(NPLUSONE_RAISE=True)
+    def test_repeated_shapes_can_fail_the_request(self):
+        with self.assertRaises(RepeatedQueryError):
+            self.middleware(self.request)
+
+    @override_settings(NPLUSONE_THRESHOLD=0)
+    def test_a_zero_threshold_turns_it_off(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            QueryShapeMiddleware(studio_names_view)
@@ -0,0 +1,637 @@
+# backend/users/tests/test_query_budgets.py
+import hashlib
+import io
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users import counters, events, views
+from users.authentication import snapshots
+from users.models import (
+    Comment,
+    Invitation,
+    Lesson,
+    Meeting,
+    Post,
+    Profile,
+    Studio,
+    StudioRating,
+    Tag,
+)
+from users.tokens import RevocableRefreshToken
+from users.urls import urlpatterns
+
+MEDIA_ROOT = tempfile.mkdtemp()
+UPLOAD_SESSIONS_ROOT = tempfile.mkdtemp()
+
+# Every endpoint runs against a community of SMALL and of LARGE members (see
+# Community), and must run the same number of queries against both.
+SMALL, LARGE = 2, 6
+
+# The most queries each route of users/urls.py may run, for any of its methods.
+# Responses are measured uncached, after the user's token was seen once.
+QUERY_BUDGETS = {
+    "explore": 4,
+    "register": 3,
+    "logout": 2,
+    "current-user": 2,
+    "profile-update": 6,
+    "cv-upload": 9,
+    "studio-create": 10,
+    "studio-dashboard": 5,
+    "studio-cover-update": 12,
+    "studio-update": 6,
+    "studio-delete": 12,
+    "my-courses": 3,
+    "studio-subscribers": 2,
+    "block-subscriber": 6,
+    "course-create": 14,
+    "course-delete": 4,
+    "course-detail": 2,
+    "course-update": 16,
+    "upload-create": 4,
+    "upload-detail": 3,
+    "upload-finalize": 17,
+    "media-blob-check": 1,
+    "public-studio-detail": 5,
+    "subscribe-studio": 7,
+    "unsubscribe-studio": 5,
+    "rate-studio": 10,
+    "post-list-create": 4,
+    "my-posts": 4,
+    "post-detail": 5,
+    "post-like-toggle": 9,
+    "comment-list-create": 5,
+    "comment-like-toggle": 9,
+    "post-delete": 8,
+    "comment-delete": 4,
+    "meeting-create": 12,
+    "my-invitations": 1,
+    "invitation-count": 1,
+    "invitation-stream": 0,
+    "invitation-stream-ticket": 0,
+    "invitation-update": 6,
+    "user-search": 1,
+    "user-delete": 44,
+}
+
+
+def make_image(name="cover.png"):
+    buffer = io.BytesIO()
+    Image.new("RGB", (600, 300), (30, 120, 200)).save(buffer, "PNG")
+    return SimpleUploadedFile(name, buffer.getvalue(), content_type="image/png")
+
+
+class Community:
+    """
+    `size` teachers, each with a studio of `size` lessons, subscribers and ratings,
+    and `size` posts that have `size` comments and likes each, every comment with
+    `size` likes of its own. `user` is the first teacher, invited to a meeting by
+    every other one; `reader` has no studio and subscribes to none.
+    """
+
+    def __init__(self, size):
+        self.size = size
+        tags = Tag.objects.bulk_create([Tag(name=f"tag{i}") for i in range(size)])
+        teachers = User.objects.bulk_create(
+            [User(username=f"teacher{i}") for i in range(size)]
+        )
+        readers = User.objects.bulk_create(
+            [User(username=f"reader{i}") for i in range(size + 1)]
+        )
+        fans = readers[:size]
+        Profile.objects.bulk_create([Profile(user=u) for u in teachers + readers])
+        self.user, self.reader = teachers[0], readers[-1]
+
+        studios = []
+        for teacher in teachers:
+            studio = Studio.objects.create(
+                owner=teacher, name=f"{teacher.username}'s studio", description="..."
+            )
+            studio.tags.set(tags[:2])
+            studio.subscribers.set(fans)
+            for i in range(size):
+                lesson = Lesson.objects.create(studio=studio, title=f"Lesson {i}")
+                lesson.tags.set(tags[:2])
+            studios.append(studio)
+        StudioRating.objects.bulk_create(
+            [
+                StudioRating(studio=studio, user=fan, rating=i % 5 + 1)
+                for studio in studios
+                for i, fan in enumerate(fans)
+            ]
+        )
+
+        posts = Post.objects.bulk_create(
+            [
+                Post(author=teacher, title=f"Post {i}", content="...")
+                for teacher in teachers
+                for i in range(size)
+            ]
+        )
+        comments = Comment.objects.bulk_create(
+            [
+                Comment(post=post, author=fan, content="...")
+                for post in posts
+                for fan in fans
+            ]
+        )
+        Post.likes.through.objects.bulk_create(
+            [Post.likes.through(post=post, user=fan) for post in posts for fan in fans]
+        )
+        Comment.likes.through.objects.bulk_create(
+            [
+                Comment.likes.through(comment=comment, user=fan)
+                for comment in comments
+                for fan in fans
+            ]
+        )
+        counters.rebuild_counters()
+        counters.rebuild_like_counters()
+
+        for teacher in teachers[1:]:
+            meeting = Meeting.objects.create(host=teacher, title="Office hours")
+            Invitation.objects.create(meeting=meeting, invitee=self.user)
+
+        self.studio, self.other_studio = studios[0], studios[1]
+        self.lesson = self.studio.lessons.first()
+        self.fan = fans[0]
+        self.post = Post.objects.filter(author=self.user).first()
+        self.other_post = Post.objects.exclude(author=self.user).first()
+        self.comment = Comment.objects.create(
+            post=self.other_post, author=self.user, content="Mine"
+        )
+        self.other_comment = self.other_post.comments.exclude(author=self.user).first()
+        self.invitation = Invitation.objects.filter(invitee=self.user).first()
+        self.refresh = RevocableRefreshToken.for_user(self.user)
+        self.access = self.refresh.access_token
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    UPLOAD_SESSIONS_ROOT=UPLOAD_SESSIONS_ROOT,
+    NPLUSONE_THRESHOLD=0,
+)
+class QueryBudgetTest(APITestCase):
+    """
+    Calls every route of users/urls.py against a small and a large community and
+    fails if a route needs more queries for the large one (an N+1), or more than
+    its entry in QUERY_BUDGETS.
+    """
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(UPLOAD_SESSIONS_ROOT, ignore_errors=True)
+
+    def measure(self, size, call, prepare, user, expected_status):
+        with transaction.atomic():
+            community = Community(size)
+            snapshots.clear()
+            if user is not None:
+                access = community.access
+                if user != "user":
+                    access = RevocableRefreshToken.for_user(
+                        getattr(community, user)
+                    ).access_token
+                self.client.credentials(HTTP_AUTHORIZATION=f"Bearer {access}")
+                # The first request with a token loads its user (see authentication.py).
+                self.client.get("/api/auth/user/")
+            if prepare is not None:
+                prepare(community)
+            cache.clear()
+
+            with CaptureQueriesContext(connection) as queries:
+                response = call(community)
+
+            if expected_status is None:
+                self.assertLess(
+                    response.status_code, 400, getattr(response, "data", "")
+                )
+            else:
+                self.assertEqual(response.status_code, expected_status)
+            transaction.set_rollback(True)
+        self.client.credentials()
+        return queries
+
+    def assertWithinBudget(
+        self, route, call, prepare=None, user="user", expected_status=None
+    ):
+        """
+        Counts the queries of call(community) against both community sizes, after
+        prepare(community). Requests are authenticated as the community's `user`
+        (or another member, e.g. "reader"), or anonymous with user=None.
+        """
+        small = self.measure(SMALL, call, prepare, user, expected_status)
+        large = self.measure(LARGE, call, prepare, user, expected_status)
+
+        queries = "\n".join(query["sql"] for query in large.captured_queries)
+        self.assertEqual(
+            len(small),
+            len(large),
+            f"{route} runs more queries for a larger community:\n{queries}",
+        )
+        self.assertLessEqual(
+            len(large), QUERY_BUDGETS[route], f"{route} is over budget:\n{queries}"
+        )
+
+    def test_every_route_has_a_budget(self):
+        self.assertEqual(
+            {pattern.name for pattern in urlpatterns}, set(QUERY_BUDGETS)
+        )
+
+    # --- Explore ---
+
+    def test_explore(self):
+        for params in (
+            {"type": "studio"},
+            {"type": "course"},
+            {"type": "teacher"},
+            {"type": "studio", "q": "studio", "tags": ["tag0", "tag1"]},
+            {"type": "course", "q": "lesson", "tags": ["tag0"], "tag_mode": "any"},
+        ):
+            with self.subTest(**params):
+                self.assertWithinBudget(
+                    "explore", lambda c: self.client.get("/api/explore/", params)
+                )
+
+    # --- Accounts ---
+
+    def test_register(self):
+        self.assertWithinBudget(
+            "register",
+            lambda c: self.client.post(
+                "/api/auth/register/",
+                {
+                    "username": "newcomer",
+                    "email": "newcomer@example.com",
+                    "first_name": "New",
+                    "last_name": "Comer",
+                    "password": "a-long-pw-123",
+                    "password2": "a-long-pw-123",
+                },
+                format="json",
+            ),
+            user=None,
+        )
+
+    def test_logout(self):
+        self.assertWithinBudget(
+            "logout",
+            lambda c: self.client.post(
+                "/api/auth/logout/", {"refresh": str(c.refresh)}, format="json"
+            ),
+        )
+
+    def test_current_user(self):
+        self.assertWithinBudget(
+            "current-user", lambda c: self.client.get("/api/auth/user/")
+        )
+
+    def test_profile_update(self):
+        self.assertWithinBudget(
+            "profile-update",
+            lambda c: self.client.put(
+                "/api/profile/update/",
+                {"headline": "Teaching things", "degrees": '["BSc"]'},
+                format="multipart",
+            ),
+        )
+
+    def test_cv_upload(self):
+        self.assertWithinBudget(
+            "cv-upload",
+            lambda c: self.client.post(
+                "/api/profile/upload-cv/",
+                {"cv_file": SimpleUploadedFile("cv.txt", b"My CV")},
+                format="multipart",
+            ),
+        )
+
+    def test_user_search(self):
+        self.assertWithinBudget(
+            "user-search", lambda c: self.client.get("/api/users/search/", {"q": "e"})
+        )
+
+    def test_user_delete(self):
+        self.assertWithinBudget(
+            "user-delete",
+            lambda c: self.client.delete(
+                "/api/users/delete/", {"refresh": str(c.refresh)}, format="json"
+            ),
+        )
+
+    # --- Studios ---
+
+    def test_studio_create(self):
+        self.assertWithinBudget(
+            "studio-create",
+            lambda c: self.client.post(
+                "/api/studios/create/",
+                {"name": "New studio", "description": "..."},
+                format="multipart",
+            ),
+            user="reader",
+        )
+
+    def test_studio_dashboard(self):
+        self.assertWithinBudget(
+            "studio-dashboard", lambda c: self.client.get("/api/studio/dashboard/")
+        )
+
+    def test_studio_cover_update(self):
+        self.assertWithinBudget(
+            "studio-cover-update",
+            lambda c: self.client.put(
+                "/api/studio/cover/update/",
+                {"cover_image": make_image()},
+                format="multipart",
+            ),
+        )
+
+    def test_studio_update(self):
+        self.assertWithinBudget(
+            "studio-update", lambda c: self.client.get("/api/studio/update/")
+        )
+        self.assertWithinBudget(
+            "studio-update",
+            lambda c: self.client.put(
+                "/api/studio/update/", {"name": "Renamed"}, format="json"
+            ),
+        )
+
+    def test_studio_delete(self):
+        self.assertWithinBudget(
+            "studio-delete", lambda c: self.client.delete("/api/studio/delete/")
+        )
+
+    def test_my_courses(self):
+        self.assertWithinBudget(
+            "my-courses", lambda c: self.client.get("/api/studio/my-courses/")
+        )
+
+    def test_studio_subscribers(self):
+        self.assertWithinBudget(
+            "studio-subscribers", lambda c: self.client.get("/api/studio/subscribers/")
+        )
+
+    def test_block_subscriber(self):
+        self.assertWithinBudget(
+            "block-subscriber",
+            lambda c: self.client.delete(f"/api/studio/subscribers/{c.fan.id}/block/"),
+        )
+
+    def test_public_studio_detail(self):
+        self.assertWithinBudget(
+            "public-studio-detail",
+            lambda c: self.client.get(f"/api/studios/{c.other_studio.id}/"),
+        )
+
+    def test_subscribe_studio(self):
+        self.assertWithinBudget(
+            "subscribe-studio",
+            lambda c: self.client.post(f"/api/studios/{c.studio.id}/subscribe/"),
+            user="reader",
+        )
+
+    def test_unsubscribe_studio(self):
+        self.assertWithinBudget(
+            "unsubscribe-studio",
+            lambda c: self.client.post(f"/api/studios/{c.studio.id}/unsubscribe/"),
+            user="fan",
+        )
+
+    def test_rate_studio(self):
+        self.assertWithinBudget(
+            "rate-studio",
+            lambda c: self.client.post(
+                f"/api/studios/{c.studio.id}/rate/", {"rating": 4}, format="json"
+            ),
+            user="fan",
+        )
+
+    # --- Courses ---
+
+    def test_course_create(self):
+        self.assertWithinBudget(
+            "course-create",
+            lambda c: self.client.post(
+                "/api/studio/courses/create/",
+                {"title": "New lesson", "lesson_type": "markdown", "tag_names": "tag0"},
+                format="multipart",
+            ),
+        )
+
+    def test_course_delete(self):
+        self.assertWithinBudget(
+            "course-delete",
+            lambda c: self.client.delete(f"/api/studio/courses/{c.lesson.id}/delete/"),
+        )
+
+    def test_course_detail(self):
+        self.assertWithinBudget(
+            "course-detail",
+            lambda c: self.client.get(f"/api/studio/courses/{c.lesson.id}/"),
+        )
+
+    def test_course_update(self):
+        self.assertWithinBudget(
+            "course-update",
+            lambda c: self.client.put(
+                f"/api/studio/courses/{c.lesson.id}/update/",
+                {"title": "Renamed", "tags": "tag1"},
+                format="multipart",
+            ),
+        )
+
+    # --- Uploads ---
+
+    def start_upload(self, community):
+        # A different file for each community, so no stored blob is reused.
+        community.payload = f"notes {community.size}".encode()
+        return self.client.post(
+            "/api/uploads/",
+            {
+                "lesson": community.lesson.id,
+                "field": "lesson_file",
+                "filename": "notes.txt",
+                "size": len(community.payload),
+                "sha256": hashlib.sha256(community.payload).hexdigest(),
+            },
+            format="json",
+        )
+
+    def open_upload(self, community):
+        response = self.start_upload(community)
+        community.upload_url = f"/api/uploads/{response.data['id']}/"  # type: ignore
+
+    def send_upload(self, community):
+        self.open_upload(community)
+        self.put_chunk(community)
+
+    def put_chunk(self, community):
+        size = len(community.payload)
+        return self.client.put(
+            community.upload_url,
+            community.payload,
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes 0-{size - 1}/{size}",
+        )
+
+    def test_upload_create(self):
+        self.assertWithinBudget("upload-create", self.start_upload)
+
+    def test_upload_detail(self):
+        self.assertWithinBudget("upload-detail", self.put_chunk, self.open_upload)
+        self.assertWithinBudget(
+            "upload-detail",
+            lambda c: self.client.get(c.upload_url),
+            self.open_upload,
+        )
+        self.assertWithinBudget(
+            "upload-detail",
+            lambda c: self.client.delete(c.upload_url),
+            self.open_upload,
+        )
+
+    def test_upload_finalize(self):
+        self.assertWithinBudget(
+            "upload-finalize",
+            lambda c: self.client.post(c.upload_url + "finalize/", format="json"),
+            self.send_upload,
+        )
+
+    def test_media_blob_check(self):
+        self.assertWithinBudget(
+            "media-blob-check",
+            lambda c: self.client.get(f"/api/blobs/{'0' * 64}/"),
+            expected_status=status.HTTP_404_NOT_FOUND,
+        )
+
+    # --- SquadHub ---
+
+    def test_post_list_create(self):
+        self.assertWithinBudget(
+            "post-list-create", lambda c: self.client.get("/api/posts/")
+        )
+        self.assertWithinBudget(
+            "post-list-create",
+            lambda c: self.client.post(
+                "/api/posts/",
+                {"title": "Hello", "content": "...", "tag_names": "tag0"},
+                format="multipart",
+            ),
+        )
+
+    def test_my_posts(self):
+        self.assertWithinBudget(
+            "my-posts", lambda c: self.client.get("/api/posts/mine/")
+        )
+
+    def test_post_detail(self):
+        self.assertWithinBudget(
+            "post-detail", lambda c: self.client.get(f"/api/posts/{c.other_post.id}/")
+        )
+
+    def test_post_like_toggle(self):
+        self.assertWithinBudget(
+            "post-like-toggle",
+            lambda c: self.client.post(f"/api/posts/{c.other_post.id}/like/"),
+        )
+
+    def test_comment_list_create(self):
+        self.assertWithinBudget(
+            "comment-list-create",
+            lambda c: self.client.get(f"/api/posts/{c.other_post.id}/comments/"),
+        )
+        self.assertWithinBudget(
+            "comment-list-create",
+            lambda c: self.client.post(
+                f"/api/posts/{c.other_post.id}/comments/",
+                {"content": "Nice"},
+                format="json",
+            ),
+        )
+
+    def test_comment_like_toggle(self):
+        self.assertWithinBudget(
+            "comment-like-toggle",
+            lambda c: self.client.post(f"/api/comments/{c.other_comment.id}/like/"),
+        )
+
+    def test_post_delete(self):
+        self.assertWithinBudget(
+            "post-delete",
+            lambda c: self.client.delete(f"/api/posts/{c.post.id}/delete/"),
+        )
+
+    def test_comment_delete(self):
+        self.assertWithinBudget(
+            "comment-delete",
+            lambda c: self.client.delete(f"/api/comments/{c.comment.id}/delete/"),
+        )
+
+    # --- Meetings and invitations ---
+
+    def test_meeting_create(self):
+        self.assertWithinBudget(
+            "meeting-create",
+            lambda c: self.client.post(
+                "/api/meetings/create/",
+                {
+                    "title": "Study group",
+                    "invitees": list(User.objects.values_list("username", flat=True)),
+                    "invite_subscribers": True,
+                },
+                format="json",
+            ),
+        )
+
+    def test_my_invitations(self):
+        self.assertWithinBudget(
+            "my-invitations", lambda c: self.client.get("/api/invitations/")
+        )
+
+    def test_invitation_count(self):
+        self.assertWithinBudget(
+            "invitation-count", lambda c: self.client.get("/api/invitations/count/")
+        )
+
+    def test_invitation_stream(self):
+        # The stream never ends, so we only measure how it authenticates its user.
+        def authenticate(community):
+            ticket = events.issue_stream_ticket(community.user.pk, community.access)
+            request = RequestFactory().get(
+                "/api/invitations/stream/", {"ticket": ticket}
+            )
+            grant = views._stream_grant(request)
+            return HttpResponse(status=200 if grant else 401)
+
+        self.assertWithinBudget("invitation-stream", authenticate)
+
+    def test_invitation_stream_ticket(self):
+        self.assertWithinBudget(
+            "invitation-stream-ticket",
+            lambda c: self.client.post("/api/invitations/stream/ticket/"),
+            expected_status=status.HTTP_201_CREATED,
+        )
+
+    def test_invitation_update(self):
+        self.assertWithinBudget(
+            "invitation-update",
+            lambda c: self.client.post(
+                f"/api/invitations/{c.invitation.id}/update/",
+                {"status": "accepted"},
+                format="json",
+            ),
+        )
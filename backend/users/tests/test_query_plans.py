@@ -0,0 +1,106 @@
+# backend/users/tests/test_query_plans.py
+import re
+from datetime import timedelta
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase
+from django.utils import timezone
+from users.models import Comment, Invitation, Lesson, Meeting, Post, Studio
+
+
+class HotQueryPlanTest(TestCase):
+    """
+    Runs EXPLAIN on the query shapes our busiest views use and fails if any of them
+    falls back to reading a whole table instead of going through an index.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username="reader", password="pw123456")
+        authors = [
+            User.objects.create_user(username=f"author{i}", password="pw123456")
+            for i in range(5)
+        ]
+        studios = [
+            Studio.objects.create(owner=author, name=f"Studio {i}", description="")
+            for i, author in enumerate(authors)
+        ]
+        cls.studio = studios[0]
+        studios[0].subscribers.add(cls.user)
+
+        for author in authors:
+            meeting = Meeting.objects.create(host=author, title="Sync")
+            Invitation.objects.create(meeting=meeting, invitee=cls.user)
+            for i in range(10):
+                post = Post.objects.create(author=author, title=f"#{i}", content="...")
+                Comment.objects.create(post=post, author=cls.user, content="...")
+            Lesson.objects.create(studio=studios[0], title=f"Lesson by {author}")
+
+        cls.post = Post.objects.first()
+        cls.post.likes.add(cls.user)
+        cls.post.comments.first().likes.add(cls.user)
+
+    def assertUsesIndexes(self, queryset):
+        if connection.vendor == "postgresql":
+            with connection.cursor() as cursor:
+                # Tiny test tables are cheaper to scan, so we take that option away.
+                cursor.execute("SET LOCAL enable_seqscan = off")
+            plan = queryset.explain()
+            self.assertNotIn("Seq Scan", plan, msg=f"\n{queryset.query}\n{plan}")
+        elif connection.vendor == "sqlite":
+            plan = queryset.explain()
+            # A full table scan shows up as "SCAN <table>" with no "USING ... INDEX",
+            # and an ORDER BY the index can't serve as a temporary B-tree sort.
+            slow_steps = [
+                line
+                for line in plan.splitlines()
+                if re.search(r"\bSCAN (TABLE )?\w+$", line.strip())
+                or "TEMP B-TREE" in line
+            ]
+            self.assertEqual(slow_steps, [], msg=f"\n{queryset.query}\n{plan}")
+        else:
+            self.skipTest(f"No plan checks for {connection.vendor}.")
+
+    def test_invitation_inbox(self):
+        inbox = Invitation.objects.filter(
+            invitee=self.user, status="pending", is_read=False
+        )
+        self.assertUsesIndexes(inbox.order_by("-created_at"))
+        self.assertUsesIndexes(
+            inbox.filter(created_at__gt=timezone.now() - timedelta(days=1))
+        )
+
+    def test_feed_pages(self):
+        first_page = Post.objects.order_by("-timestamp", "-id")
+        self.assertUsesIndexes(first_page[:21])
+        self.assertUsesIndexes(first_page.filter(timestamp__lt=timezone.now())[:21])
+
+    def test_author_posts(self):
+        self.assertUsesIndexes(
+            Post.objects.filter(author=self.post.author).order_by("-timestamp")
+        )
+
+    def test_studio_lessons(self):
+        self.assertUsesIndexes(
+            Lesson.objects.filter(studio=self.studio).order_by("-created_at")
+        )
+
+    def test_comment_thread(self):
+        self.assertUsesIndexes(
+            Comment.objects.filter(post=self.post).order_by("timestamp", "id")[:21]
+        )
+
+    def test_user_relations_for_a_page(self):
+        # The shape of views._ids_related_to_user() for likes and subscriptions.
+        for relation, column, ids in (
+            (Post.likes, "post_id", [self.post.pk]),
+            (Comment.likes, "comment_id", [self.post.comments.first().pk]),
+            (Studio.subscribers, "studio_id", [self.studio.pk]),
+        ):
+            with self.subTest(table=relation.through._meta.db_table):
+                self.assertUsesIndexes(
+                    relation.through.objects.filter(
+                        user=self.user, **{f"{column}__in": ids}
+                    ).values_list(column, flat=True)
+                )
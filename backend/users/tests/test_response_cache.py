@@ -0,0 +1,105 @@
+# backend/users/tests/test_response_cache.py
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APITestCase
+from users import response_cache
+from users.models import Lesson, Post, Studio
+
+
+class ResponseCacheAPITest(APITestCase):
+    """
+    Test suite for the cached public pages and their invalidation.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.teacher = User.objects.create_user(username="teacher", password="pw123456")
+        self.studio = Studio.objects.create(
+            owner=self.teacher, name="Studio", description=""
+        )
+        self.student = User.objects.create_user(username="student", password="pw123456")
+
+    def get_studio(self):
+        return self.client.get(f"/api/studios/{self.studio.id}/").data  # type: ignore
+
+    def test_repeated_reads_are_served_from_the_cache(self):
+        self.get_studio()
+
+        with CaptureQueriesContext(connection) as queries:
+            data = self.get_studio()
+
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(data["name"], "Studio")
+
+    def test_changes_invalidate_the_cached_pages(self):
+        self.get_studio()
+        self.client.get("/api/explore/", {"type": "course"})
+
+        # --- ACT ---
+        self.studio.name = "Renamed"
+        self.studio.save()
+        Lesson.objects.create(studio=self.studio, title="New lesson")
+
+        # --- ASSERT ---
+        data = self.get_studio()
+        self.assertEqual(data["name"], "Renamed")
+        self.assertEqual([lesson["title"] for lesson in data["lessons"]], ["New lesson"])
+        response = self.client.get("/api/explore/", {"type": "course"})
+        self.assertEqual(len(response.data["results"]), 1)  # type: ignore
+
+    def test_per_user_fields_are_not_shared(self):
+        self.get_studio()
+        self.client.force_authenticate(user=self.student)  # type: ignore
+        self.client.post(f"/api/studios/{self.studio.id}/subscribe/")
+
+        data = self.get_studio()
+        self.assertTrue(data["is_subscribed"])
+        self.assertEqual(data["subscribers_count"], 1)
+
+        self.client.force_authenticate(user=self.teacher)  # type: ignore
+        self.assertFalse(self.get_studio()["is_subscribed"])
+
+    def test_post_likes_invalidate_the_post_page(self):
+        post = Post.objects.create(author=self.teacher, title="Hi", content="...")
+        self.client.force_authenticate(user=self.student)  # type: ignore
+        self.client.get(f"/api/posts/{post.id}/")
+
+        self.client.post(f"/api/posts/{post.id}/like/")
+
+        data = self.client.get(f"/api/posts/{post.id}/").data  # type: ignore
+        self.assertEqual((data["likes_count"], data["is_liked"]), (1, True))
+
+
+@override_settings(RESPONSE_CACHE_FRESH=0, RESPONSE_CACHE_STALE=60)
+class StaleWhileRevalidateTest(TestCase):
+    """
+    Test suite for the rebuilding of expired entries in response_cache.
+    """
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().get("/")
+        self.builds = 0
+
+    def get(self, build=None):
+        return response_cache.get_or_build(
+            self.request, "test", (1,), [], build or self.build
+        )
+
+    def build(self):
+        self.builds += 1
+        return self.builds
+
+    def test_one_request_rebuilds_while_the_others_get_the_stale_copy(self):
+        self.assertEqual(self.get(), 1)
+
+        def rebuild_slowly():
+            # Another request arrives while this one is rebuilding the entry.
+            self.assertEqual(self.get(), 1)
+            return self.build()
+
+        self.assertEqual(self.get(rebuild_slowly), 2)
+        self.assertEqual(self.builds, 2)
@@ -0,0 +1,104 @@
+# backend/users/tests/test_revocation.py
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from users import revocation
+from users.tokens import RevocableAccessToken
+
+
+class BloomFilterTest(SimpleTestCase):
+    def test_no_false_negatives_and_few_false_positives(self):
+        bloom = revocation.BloomFilter.for_capacity(2000, 0.01)
+        for i in range(2000):
+            bloom.add(f"revoked-{i}")
+
+        self.assertTrue(all(f"revoked-{i}" in bloom for i in range(2000)))
+        false_positives = sum(f"valid-{i}" in bloom for i in range(10000))
+        self.assertLess(false_positives, 300)
+
+
+class LogoutAPITest(APITestCase):
+    """
+    Test suite for logging out with token revocation.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="student", password="pw123456")
+        self.refresh = RefreshToken.for_user(self.user)
+        self.access = self.refresh.access_token
+        revocation.rebuild_filter()
+
+    def get_current_user(self, access):
+        return self.client.get("/api/auth/user/", HTTP_AUTHORIZATION=f"Bearer {access}")
+
+    def test_logout_revokes_the_access_and_refresh_tokens(self):
+        # --- ACT ---
+        response = self.client.post(
+            "/api/auth/logout/",
+            {"refresh": str(self.refresh)},
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {self.access}",
+        )
+
+        # --- ASSERT ---
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            self.get_current_user(self.access).status_code,
+            status.HTTP_401_UNAUTHORIZED,
+        )
+        response = self.client.post(
+            "/api/token/refresh/", {"refresh": str(self.refresh)}, format="json"
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        # Other sessions of the user are not affected.
+        other_access = RefreshToken.for_user(self.user).access_token
+        self.assertEqual(
+            self.get_current_user(other_access).status_code, status.HTTP_200_OK
+        )
+
+    def test_users_cannot_revoke_someone_elses_refresh_token(self):
+        other = User.objects.create_user(username="other", password="pw123456")
+
+        response = self.client.post(
+            "/api/auth/logout/",
+            {"refresh": str(RefreshToken.for_user(other))},
+            format="json",
+            HTTP_AUTHORIZATION=f"Bearer {self.access}",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_valid_tokens_are_checked_without_queries(self):
+        revocation.revoke(RefreshToken.for_user(self.user).access_token)
+
+        with CaptureQueriesContext(connection) as queries:
+            RevocableAccessToken(str(self.access))
+
+        self.assertEqual(len(queries), 0)
+
+    @override_settings(REVOCATION_FILTER_REFRESH=0)
+    def test_revocations_between_scheduling_and_rebuild_are_kept(self):
+        # --- ARRANGE ---
+        token = RefreshToken.for_user(self.user).access_token
+        scheduled = []
+        with mock.patch.object(revocation.tasks, "run_soon", scheduled.append):
+            # The filter is stale, so this check schedules a rebuild.
+            revocation.is_revoked("some-jti")
+            # Logged out before the rebuild runs, in a transaction it won't see.
+            revocation.revoke(token)
+        empty = revocation.BloomFilter.for_capacity(0, 0.01)
+
+        # --- ACT ---
+        self.assertEqual(scheduled, [revocation._rebuild_in_background])
+        with mock.patch.object(revocation, "_build_filter", return_value=empty):
+            revocation.rebuild_filter()
+
+        # --- ASSERT ---
+        self.assertIn(token["jti"], revocation._filter)
@@ -0,0 +1,196 @@
+# backend/users/tests/test_squadhub.py
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.counters import toggle_like
+from users.models import Comment, Post, Profile
+
+
+class SquadHubFeedAPITest(APITestCase):
+    """
+    Test suite for the paginated SquadHub feed.
+    """
+
+    def setUp(self):
+        self.author = User.objects.create_user(username="author", password="pw123456")
+        Profile.objects.create(user=self.author)
+        self.fans = [
+            User.objects.create_user(username=f"fan{i}", password="pw123456")
+            for i in range(3)
+        ]
+
+    def add_post(self, comments=5):
+        post = Post.objects.create(author=self.author, title="Hello", content="...")
+        for fan in self.fans:
+            toggle_like(post, fan)
+        for i in range(comments):
+            Comment.objects.create(post=post, author=self.author, content=f"#{i}")
+        return post
+
+    def test_feed_returns_cards_with_counts_and_a_comment_preview(self):
+        post = self.add_post(comments=5)
+
+        response = self.client.get("/api/posts/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        card = response.data["results"][0]  # type: ignore
+        self.assertEqual(card["id"], post.id)
+        self.assertEqual(card["comments_count"], 5)
+        self.assertEqual(card["likes_count"], 3)
+        self.assertNotIn("comments", card)
+        # Only the latest comments, newest first.
+        self.assertEqual([c["content"] for c in card["latest_comments"]], ["#4", "#3", "#2"])
+
+    def test_feed_is_paginated_newest_first(self):
+        posts = [self.add_post(comments=0) for _ in range(3)]
+
+        first = self.client.get("/api/posts/", {"limit": 2}).data
+        second = self.client.get(
+            "/api/posts/", {"limit": 2, "cursor": first["next"]}  # type: ignore
+        ).data
+
+        ids = [p["id"] for p in first["results"] + second["results"]]  # type: ignore
+        self.assertEqual(ids, [p.id for p in reversed(posts)])
+        self.assertIsNone(second["next"])  # type: ignore
+
+    def test_feed_marks_the_posts_liked_by_the_user(self):
+        liked, not_liked = self.add_post(comments=0), self.add_post(comments=0)
+        not_liked.likes.remove(self.fans[0])
+        self.client.force_authenticate(user=self.fans[0])  # type: ignore
+
+        response = self.client.get("/api/posts/")
+
+        flags = {p["id"]: p["is_liked"] for p in response.data["results"]}  # type: ignore
+        self.assertEqual(flags, {liked.id: True, not_liked.id: False})
+
+    def test_feed_query_count_does_not_grow_with_the_page(self):
+        # Logged in, so the personalized is_liked flags are part of the cost.
+        self.client.force_authenticate(user=self.fans[0])  # type: ignore
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.client.get("/api/posts/")
+            return len(queries)
+
+        self.add_post()
+        small = count_queries()
+        for _ in range(5):
+            self.add_post()
+        self.assertEqual(count_queries(), small)
+
+
+class CommentThreadAPITest(APITestCase):
+    """
+    Test suite for the paginated comment threads.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="reader", password="pw123456")
+        Profile.objects.create(user=self.user)
+        self.post = Post.objects.create(author=self.user, title="Thread", content="...")
+        self.comments = [
+            Comment.objects.create(post=self.post, author=self.user, content=f"#{i}")
+            for i in range(25)
+        ]
+        toggle_like(self.comments[0], self.user)
+
+    def test_post_detail_inlines_only_the_first_page(self):
+        response = self.client.get(f"/api/posts/{self.post.id}/")
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["comments_count"], 25)  # type: ignore
+        self.assertEqual(len(response.data["comments"]), 20)  # type: ignore
+        self.assertIsNotNone(response.data["comments_next"])  # type: ignore
+
+        # The rest of the thread comes from the comments endpoint.
+        rest = self.client.get(
+            f"/api/posts/{self.post.id}/comments/",
+            {"cursor": response.data["comments_next"]},  # type: ignore
+        )
+        self.assertEqual(
+            [c["content"] for c in rest.data["results"]],  # type: ignore
+            [f"#{i}" for i in range(20, 25)],
+        )
+        self.assertIsNone(rest.data["next"])  # type: ignore
+
+    def test_thread_reports_likes_for_the_requesting_user(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+
+        response = self.client.get(f"/api/posts/{self.post.id}/comments/", {"limit": 2})
+
+        first, second = response.data["results"]  # type: ignore
+        self.assertEqual((first["likes_count"], first["is_liked"]), (1, True))
+        self.assertEqual((second["likes_count"], second["is_liked"]), (0, False))
+
+    def test_thread_query_count_does_not_grow_with_the_page(self):
+        self.client.force_authenticate(user=self.user)  # type: ignore
+        url = f"/api/posts/{self.post.id}/comments/"
+
+        with CaptureQueriesContext(connection) as small:
+            self.client.get(url, {"limit": 2})
+        with CaptureQueriesContext(connection) as large:
+            self.client.get(url, {"limit": 20})
+
+        self.assertEqual(len(small), len(large))
+
+    def test_commenting_still_requires_authentication(self):
+        response = self.client.post(
+            f"/api/posts/{self.post.id}/comments/", {"content": "hi"}
+        )
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class LikeToggleAPITest(APITestCase):
+    """
+    Test suite for the like toggles of posts and comments and their stored counters.
+    """
+
+    def setUp(self):
+        self.user = User.objects.create_user(username="reader", password="pw123456")
+        self.post = Post.objects.create(author=self.user, title="Hi", content="...")
+        self.comment = Comment.objects.create(
+            post=self.post, author=self.user, content="..."
+        )
+        self.client.force_authenticate(user=self.user)  # type: ignore
+
+    def test_toggling_twice_likes_then_unlikes(self):
+        for url, obj in (
+            (f"/api/posts/{self.post.id}/like/", self.post),
+            (f"/api/comments/{self.comment.id}/like/", self.comment),
+        ):
+            # --- ACT & ASSERT ---
+            response = self.client.post(url)
+            self.assertEqual(response.data, {"liked": True, "likes_count": 1})  # type: ignore
+            obj.refresh_from_db()
+            self.assertEqual(obj.likes_count, 1)
+
+            response = self.client.post(url)
+            self.assertEqual(response.data, {"liked": False, "likes_count": 0})  # type: ignore
+            obj.refresh_from_db()
+            self.assertEqual(obj.likes_count, 0)
+
+    def test_deleting_an_account_releases_its_likes(self):
+        fan = User.objects.create_user(username="fan", password="pw123456")
+        toggle_like(self.post, fan)
+        toggle_like(self.post, self.user)
+
+        self.client.force_authenticate(user=fan)  # type: ignore
+        self.client.delete("/api/users/delete/")
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.likes_count, 1)
+
+    def test_rebuild_command_repairs_drifted_like_counters(self):
+        self.post.likes.add(self.user)  # bypasses the counters on purpose
+        Comment.objects.filter(pk=self.comment.pk).update(likes_count=7)
+
+        call_command("rebuild_like_counters", stdout=StringIO())
+
+        self.post.refresh_from_db()
+        self.comment.refresh_from_db()
+        self.assertEqual((self.post.likes_count, self.comment.likes_count), (1, 0))
@@ -0,0 +1,95 @@
+# backend/users/tests/test_storage.py
+import hashlib
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.models import Lesson, MediaBlob, Studio
+
+MEDIA_ROOT = tempfile.mkdtemp()
+UPLOAD_SESSIONS_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(MEDIA_ROOT=MEDIA_ROOT, UPLOAD_SESSIONS_ROOT=UPLOAD_SESSIONS_ROOT)
+class ContentAddressedStorageTest(APITestCase):
+    """
+    Test suite for the deduplicating storage of uploaded files.
+    """
+
+    payload = b"the same lecture notes, uploaded twice"
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(UPLOAD_SESSIONS_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username="teacher", password="pw123456")
+        studio = Studio.objects.create(owner=self.teacher, name="Studio", description="")
+        self.lesson = Lesson.objects.create(studio=studio, title="Notes")
+        self.client.force_authenticate(user=self.teacher)  # type: ignore
+
+    def test_identical_files_share_one_blob(self):
+        # --- ACT ---
+        first = default_storage.save("lesson_files/a.pdf", ContentFile(self.payload))
+        second = default_storage.save("lesson_files/b.pdf", ContentFile(self.payload))
+
+        # --- ASSERT ---
+        self.assertEqual(first, second)
+        blob = MediaBlob.objects.get()
+        self.assertEqual(blob.size, len(self.payload))
+
+        # The other name still points at it: only collect_orphaned_media removes it.
+        default_storage.delete(first)
+        self.assertTrue(MediaBlob.objects.exists())
+        self.assertTrue(default_storage.exists(second))
+
+    def test_hash_check_endpoint(self):
+        digest = hashlib.sha256(self.payload).hexdigest()
+        response = self.client.get(f"/api/blobs/{digest}/")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        default_storage.save("lesson_files/a.pdf", ContentFile(self.payload))
+
+        response = self.client.get(f"/api/blobs/{digest.upper()}/")
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["size"], len(self.payload))  # type: ignore
+
+    def test_upload_of_known_content_completes_without_sending_bytes(self):
+        name = default_storage.save("lesson_files/a.pdf", ContentFile(self.payload))
+
+        response = self.client.post(
+            "/api/uploads/",
+            {
+                "lesson": self.lesson.id,
+                "field": "lesson_file",
+                "filename": "notes.pdf",
+                "size": len(self.payload),
+                "sha256": hashlib.sha256(self.payload).hexdigest(),
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["status"], "complete")  # type: ignore
+        self.lesson.refresh_from_db()
+        self.assertEqual(self.lesson.lesson_file.name, name)
+        self.assertEqual(MediaBlob.objects.count(), 1)
+
+    def test_a_blob_appearing_mid_save_is_replaced(self):
+        storage = default_storage
+        digest = hashlib.sha256(self.payload).hexdigest()
+        name = storage.blob_name(digest, "a.pdf")
+        # Another process wrote the same bytes after our exists() check.
+        storage._write_blob(name, ContentFile(self.payload))
+
+        storage._write_blob(name, ContentFile(self.payload))
+
+        with storage.open(name) as f:
+            self.assertEqual(f.read(), self.payload)
@@ -0,0 +1,107 @@
+# backend/users/tests/test_studio_counters.py
+from io import StringIO
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.models import Studio, StudioRating
+
+
+class StudioCountersAPITest(APITestCase):
+    """
+    Test suite for the stored subscriber and rating counters of a studio.
+    """
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username="teacher", password="pw123456")
+        self.student = User.objects.create_user(username="student", password="pw123456")
+        self.studio = Studio.objects.create(
+            owner=self.teacher, name="Studio", description=""
+        )
+
+    def test_subscribe_and_unsubscribe_keep_the_count_exact(self):
+        self.client.force_authenticate(user=self.student)  # type: ignore
+        url = f"/api/studios/{self.studio.id}/"
+
+        # Subscribing twice only counts once.
+        self.client.post(url + "subscribe/")
+        self.client.post(url + "subscribe/")
+        self.studio.refresh_from_db()
+        self.assertEqual(self.studio.subscribers_count, 1)
+
+        # Unsubscribing twice only removes once.
+        self.client.post(url + "unsubscribe/")
+        self.client.post(url + "unsubscribe/")
+        self.studio.refresh_from_db()
+        self.assertEqual(self.studio.subscribers_count, 0)
+
+    def test_blocking_a_subscriber_decrements_the_count(self):
+        self.client.force_authenticate(user=self.student)  # type: ignore
+        self.client.post(f"/api/studios/{self.studio.id}/subscribe/")
+
+        self.client.force_authenticate(user=self.teacher)  # type: ignore
+        response = self.client.delete(f"/api/studio/subscribers/{self.student.id}/block/")
+
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+        self.studio.refresh_from_db()
+        self.assertEqual(self.studio.subscribers_count, 0)
+
+    def test_rating_updates_move_the_histogram(self):
+        # --- ARRANGE ---
+        other = User.objects.create_user(username="other", password="pw123456")
+        url = f"/api/studios/{self.studio.id}/rate/"
+
+        # --- ACT ---
+        self.client.force_authenticate(user=self.student)  # type: ignore
+        self.assertEqual(self.client.post(url, {"rating": 2}).status_code, 201)
+        self.assertEqual(self.client.post(url, {"rating": 5}).status_code, 200)
+        self.client.force_authenticate(user=other)  # type: ignore
+        self.client.post(url, {"rating": 4})
+
+        # --- ASSERT ---
+        self.studio.refresh_from_db()
+        self.assertEqual(self.studio.rating_count, 2)
+        self.assertEqual(self.studio.average_rating, 4.5)
+        self.assertEqual(self.studio.rating_histogram, {1: 0, 2: 0, 3: 0, 4: 1, 5: 1})
+
+        response = self.client.get(f"/api/studios/{self.studio.id}/")
+        self.assertEqual(response.data["average_rating"], 4.5)  # type: ignore
+        self.assertEqual(response.data["subscribers_count"], 0)  # type: ignore
+
+    def test_rating_a_legacy_zero_row_counts_it_once(self):
+        # --- ARRANGE ---
+        # Rows from before the counters could hold the field's default of 0,
+        # which the counters (like rebuild_counters) leave out.
+        StudioRating.objects.create(studio=self.studio, user=self.student, rating=0)
+
+        # --- ACT ---
+        self.client.force_authenticate(user=self.student)  # type: ignore
+        self.client.post(f"/api/studios/{self.studio.id}/rate/", {"rating": 4})
+
+        # --- ASSERT ---
+        self.studio.refresh_from_db()
+        self.assertEqual((self.studio.rating_sum, self.studio.rating_count), (4, 1))
+        self.assertEqual(self.studio.rating_4_count, 1)
+        self.assertEqual(self.studio.average_rating, 4)
+
+    def test_deleting_an_account_releases_its_counters(self):
+        self.client.force_authenticate(user=self.student)  # type: ignore
+        self.client.post(f"/api/studios/{self.studio.id}/subscribe/")
+        self.client.post(f"/api/studios/{self.studio.id}/rate/", {"rating": 3})
+
+        self.client.delete("/api/users/delete/")
+
+        self.studio.refresh_from_db()
+        self.assertEqual(
+            (self.studio.subscribers_count, self.studio.rating_count, self.studio.rating_sum),
+            (0, 0, 0),
+        )
+
+    def test_rebuild_command_repairs_drifted_counters(self):
+        self.studio.subscribers.add(self.student)  # bypasses the counters on purpose
+        Studio.objects.filter(pk=self.studio.pk).update(rating_count=7)
+
+        call_command("rebuild_studio_counters", stdout=StringIO())
+
+        self.studio.refresh_from_db()
+        self.assertEqual((self.studio.subscribers_count, self.studio.rating_count), (1, 0))
@@ -0,0 +1,142 @@
+# backend/users/tests/test_uploads.py
+import fcntl
+import hashlib
+import os
+import shutil
+import tempfile
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from rest_framework import status
+from rest_framework.test import APITestCase
+from users.models import Lesson, Studio, UploadSession
+
+MEDIA_ROOT = tempfile.mkdtemp()
+UPLOAD_SESSIONS_ROOT = tempfile.mkdtemp()
+
+
+@override_settings(
+    MEDIA_ROOT=MEDIA_ROOT,
+    UPLOAD_SESSIONS_ROOT=UPLOAD_SESSIONS_ROOT,
+    UPLOAD_CHUNK_MAX_SIZE=8,
+)
+class ResumableUploadAPITest(APITestCase):
+    """
+    Test suite for the resumable, chunked uploads of lesson files.
+    """
+
+    payload = b"0123456789abcdef"
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(MEDIA_ROOT, ignore_errors=True)
+        shutil.rmtree(UPLOAD_SESSIONS_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.teacher = User.objects.create_user(username="teacher", password="pw123456")
+        studio = Studio.objects.create(owner=self.teacher, name="Studio", description="")
+        self.lesson = Lesson.objects.create(studio=studio, title="Big video")
+        self.client.force_authenticate(user=self.teacher)  # type: ignore
+
+    def start(self, **data):
+        response = self.client.post(
+            "/api/uploads/",
+            {
+                "lesson": self.lesson.id,
+                "field": "lesson_video",
+                "filename": "intro.mp4",
+                "size": len(self.payload),
+                **data,
+            },
+            format="json",
+        )
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return f"/api/uploads/{response.data['id']}/"  # type: ignore
+
+    def put(self, url, start, end):
+        return self.client.put(
+            url,
+            self.payload[start : end + 1],
+            content_type="application/octet-stream",
+            HTTP_CONTENT_RANGE=f"bytes {start}-{end}/{len(self.payload)}",
+        )
+
+    def test_chunks_are_assembled_and_attached_to_the_lesson(self):
+        # --- ARRANGE ---
+        url = self.start(sha256=hashlib.sha256(self.payload).hexdigest())
+
+        # --- ACT ---
+        self.assertEqual(self.put(url, 0, 7).data["received"], 8)  # type: ignore
+        # A retried or out-of-order range is refused with the offset to resume from.
+        response = self.put(url, 0, 7)
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertEqual(response.data["received"], 8)  # type: ignore
+        self.put(url, 8, 15)
+        response = self.client.post(url + "finalize/", format="json")
+
+        # --- ASSERT ---
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.lesson.refresh_from_db()
+        with self.lesson.lesson_video.open("rb") as video:
+            self.assertEqual(video.read(), self.payload)
+        # The partial file was moved into place, not copied.
+        self.assertFalse(os.path.exists(UploadSession.objects.get().temp_path))
+
+    def test_checksum_mismatch_is_rejected(self):
+        url = self.start()
+        self.put(url, 0, 7)
+        self.put(url, 8, 15)
+
+        response = self.client.post(
+            url + "finalize/", {"sha256": "0" * 64}, format="json"
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.lesson.refresh_from_db()
+        self.assertFalse(self.lesson.lesson_video)
+
+    def test_incomplete_or_oversized_uploads_are_rejected(self):
+        url = self.start()
+        self.put(url, 0, 7)
+        response = self.client.post(url + "finalize/", format="json")
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+
+        # Ranges larger than UPLOAD_CHUNK_MAX_SIZE (8 bytes here) are refused.
+        response = self.put(self.start(), 0, 8)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_only_the_course_owner_can_upload(self):
+        stranger = User.objects.create_user(username="stranger", password="pw123456")
+        self.client.force_authenticate(user=stranger)  # type: ignore
+
+        response = self.client.post(
+            "/api/uploads/",
+            {
+                "lesson": self.lesson.id,
+                "field": "lesson_file",
+                "filename": "notes.pdf",
+                "size": 10,
+            },
+            format="json",
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(UploadSession.objects.exists())
+
+    def test_a_session_being_written_is_locked(self):
+        # --- ARRANGE ---
+        url = self.start()
+        session = UploadSession.objects.get()
+
+        # --- ACT ---
+        # Another request is streaming a chunk into the partial file.
+        with open(session.temp_path, "r+b") as partial:
+            fcntl.flock(partial, fcntl.LOCK_EX)
+            response = self.put(url, 0, 7)
+
+        # --- ASSERT ---
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        session.refresh_from_db()
+        self.assertEqual(session.received, 0)
+        self.assertEqual(self.put(url, 0, 7).status_code, status.HTTP_200_OK)
@@ -0,0 +1,32 @@
+# backend/users/tokens.py
+"""
+simplejwt token classes that reject revoked tokens (see users/revocation.py).
+They are wired in through SIMPLE_JWT["AUTH_TOKEN_CLASSES"] and
+SIMPLE_JWT["TOKEN_REFRESH_SERIALIZER"] in settings.py.
+"""
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from . import revocation
+
+
+class RevocationCheckMixin:
+    def verify(self):
+        super().verify()
+        if revocation.is_revoked(self.payload.get(api_settings.JTI_CLAIM)):
+            raise TokenError(_("Token is revoked"))
+
+
+class RevocableAccessToken(RevocationCheckMixin, AccessToken):
+    pass
+
+
+class RevocableRefreshToken(RevocationCheckMixin, RefreshToken):
+    access_token_class = RevocableAccessToken
+
+
+class RevocableTokenRefreshSerializer(TokenRefreshSerializer):
+    token_class = RevocableRefreshToken
@@ -0,0 +1,233 @@
+# backend/users/uploads.py
+"""
+Resumable, chunked uploads of large lesson files and videos.
+
+A client creates an UploadSession, then PUTs consecutive byte ranges
+("Content-Range: bytes <start>-<end>/<size>"), each appended to a partial file on
+disk straight from the request stream. After a network blip it reads the session's
+`received` count and carries on from there. Once every byte has arrived, finalizing
+computes the SHA-256 (and checks it against the client's, when given) and moves the
+partial file into the Lesson's file field.
+
+Each request that writes to (or finalizes) a session holds an exclusive lock on
+its partial file, so the bytes stream in without a database transaction open.
+"""
+import fcntl
+import hashlib
+import os
+import re
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from django.utils import timezone
+
+from .models import UploadSession
+
+# How much of the request we read (and write) at a time.
+STREAM_BLOCK_SIZE = 1024 * 1024
+
+_CONTENT_RANGE_RE = re.compile(r"^bytes (\d+)-(\d+)/(\d+)$")
+
+
+class UploadError(Exception):
+    """A client error, reported with an HTTP status (400 unless said otherwise)."""
+
+    def __init__(self, message, status=400, **extra):
+        super().__init__(message)
+        self.status = status
+        self.extra = extra
+
+
+class AssembledFile(File):
+    """
+    The finished partial file. Exposing temporary_file_path() makes
+    FileSystemStorage move it into place instead of copying it.
+    """
+
+    sha256 = None
+
+    def temporary_file_path(self):
+        return self.name
+
+
+def parse_content_range(header):
+    """Returns (start, end, size) from a "bytes start-end/size" header."""
+    match = _CONTENT_RANGE_RE.match(header or "")
+    if not match:
+        raise UploadError(
+            "A 'Content-Range: bytes <start>-<end>/<size>' header is required."
+        )
+    start, end, size = map(int, match.groups())
+    if end < start:
+        raise UploadError("Invalid Content-Range.")
+    return start, end, size
+
+
+def _check_sha256(sha256):
+    if sha256 and not re.fullmatch(r"[0-9a-f]{64}", sha256):
+        raise UploadError("'sha256' must be a lowercase hex SHA-256 digest.")
+    return sha256
+
+
+def start_session(owner, lesson, field, filename, size, sha256=""):
+    """
+    Opens an upload of `size` bytes for `lesson.<field>`, with an empty partial file.
+    If the storage already holds a file with this `sha256`, the lesson points at it
+    right away and the session comes back "complete": there is nothing to send.
+    """
+    if size <= 0 or size > settings.UPLOAD_MAX_SIZE:
+        raise UploadError(
+            f"The file size must be between 1 and {settings.UPLOAD_MAX_SIZE} bytes."
+        )
+    _check_sha256(sha256)
+
+    storage = getattr(lesson, field).storage
+    blob = storage.stored_blob(sha256) if sha256 and hasattr(storage, "link") else None
+    if blob is not None and blob.size == size:
+        with transaction.atomic():
+            setattr(lesson, field, storage.link(blob))
+            lesson.save(update_fields=[field])
+            return UploadSession.objects.create(
+                owner=owner,
+                lesson=lesson,
+                field=field,
+                filename=os.path.basename(filename),
+                size=size,
+                sha256=sha256,
+                received=size,
+                status="complete",
+            )
+
+    session = UploadSession.objects.create(
+        owner=owner,
+        lesson=lesson,
+        field=field,
+        filename=os.path.basename(filename),
+        size=size,
+        sha256=sha256,
+    )
+    os.makedirs(settings.UPLOAD_SESSIONS_ROOT, exist_ok=True)
+    open(session.temp_path, "wb").close()
+    return session
+
+
+@contextmanager
+def _locked_partial(session):
+    """Opens the session's partial file, holding its exclusive lock."""
+    try:
+        partial = open(session.temp_path, "r+b")
+    except FileNotFoundError:
+        # finalize() removed it.
+        raise UploadError("This upload is already complete.", status=409) from None
+    with partial:
+        try:
+            fcntl.flock(partial, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError(
+                "Another request is writing to this upload.", status=409
+            ) from None
+        yield partial
+
+
+def write_chunk(session, stream, content_range):
+    """
+    Appends one byte range, read from `stream` block by block, to the partial file.
+    Ranges must arrive in order: a range that doesn't start at `received` gets a 409
+    telling the client where to resume.
+    """
+    start, end, size = parse_content_range(content_range)
+    length = end - start + 1
+    if size != session.size or end >= session.size:
+        raise UploadError("The range doesn't fit the size of this upload.")
+    if length > settings.UPLOAD_CHUNK_MAX_SIZE:
+        raise UploadError(
+            f"Chunks can't be larger than {settings.UPLOAD_CHUNK_MAX_SIZE} bytes."
+        )
+
+    # The file lock keeps two PUTs for the same range from interleaving, so the
+    # session needs no row lock (nor a transaction) while the bytes stream in.
+    with _locked_partial(session) as partial:
+        session = UploadSession.objects.get(pk=session.pk)
+        if session.status != "uploading":
+            raise UploadError("This upload is already complete.", status=409)
+        if start != session.received:
+            raise UploadError(
+                "This range doesn't start where the upload left off.",
+                status=409,
+                received=session.received,
+            )
+
+        written = 0
+        partial.seek(start)
+        while written < length:
+            block = stream.read(min(STREAM_BLOCK_SIZE, length - written))
+            if not block:
+                break
+            partial.write(block)
+            written += len(block)
+        if written != length or stream.read(1):
+            # Drop whatever we got, so the next attempt starts from a clean offset.
+            partial.truncate(start)
+            raise UploadError("The request body doesn't match the Content-Range.")
+        partial.flush()
+
+        session.received = end + 1
+        session.updated_at = timezone.now()
+        UploadSession.objects.filter(pk=session.pk, received=start).update(
+            received=session.received, updated_at=session.updated_at
+        )
+    return session
+
+
+def _check_complete(session):
+    if session.status != "uploading":
+        raise UploadError("This upload is already complete.", status=409)
+    if session.received != session.size:
+        raise UploadError(
+            "The upload is missing some bytes.", status=409, received=session.received
+        )
+
+
+def finalize(session, sha256=""):
+    """
+    Checks the assembled file and attaches it to the session's Lesson.
+    `sha256` (or the one given when the session was created) is optional but,
+    when present, the upload is rejected if the bytes don't match it.
+    Returns the updated Lesson.
+    """
+    _check_complete(session)
+    expected = _check_sha256(sha256) or session.sha256
+    # Holding the file lock, no chunk can land while we hash and attach the file.
+    with _locked_partial(session) as partial:
+        actual = hashlib.file_digest(partial, "sha256").hexdigest()
+        if expected and actual != expected:
+            raise UploadError("The checksum doesn't match the uploaded bytes.")
+
+        with transaction.atomic():
+            # Re-read under a row lock: a finalize that ran before we took the file
+            # lock may have attached it already.
+            session = UploadSession.objects.select_for_update().get(pk=session.pk)
+            _check_complete(session)
+            lesson = session.lesson
+            partial.seek(0)
+            assembled = AssembledFile(partial, name=session.temp_path)
+            # Saves the storage from hashing the file a second time.
+            assembled.sha256 = actual
+            getattr(lesson, session.field).save(session.filename, assembled, save=False)
+            lesson.save(update_fields=[session.field])
+            session.status = "complete"
+            session.sha256 = actual
+            session.save(update_fields=["status", "sha256", "updated_at"])
+    if os.path.exists(session.temp_path):
+        # The storage already had these bytes, so it didn't need our copy.
+        os.remove(session.temp_path)
+    return lesson
+
+
+def abort(session):
+    """Deletes a session and its partial file."""
+    if os.path.exists(session.temp_path):
+        os.remove(session.temp_path)
+    session.delete()
@@ -1,7 +1,7 @@
 # backend/users/urls.py
 from django.urls import path
 from .views import (
-    comment_create_view,
+    comment_list_create_view,
     comment_like_toggle_view,
     explore_view,
     logout_view,
@@ -25,6 +25,10 @@ from .views import (
     course_delete_view,
     course_detail_view,
     course_update_view,
+    upload_session_create_view,
+    upload_session_detail_view,
+    upload_session_finalize_view,
+    media_blob_check_view,
     public_studio_detail,
     subscribe_studio,
     unsubscribe_studio,
@@ -33,6 +37,9 @@ from .views import (
     comment_delete_view,
     meeting_create_view,
     get_my_invitations_view,
+    invitation_stream_ticket_view,
+    invitation_stream_view,
+    invitation_count_view,
     update_invitation_status_view,
     user_search_view,
     account_delete_view,
@@ -84,6 +91,16 @@ urlpatterns = [
         course_update_view,
         name="course-update",
     ),
+    # Resumable, chunked uploads of large course videos and files.
+    path("uploads/", upload_session_create_view, name="upload-create"),
+    path("uploads/<uuid:session_id>/", upload_session_detail_view, name="upload-detail"),
+    path(
+        "uploads/<uuid:session_id>/finalize/",
+        upload_session_finalize_view,
+        name="upload-finalize",
+    ),
+    # Tells whether a file with this SHA-256 is already stored (GET).
+    path("blobs/<str:sha256>/", media_blob_check_view, name="media-blob-check"),
     # Public Studio URLs
     path("studios/<int:id>/", public_studio_detail, name="public-studio-detail"),
     path("studios/<int:id>/subscribe/", subscribe_studio, name="subscribe-studio"),
@@ -101,8 +118,12 @@ urlpatterns = [
     path("posts/<int:pk>/", post_detail_view, name="post-detail"),
     # An endpoint to toggle a like on a post (POST)
     path("posts/<int:pk>/like/", post_like_toggle_view, name="post-like-toggle"),
-    # An endpoint to create a comment on a specific post (POST)
-    path("posts/<int:post_pk>/comments/", comment_create_view, name="comment-create"),
+    # An endpoint for a post's comments: a paginated thread (GET) or a new comment (POST)
+    path(
+        "posts/<int:post_pk>/comments/",
+        comment_list_create_view,
+        name="comment-list-create",
+    ),
     # An endpoint to toggle a like on a comment (POST)
     path(
         "comments/<int:pk>/like/", comment_like_toggle_view, name="comment-like-toggle"
@@ -114,6 +135,16 @@ urlpatterns = [
     path("meetings/create/", meeting_create_view, name="meeting-create"),
     # An endpoint to get all pending invitations for the logged-in user (GET)
     path("invitations/", get_my_invitations_view, name="my-invitations"),
+    # An endpoint for the number of unread invitations, with ETag support (GET)
+    path("invitations/count/", invitation_count_view, name="invitation-count"),
+    # A Server-Sent Events stream of the logged-in user's invitation events (GET)
+    path("invitations/stream/", invitation_stream_view, name="invitation-stream"),
+    # A single-use ticket that opens the stream above, passed as ?ticket= (POST)
+    path(
+        "invitations/stream/ticket/",
+        invitation_stream_ticket_view,
+        name="invitation-stream-ticket",
+    ),
     # An endpoint to update an invitation's status (accept/decline) (POST)
     path(
         "invitations/<int:pk>/update/",
@@ -1,14 +1,47 @@
 # backend/users/views.py
+import asyncio
+import io
 import json
+import time
 from tokenize import Comment
 import traceback
-from rest_framework.decorators import api_view, permission_classes, parser_classes
+from asgiref.sync import sync_to_async
+from rest_framework.decorators import (
+    api_view,
+    authentication_classes,
+    permission_classes,
+    parser_classes,
+)
+from rest_framework.exceptions import AuthenticationFailed
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.parsers import MultiPartParser, FormParser
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth.models import User, Group
-from django.db.models import Q  #  Q objects for complex searches
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Prefetch, Q  #  Q objects for complex searches
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.dateparse import parse_datetime
+from django.utils.http import parse_etags
+from django.views.decorators.http import require_GET
+from . import (
+    counters,
+    events,
+    invitations,
+    response_cache,
+    revocation,
+    search,
+    tasks,
+    uploads,
+)
+from .authentication import CachedJWTAuthentication, studio_id_of
+from .pagination import KeysetPagination
 from .models import (
     Invitation,
     Meeting,
@@ -16,8 +49,8 @@ from .models import (
     Studio,
     Lesson,
     Profile,
-    StudioRating,
     Comment,
+    UploadSession,
 )
 from .serializers import (
     CommentSerializer,
@@ -39,8 +72,10 @@ from .serializers import (
     TeacherCardSerializer,
     UserRegisterSerializer,
     CurrentUserSerializer,
+    PostCardSerializer,
     PostCreateSerializer,
     PostSerializer,
+    UploadSessionSerializer,
     UserSearchSerializer,
 )
 
@@ -64,38 +99,77 @@ def explore_view(request):
     # `tags=` a list of any tags the user wants to filter by
     tags = request.query_params.getlist("tags")  # Get a list of tags
 
+    # `tag_mode=` "all" (default) keeps results with every tag, "any" with at least one
+    match_all_tags = request.query_params.get("tag_mode", "all") != "any"
+
+    if search_type not in ("studio", "course", "teacher"):
+        return Response({"error": "Invalid Search Type"}, status=400)
+
+    # The first page without a search or filter is the same for everyone and read
+    # the most, so it comes from the shared cache (see response_cache.py).
+    if not query and not tags and not request.query_params.get("cursor"):
+        data = response_cache.get_or_build(
+            request,
+            "explore",
+            (search_type, request.query_params.get("limit", "")),
+            [("users.Studio",), ("users.Lesson",)],
+            lambda: _explore_page(
+                request, search_type, query, tags, match_all_tags
+            ).data,
+        )
+        return Response(data)
+    return _explore_page(request, search_type, query, tags, match_all_tags)
+
+
+def _explore_page(request, search_type, query, tags, match_all_tags):
+    """
+    Builds one page of explore results (see explore_view for the parameters).
+    """
     # Step 2: Decide Which Path to Take
-    # .distinct() : ensures we avoid duplicates
+    # Studios and courses go through the full-text search index (see search.py),
+    # which also gives us a relevance `rank` to sort by.
     if search_type == "studio":
-        queryset = Studio.objects.all()
+        queryset = Studio.objects.for_cards()
+        ordering = ("-created_at", "-id")
         if query:
-            queryset = queryset.filter(
-                Q(name__icontains=query) | Q(tags__name__icontains=query)
-            ).distinct()
-        serializer = StudioCardSerializer(
-            queryset, many=True, context={"request": request}
-        )
+            queryset = search.search(queryset, query)
+            ordering = ("-rank", "-id")
+        if tags:
+            queryset = search.filter_by_tags(queryset, tags, match_all_tags)
+        serializer_class = StudioCardSerializer
 
     elif search_type == "course":
-        queryset = Lesson.objects.all()
+        queryset = Lesson.objects.for_cards()
+        # Older lessons have no created_at, so we page by id (which follows creation order).
+        ordering = ("-id",)
         if query:
-            queryset = queryset.filter(
-                Q(title__icontains=query) | Q(tags__name__icontains=query)
-            ).distinct()
-        serializer = LessonCardSerializer(queryset, many=True)
-
-    elif search_type == "teacher":
-        queryset = User.objects.filter(
-            studio__isnull=False
-        ).distinct()  # Only get users who have a studio
+            queryset = search.search(queryset, query)
+            ordering = ("-rank", "-id")
+        if tags:
+            queryset = search.filter_by_tags(queryset, tags, match_all_tags)
+        serializer_class = LessonCardSerializer
+
+    else:
+        # Only get users who have a studio (a one-to-one join, so no duplicates).
+        queryset = User.objects.filter(studio__isnull=False).select_related(
+            "profile", "studio"
+        )
+        ordering = ("-date_joined", "-id")
         if query:
             queryset = queryset.filter(username__icontains=query)
-        serializer = TeacherCardSerializer(queryset, many=True)
+        serializer_class = TeacherCardSerializer
 
-    else:
-        return Response({"error": "Invalid Search Type"}, status=400)
+    # Step 3: Return one page of results (e.g. ?limit=20&cursor=<next>)
+    paginator = KeysetPagination(ordering)
+    page = paginator.paginate_queryset(queryset, request)
+    serializer = serializer_class(page, many=True, context={"request": request})
+    response = paginator.get_paginated_response(serializer.data)
 
-    return Response(serializer.data)
+    # Step 4: On the first page, add tag counts for the whole result set,
+    # so the frontend can show how many results each tag filter would give.
+    if search_type != "teacher" and not request.query_params.get("cursor"):
+        response.data["facets"] = search.tag_facets(queryset)  # type: ignore
+    return response
 
 
 # --- Authentication Views ---
@@ -122,13 +196,40 @@ def register_view(request):
 @permission_classes([IsAuthenticated])
 def logout_view(request):
     """
-    A placeholder endpoint for logging out.
-    With JWT, logout is handled on the frontend by deleting the token.
-    This endpoint is a good practice to have for future blacklist features.
+    Logs the user out by revoking their access token and, if it's sent as
+    `refresh`, their refresh token, so neither can be used again.
     """
+    error = _revoke_request_tokens(request)
+    if error:
+        return error
     return Response({"detail": "Successfully logged out."}, status=status.HTTP_200_OK)
 
 
+def _revoke_request_tokens(request):
+    """
+    Revokes the access token of the request and the refresh token in the body, if
+    any (see revocation.py). Returns an error Response for a bad refresh token.
+    """
+    tokens = [request.auth] if request.auth is not None else []
+    raw_refresh = request.data.get("refresh")
+    if raw_refresh:
+        try:
+            refresh = RefreshToken(raw_refresh)
+        except TokenError:
+            return Response(
+                {"error": "Invalid refresh token."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        # Users may only revoke their own tokens.
+        if str(refresh.get(jwt_settings.USER_ID_CLAIM)) != str(request.user.pk):
+            return Response(
+                {"error": "Invalid refresh token."}, status=status.HTTP_400_BAD_REQUEST
+            )
+        tokens.append(refresh)
+    if tokens:
+        revocation.revoke(*tokens)
+    return None
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def current_user_view(request):
@@ -198,7 +299,8 @@ def profile_update_view(request):
     This version now handles the 'degrees' field manually for maximum robustness.
     """
     try:
-        profile = request.user.profile
+        # A fresh user row, not the authentication snapshot, since we may save it.
+        profile = Profile.objects.select_related("user").get(user_id=request.user.pk)
 
         serializer = ProfileUpdateSerializer(
             instance=profile,
@@ -295,7 +397,7 @@ def studio_dashboard_view(request):
     try:
         # 2. We fetch the studio owned by the currently logged-in user.
         #    Using .get() will raise an error if it doesn't exist.
-        studio = Studio.objects.get(owner=user)
+        studio = Studio.objects.for_cards().get(owner=user)
     except Studio.DoesNotExist:
         # 3. This is a crucial security and error-handling step.
         return Response(
@@ -429,7 +531,7 @@ def my_courses_view(request):
         )
 
     # Fetch all lessons for that studio, ordering by the most recently created.
-    courses = studio.lessons.all().order_by("-created_at")  # type: ignore
+    courses = studio.lessons.for_cards().order_by("-created_at")  # type: ignore
 
     # We can reuse our existing LessonCardSerializer, as it has all the data we need for the cards.
     serializer = LessonCardSerializer(courses, many=True)
@@ -453,8 +555,8 @@ def studio_subscribers_view(request):
             {"error": "You do not have a studio."}, status=status.HTTP_403_FORBIDDEN
         )
 
-    # We get all subscribers for that studio.
-    subscribers = studio.subscribers.all()
+    # We get all subscribers for that studio (with the profiles we serialize).
+    subscribers = studio.subscribers.select_related("profile")
 
     # We check if the frontend sent a search query.
     # e.g., /api/studio/subscribers/?q=john
@@ -496,8 +598,9 @@ def block_subscriber_view(request, user_id):
             {"error": "Subscriber not found."}, status=status.HTTP_404_NOT_FOUND
         )
 
-    # This is the core logic: we remove the user from the many-to-many relationship.
-    studio.subscribers.remove(subscriber_to_block)
+    # This is the core logic: we remove the user from the many-to-many relationship
+    # (and from the studio's stored subscriber count).
+    counters.remove_subscriber(studio, subscriber_to_block)
 
     # We return a success response with no content, which is standard for DELETE operations.
     return Response(status=status.HTTP_204_NO_CONTENT)
@@ -566,18 +669,22 @@ def course_detail_view(request, lesson_id):
     """
     Fetches the full, detailed data for a single course.
     """
-    try:
+
+    def build():
         # We can add more complex permission checks here later for public viewing.
         # For now, we just fetch the lesson by its ID.
-        lesson = Lesson.objects.get(id=lesson_id)
-    except Lesson.DoesNotExist:
+        lesson = Lesson.objects.filter(id=lesson_id).first()
+        # We use our new detailed serializer to return all the data.
+        return LessonDetailSerializer(lesson).data if lesson else None
+
+    data = response_cache.get_or_build(
+        request, "course", (lesson_id,), [("users.Lesson", lesson_id)], build
+    )
+    if data is None:
         return Response(
             {"error": "Course not found."}, status=status.HTTP_404_NOT_FOUND
         )
-
-    # We use our new detailed serializer to return all the data.
-    serializer = LessonDetailSerializer(lesson)
-    return Response(serializer.data)
+    return Response(data)
 
 
 # ✅ --- NEW COURSE UPDATE VIEW ---
@@ -613,20 +720,142 @@ def course_update_view(request, lesson_id):
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+# --- Resumable Uploads ---
+# Large lesson videos and files are sent in chunks instead of one multipart request
+# (see uploads.py): create a session, PUT byte ranges, then finalize.
+
+
+def _upload_error_response(error):
+    return Response({"error": str(error), **error.extra}, status=error.status)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def upload_session_create_view(request):
+    """
+    Opens a resumable upload for one of the user's courses.
+    Expects 'lesson', 'field' ('lesson_video' or 'lesson_file'), 'filename', 'size'
+    and, optionally, the 'sha256' of the whole file.
+    """
+    serializer = UploadSessionSerializer(data=request.data)
+    if not serializer.is_valid():
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+    if serializer.validated_data["lesson"].studio.owner_id != request.user.id:
+        return Response(
+            {"error": "Course not found or you do not have permission to edit it."},
+            status=status.HTTP_403_FORBIDDEN,
+        )
+
+    try:
+        session = uploads.start_session(request.user, **serializer.validated_data)
+    except uploads.UploadError as error:
+        return _upload_error_response(error)
+    return Response(UploadSessionSerializer(session).data, status=status.HTTP_201_CREATED)
+
+
+@api_view(["GET", "PUT", "DELETE"])
+@permission_classes([IsAuthenticated])
+@parser_classes([])  # PUT bodies are raw bytes, which we read straight from the stream.
+def upload_session_detail_view(request, session_id):
+    """
+    GET: the session's progress, to know where to resume.
+    PUT: appends the byte range given by the Content-Range header.
+    DELETE: aborts the upload.
+    """
+    try:
+        session = UploadSession.objects.get(pk=session_id, owner=request.user)
+    except UploadSession.DoesNotExist:
+        return Response({"error": "Upload not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    if request.method == "DELETE":
+        uploads.abort(session)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+    if request.method == "PUT":
+        try:
+            session = uploads.write_chunk(
+                session,
+                request.stream or io.BytesIO(),
+                request.headers.get("Content-Range"),
+            )
+        except uploads.UploadError as error:
+            return _upload_error_response(error)
+
+    return Response(UploadSessionSerializer(session).data)
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def upload_session_finalize_view(request, session_id):
+    """
+    Verifies a fully received upload and attaches it to its course.
+    Accepts an optional 'sha256' to check the assembled file against.
+    """
+    try:
+        session = UploadSession.objects.select_related("lesson").get(
+            pk=session_id, owner=request.user
+        )
+    except UploadSession.DoesNotExist:
+        return Response({"error": "Upload not found."}, status=status.HTTP_404_NOT_FOUND)
+
+    try:
+        lesson = uploads.finalize(session, request.data.get("sha256", ""))
+    except uploads.UploadError as error:
+        return _upload_error_response(error)
+    return Response(LessonDetailSerializer(lesson).data)
+
+
+@api_view(["GET"])
+@permission_classes([IsAuthenticated])
+def media_blob_check_view(request, sha256):
+    """
+    Tells whether the server already stores a file with this SHA-256, so a client
+    can skip uploading bytes we have (an upload session opened with this checksum
+    completes right away).
+    """
+    sha256 = sha256.lower()
+    storage = default_storage
+    blob = storage.stored_blob(sha256) if hasattr(storage, "stored_blob") else None
+    if blob is None:
+        return Response(
+            {"sha256": sha256, "exists": False}, status=status.HTTP_404_NOT_FOUND
+        )
+    return Response({"sha256": sha256, "exists": True, "size": blob.size})
+
+
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def public_studio_detail(request, id):
     """
     Provides a public view of a single studio, identified by its ID.
     """
-    try:
-        studio = Studio.objects.get(pk=id)
-    except Studio.DoesNotExist:
+
+    def build():
+        # The lessons (and their tags) are prefetched for the nested lesson cards.
+        studio = (
+            Studio.objects.for_cards()
+            .prefetch_related(
+                Prefetch("lessons", queryset=Lesson.objects.prefetch_related("tags"))
+            )
+            .filter(pk=id)
+            .first()
+        )
+        if studio is None:
+            return None
+        # The cached copy is shared by everyone, so is_subscribed is filled in below.
+        return StudioSerializer(
+            studio, context={"request": request, "subscribed_studio_ids": set()}
+        ).data
+
+    data = response_cache.get_or_build(
+        request, "studio", (id,), [("users.Studio", id)], build
+    )
+    if data is None:
         return Response({"error": "Studio not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    # Pass the request context to the serializer so it knows who the user is
-    serializer = StudioSerializer(studio, context={"request": request})
-    return Response(serializer.data)
+    subscribed = _ids_related_to_user(request, Studio.subscribers, [Studio(pk=id)])
+    return Response({**data, "is_subscribed": id in subscribed})
 
 
 @api_view(["POST"])
@@ -640,8 +869,8 @@ def subscribe_studio(request, id):
     except Studio.DoesNotExist:
         return Response({"error": "Studio not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    # Use the .add() method for ManyToManyFields
-    studio.subscribers.add(request.user)
+    # Adds the subscription and bumps the studio's stored subscriber count.
+    counters.add_subscriber(studio, request.user)
     return Response({"detail": "Successfully subscribed."}, status=status.HTTP_200_OK)
 
 
@@ -656,8 +885,8 @@ def unsubscribe_studio(request, id):
     except Studio.DoesNotExist:
         return Response({"error": "Studio not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    # Use the .remove() method for ManyToManyFields
-    studio.subscribers.remove(request.user)
+    # Removes the subscription and decrements the studio's stored subscriber count.
+    counters.remove_subscriber(studio, request.user)
     return Response({"detail": "Successfully unsubscribed."}, status=status.HTTP_200_OK)
 
 
@@ -683,11 +912,9 @@ def rate_studio(request, id):
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    # Use update_or_create to handle both new and existing ratings.
-    # It finds a rating by the studio and user, and either updates it or creates a new one.
-    rating, created = StudioRating.objects.update_or_create(
-        studio=studio, user=request.user, defaults={"rating": int(rating_value)}
-    )
+    # Creates a new rating or updates the existing one (with update_or_create),
+    # and keeps the studio's stored rating sum, count and histogram in sync.
+    created = counters.rate(studio, request.user, int(rating_value))
 
     if created:
         return Response(
@@ -707,14 +934,23 @@ def rate_studio(request, id):
 def post_list_create_view(request):
     """
     A single view to handle both listing all posts and creating a new one.
-    - GET: Returns a list of all posts. (Publicly accessible)
+    - GET: Returns one page of the feed, newest first. (Publicly accessible)
     - POST: Creates a new post. (Requires authentication)
     """
     if request.method == "GET":
-        posts = Post.objects.all().order_by("-timestamp")  # Show newest first
-        # Use the detailed PostSerializer to include comments and likes
-        serializer = PostSerializer(posts, many=True, context={"request": request})
-        return Response(serializer.data)
+        # The feed shows post cards: counts and a short comment preview instead of
+        # every comment. The full thread comes from the post's comments endpoint.
+        paginator = KeysetPagination(("-timestamp", "-id"))
+        posts = paginator.paginate_queryset(Post.objects.for_feed(), request)
+        serializer = PostCardSerializer(
+            posts,
+            many=True,
+            context={
+                "request": request,
+                "liked_post_ids": _ids_related_to_user(request, Post.likes, posts),
+            },
+        )
+        return paginator.get_paginated_response(serializer.data)
 
     elif request.method == "POST":
         # Manually check for authentication for the POST method
@@ -733,32 +969,97 @@ def post_list_create_view(request):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+def _ids_related_to_user(request, relation, objects):
+    """
+    Returns the IDs of `objects` the requesting user is linked to through `relation`,
+    a many-to-many to User such as Post.likes, Comment.likes or Studio.subscribers.
+    It's one query for a whole page, and the serializers read the result from their
+    context (e.g. "liked_post_ids") instead of running one EXISTS per object.
+    """
+    if not request.user.is_authenticated or not objects:
+        return set()
+    column = relation.field.m2m_field_name() + "_id"
+    return set(
+        relation.through.objects.filter(
+            user=request.user, **{f"{column}__in": [obj.pk for obj in objects]}
+        ).values_list(column, flat=True)
+    )
+
+
+def _comment_thread_page(request, post):
+    """
+    Serializes one page of a post's comments, oldest first.
+    Returns the paginator (for the `next` cursor) and the serialized comments.
+    """
+    paginator = KeysetPagination(("timestamp", "id"))
+    comments = paginator.paginate_queryset(
+        Comment.objects.for_thread().filter(post=post), request
+    )
+
+    serializer = CommentSerializer(
+        comments,
+        many=True,
+        context={
+            "request": request,
+            "liked_comment_ids": _ids_related_to_user(request, Comment.likes, comments),
+        },
+    )
+    return paginator, serializer.data
+
+
 @api_view(["GET"])
 @permission_classes([AllowAny])
 def post_detail_view(request, pk):
     """
-    Fetches a single post by its ID, including all its comments.
+    Fetches a single post by its ID, with the first page of its comments.
+    The rest of the thread is loaded from the comments endpoint with `comments_next`.
     """
-    try:
-        post = Post.objects.get(pk=pk)
-    except Post.DoesNotExist:
+
+    def build():
+        post = Post.objects.with_details().filter(pk=pk).first()
+        if post is None:
+            return None
+        # The cached copy is shared by everyone, so is_liked is filled in below.
+        return PostSerializer(
+            post, context={"request": request, "liked_post_ids": set()}
+        ).data
+
+    data = response_cache.get_or_build(
+        request, "post", (pk,), [("users.Post", pk)], build
+    )
+    if data is None:
         return Response({"error": "Post not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    serializer = PostSerializer(post, context={"request": request})
-    return Response(serializer.data)
+    post = Post(pk=pk)
+    data = {**data, "is_liked": pk in _ids_related_to_user(request, Post.likes, [post])}
+    paginator, data["comments"] = _comment_thread_page(request, post)
+    data["comments_next"] = paginator.next_cursor  # type: ignore
+    return Response(data)
 
 
-@api_view(["POST"])
-@permission_classes([IsAuthenticated])
-def comment_create_view(request, post_pk):
+@api_view(["GET", "POST"])
+def comment_list_create_view(request, post_pk):
     """
-    Creates a new comment on a specific post.
+    A single view for the comments of a specific post.
+    - GET: Returns one page of the thread, oldest first. (Publicly accessible)
+    - POST: Creates a new comment. (Requires authentication)
     """
     try:
         post = Post.objects.get(pk=post_pk)
     except Post.DoesNotExist:
         return Response({"error": "Post not found"}, status=status.HTTP_404_NOT_FOUND)
 
+    if request.method == "GET":
+        paginator, comments = _comment_thread_page(request, post)
+        return paginator.get_paginated_response(comments)
+
+    # Manually check for authentication for the POST method
+    if not request.user.is_authenticated:
+        return Response(
+            {"error": "Authentication required to comment."},
+            status=status.HTTP_401_UNAUTHORIZED,
+        )
+
     # We only need the 'content' from the request for a new comment.
     content = request.data.get("content")
     if not content:
@@ -780,21 +1081,12 @@ def post_like_toggle_view(request, pk):
     Toggles a 'like' on a post for the current user.
     """
     try:
-        post = Post.objects.get(pk=pk)
+        post = Post.objects.only("id").get(pk=pk)
     except Post.DoesNotExist:
         return Response({"error": "Post not found"}, status=status.HTTP_404_NOT_FOUND)
 
-    user = request.user
-    if user in post.likes.all():
-        # If the user has already liked the post, remove the like.
-        post.likes.remove(user)
-        liked = False
-    else:
-        # If the user has not liked the post, add the like.
-        post.likes.add(user)
-        liked = True
-
-    return Response({"liked": liked, "likes_count": post.likes.count()})
+    liked, likes_count = counters.toggle_like(post, request.user)
+    return Response({"liked": liked, "likes_count": likes_count})
 
 
 @api_view(["GET"])
@@ -803,8 +1095,17 @@ def my_posts_view(request):
     """
     Fetches all posts created by the currently logged-in user.
     """
-    posts = Post.objects.filter(author=request.user).order_by("-timestamp")
-    serializer = PostSerializer(posts, many=True, context={"request": request})
+    posts = list(
+        Post.objects.for_feed().filter(author=request.user).order_by("-timestamp")
+    )
+    serializer = PostCardSerializer(
+        posts,
+        many=True,
+        context={
+            "request": request,
+            "liked_post_ids": _ids_related_to_user(request, Post.likes, posts),
+        },
+    )
     return Response(serializer.data)
 
 
@@ -815,21 +1116,14 @@ def comment_like_toggle_view(request, pk):
     Toggles a 'like' on a comment for the current user.
     """
     try:
-        comment = Comment.objects.get(pk=pk)  # type: ignore
+        comment = Comment.objects.only("id").get(pk=pk)  # type: ignore
     except Comment.DoesNotExist:  # type: ignore
         return Response(
             {"error": "Comment not found"}, status=status.HTTP_404_NOT_FOUND
         )
 
-    user = request.user
-    if user in comment.likes.all():
-        comment.likes.remove(user)
-        liked = False
-    else:
-        comment.likes.add(user)
-        liked = True
-
-    return Response({"liked": liked, "likes_count": comment.likes.count()})
+    liked, likes_count = counters.toggle_like(comment, request.user)
+    return Response({"liked": liked, "likes_count": likes_count})
 
 
 @api_view(["DELETE"])
@@ -885,28 +1179,49 @@ def meeting_create_view(request):
     """
     Creates a new meeting and sends invitations.
     Now allows ANY authenticated user to create a meeting.
+    With `invite_subscribers: true`, a teacher also invites every subscriber of
+    their studio; that fan-out runs in the background after the response.
     """
     title = request.data.get("title")
     description = request.data.get("description", "")
     invitee_usernames = request.data.get("invitees", [])
+    invite_subscribers = str(request.data.get("invite_subscribers", "")).lower() in (
+        "true",
+        "1",
+    )
 
-    if not title or not invitee_usernames:
+    if not title or not (invitee_usernames or invite_subscribers):
         return Response(
             {"error": "Title and at least one invitee are required."},
             status=status.HTTP_400_BAD_REQUEST,
         )
 
-    # Create the meeting instance
-    meeting = Meeting.objects.create(
-        host=request.user, title=title, description=description
-    )
+    studio_id = None
+    if invite_subscribers:
+        studio_id = studio_id_of(request.user)
+        if studio_id is None:
+            return Response(
+                {"error": "You need a studio to invite its subscribers."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
 
-    # Find the users to invite and create the invitation objects
-    invited_users = User.objects.filter(username__in=invitee_usernames)
-    for user in invited_users:
-        # We prevent users from inviting themselves.
-        if user != request.user:
-            Invitation.objects.create(meeting=meeting, invitee=user)
+    with transaction.atomic():
+        # Create the meeting instance
+        meeting = Meeting.objects.create(
+            host=request.user, title=title, description=description
+        )
+
+        # Resolve the invitees in one query and insert their invitations in bulk.
+        # invite_users() also skips the host, so users can't invite themselves.
+        invitee_ids = User.objects.filter(username__in=invitee_usernames).values_list(
+            "id", flat=True
+        )
+        invitations.invite_users(meeting, list(invitee_ids))
+
+        if invite_subscribers:
+            tasks.run_after_commit(
+                invitations.invite_studio_subscribers, meeting.pk, studio_id
+            )
 
     serializer = MeetingSerializer(meeting)
     return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -917,16 +1232,52 @@ def meeting_create_view(request):
 def get_my_invitations_view(request):
     """
     Fetches all unread, pending invitations for the logged-in user.
-    This is the endpoint our frontend will poll.
-    """
-    invitations = Invitation.objects.filter(
-        invitee=request.user, status="pending", is_read=False
-    ).order_by("-created_at")
+    Clients listen to `invitation_stream_view` and only poll this endpoint as a
+    fallback; `?since=<ISO datetime>` limits it to the invitations created after that.
+    """
+    # The meeting and its host (with their profile and studio) are serialized too.
+    invitations = (
+        Invitation.objects.filter(invitee=request.user, status="pending", is_read=False)
+        .select_related("meeting__host__profile", "meeting__host__studio")
+        .order_by("-created_at")
+    )
+
+    since = request.query_params.get("since")
+    if since:
+        try:
+            since = parse_datetime(since)
+        except ValueError:
+            since = None
+        if since is None:
+            return Response(
+                {"error": "'since' must be an ISO 8601 datetime."},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        invitations = invitations.filter(created_at__gt=since)
 
     serializer = InvitationSerializer(invitations, many=True)
     return Response(serializer.data)
 
 
+@api_view(["GET"])
+# The user ID in the token is all we need, so we skip the usual user lookup.
+@authentication_classes([JWTStatelessUserAuthentication])
+@permission_classes([IsAuthenticated])
+def invitation_count_view(request):
+    """
+    Returns the number of pending, unread invitations, for the notification badge.
+    The count comes from a per-user cache and doubles as the ETag, so a poll with
+    an up-to-date If-None-Match gets a 304 without touching the database.
+    """
+    count = invitations.unread_count(request.user.id)
+    etag = f'"invitations-{count}"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+    if etag in parse_etags(request.headers.get("If-None-Match", "")):
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response({"unread": count}, headers=headers)
+
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 def update_invitation_status_view(request, pk):
@@ -952,10 +1303,97 @@ def update_invitation_status_view(request, pk):
     invitation.is_read = True  # Mark the invitation as read
     invitation.save()
 
+    invitations.forget_unread_counts([invitation.invitee_id])
+
     serializer = InvitationSerializer(invitation)
+    # The invitee's other tabs drop the invitation, and the host sees the answer.
+    for user_id in {invitation.invitee_id, invitation.meeting.host_id}:
+        events.publish_on_commit(user_id, "invitation.updated", serializer.data)
     return Response(serializer.data)
 
 
+# --- Live Invitation Events ---
+
+# How often (in seconds) an idle stream sends a comment line to keep the connection open.
+STREAM_HEARTBEAT_SECONDS = 15
+
+
+@api_view(["POST"])
+@permission_classes([IsAuthenticated])
+def invitation_stream_ticket_view(request):
+    """
+    Issues a short-lived, single-use ticket for `invitation_stream_view`, which
+    EventSource passes as ?ticket= since it can't send an Authorization header.
+    """
+    ticket = events.issue_stream_ticket(request.user.pk, request.auth)
+    return Response(
+        {"ticket": ticket, "expires_in": events.STREAM_TICKET_TIMEOUT},
+        status=status.HTTP_201_CREATED,
+    )
+
+
+@require_GET
+async def invitation_stream_view(request):
+    """
+    Streams the logged-in user's invitation events as Server-Sent Events.
+
+    This is a plain async Django view (DRF views are sync), so it holds a connection
+    per user without holding a worker thread when served through config/asgi.py.
+    Browsers open it with a ?ticket= from `invitation_stream_ticket_view`. The stream
+    ends when the access token behind it expires or is revoked.
+    """
+    grant = await sync_to_async(_stream_grant)(request)
+    if grant is None:
+        return JsonResponse(
+            {"error": "Authentication credentials were not provided or are invalid."},
+            status=401,
+        )
+
+    return StreamingHttpResponse(
+        _invitation_events(grant),
+        content_type="text/event-stream",
+        # Proxies (e.g. nginx) must not buffer or cache the stream.
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+def _stream_grant(request):
+    """Authenticates a stream request with the ?ticket= parameter or the usual header."""
+    ticket = request.GET.get("ticket")
+    if ticket:
+        return events.redeem_stream_ticket(ticket)
+    try:
+        result = CachedJWTAuthentication().authenticate(request)
+    except (InvalidToken, AuthenticationFailed):
+        return None
+    return events.stream_grant(result[0].pk, result[1]) if result else None
+
+
+async def _invitation_events(grant):
+    subscription = events.get_broker().subscribe(grant["user_id"])
+    try:
+        # Tells EventSource to wait 5 seconds before reconnecting.
+        yield "retry: 5000\n\n"
+        while (remaining := grant["expires_at"] - time.time()) > 0:
+            try:
+                event = await asyncio.wait_for(
+                    subscription.get(), min(STREAM_HEARTBEAT_SECONDS, remaining)
+                )
+            except asyncio.TimeoutError:
+                if time.time() >= grant["expires_at"]:
+                    break
+                # Between events, so a logout closes the stream within a heartbeat.
+                if await sync_to_async(revocation.is_revoked)(grant["jti"]):
+                    break
+                yield ": keep-alive\n\n"
+                continue
+            data = json.dumps(event["data"], cls=DjangoJSONEncoder)
+            yield f"event: {event['type']}\ndata: {data}\n\n"
+    finally:
+        # Runs when the stream ends or the client disconnects.
+        subscription.close()
+
+
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
 def user_search_view(request):
@@ -969,9 +1407,11 @@ def user_search_view(request):
         return Response([], status=status.HTTP_200_OK)
 
     # Find users whose username contains the query, and exclude the user making the request.
-    users = User.objects.filter(username__icontains=query).exclude(pk=request.user.pk)[
-        :10
-    ]  # Limit to 10 results for performance
+    users = (
+        User.objects.filter(username__icontains=query)
+        .exclude(pk=request.user.pk)
+        .select_related("profile")[:10]
+    )  # Limit to 10 results for performance
 
     serializer = UserSearchSerializer(users, many=True)
     return Response(serializer.data)
@@ -984,7 +1424,15 @@ def account_delete_view(request):
     Permanently deletes the authenticated user's account.
     """
     user = request.user
-    user.delete()
+    with transaction.atomic():
+        # The tokens of a deleted account must not work anymore.
+        error = _revoke_request_tokens(request)
+        if error:
+            return error
+        # The user's subscriptions, ratings and likes are about to be cascade-deleted,
+        # so we take them out of the stored counters first.
+        counters.release_user(user)
+        user.delete()
     return Response(
         {"detail": "Account successfully deleted."}, status=status.HTTP_204_NO_CONTENT
     )
@@ -45,7 +45,7 @@ const App = () => {
   const isDashboardRoute = location.pathname.startsWith("/my-studio");
 
   const { invitations, updateInvitations } = useAuth(); // Get invitations from context
-  useInvitations(); // Activate our polling hook globally!
+  useInvitations(); // Activate our invitations hook globally!
 
   const handleAccept = async (invitationId, roomName) => {
     await meetingService.updateInvitationStatus(invitationId, "accepted");
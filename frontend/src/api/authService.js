@@ -58,9 +58,31 @@ const login = (username, password) => {
   });
 };
 
+/**
+ * Revokes the given tokens on the backend, so they can't be used again.
+ * This uses the standard axios: we're logging out, so there's nothing to refresh.
+ * Failures are ignored, since the tokens are removed from this browser anyway.
+ */
+const logout = async (tokens) => {
+  if (!tokens?.access) return;
+  try {
+    await axios.post(
+      `${API_BASE_URL}/auth/logout/`,
+      { refresh: tokens.refresh },
+      { headers: { Authorization: `Bearer ${tokens.access}` } }
+    );
+  } catch (error) {
+    // An expired access token can't be revoked (and doesn't need to be).
+  }
+};
+
 const deleteAccount = async () => {
   try {
-    await axiosInstance.delete("/users/delete/");
+    // Sending the refresh token lets the backend revoke it with the account.
+    const tokens = JSON.parse(localStorage.getItem("authTokens") || "null");
+    await axiosInstance.delete("/users/delete/", {
+      data: { refresh: tokens?.refresh },
+    });
     return { success: true };
   } catch (error) {
     return { success: false, error: "Failed to delete account." };
@@ -70,6 +92,7 @@ const deleteAccount = async () => {
 const authService = {
   register,
   login,
+  logout,
   deleteAccount,
 };
 
@@ -4,7 +4,7 @@ import { jwtDecode } from "jwt-decode";
 import dayjs from "dayjs";
 
 // Our backend API's base URL.
-const baseURL = "http://127.0.0.1:8000/api";
+export const baseURL = "http://127.0.0.1:8000/api";
 
 // This is our special, pre-configured axios instance for authenticated requests.
 const axiosInstance = axios.create({
@@ -1,6 +1,6 @@
 // frontend/src/api/meetingService.js
 
-import axiosInstance from "./axiosInstance";
+import axiosInstance, { baseURL } from "./axiosInstance";
 
 /**
  * Creates a new meeting and sends invitations.
@@ -22,11 +22,14 @@ const createMeeting = async (meetingData) => {
 
 /**
  * Fetches the current user's pending, unread invitations.
+ * @param {string|null} since - Optional ISO datetime; only newer invitations are returned.
  * @returns {Promise<object>} The API response.
  */
-const getMyInvitations = async () => {
+const getMyInvitations = async (since = null) => {
   try {
-    const response = await axiosInstance.get("/invitations/");
+    const response = await axiosInstance.get("/invitations/", {
+      params: since ? { since } : {},
+    });
     return { success: true, data: response.data };
   } catch (error) {
     return { success: false, error: "Failed to fetch invitations." };
@@ -68,9 +71,26 @@ const searchUsers = async (query) => {
   }
 };
 
+/**
+ * Opens the Server-Sent Events stream of the current user's invitation events.
+ * EventSource can't send headers, so we first get a single-use ticket through an
+ * authenticated request and pass that in the query string instead of the token.
+ * @returns {Promise<EventSource|null>} The open stream, or null if we got no ticket.
+ */
+const openInvitationStream = async () => {
+  try {
+    const response = await axiosInstance.post("/invitations/stream/ticket/");
+    const ticket = encodeURIComponent(response.data.ticket);
+    return new EventSource(`${baseURL}/invitations/stream/?ticket=${ticket}`);
+  } catch (error) {
+    return null;
+  }
+};
+
 const meetingService = {
   createMeeting,
   getMyInvitations,
+  openInvitationStream,
   updateInvitationStatus,
   searchUsers,
 };
@@ -3,12 +3,15 @@
 import axiosInstance from "./axiosInstance";
 
 /**
- * Fetches all posts from the backend.
- * @returns {Promise<object>} The API response.
+ * Fetches one page of the feed from the backend.
+ * @param {string|null} cursor - The `next` cursor of the previous page, if any.
+ * @returns {Promise<object>} The API response ({ results, next }).
  */
-const getPosts = async () => {
+const getPosts = async (cursor = null) => {
   try {
-    const response = await axiosInstance.get("/posts/");
+    const response = await axiosInstance.get("/posts/", {
+      params: cursor ? { cursor } : {},
+    });
     return { success: true, data: response.data };
   } catch (error) {
     console.error("Failed to fetch posts:", error.response);
@@ -55,6 +58,24 @@ const getPostDetail = async (postId) => {
   }
 };
 
+/**
+ * Fetches one page of a post's comment thread.
+ * @param {string|number} postId - The ID of the post.
+ * @param {string|null} cursor - The `next` cursor of the previous page, if any.
+ * @returns {Promise<object>} The API response ({ results, next }).
+ */
+const getPostComments = async (postId, cursor = null) => {
+  try {
+    const response = await axiosInstance.get(`/posts/${postId}/comments/`, {
+      params: cursor ? { cursor } : {},
+    });
+    return { success: true, data: response.data };
+  } catch (error) {
+    console.error("Failed to fetch comments:", error.response);
+    return { success: false, error: "Could not load comments." };
+  }
+};
+
 /**
  * Adds a new comment to a post.
  * @param {string|number} postId - The ID of the post to comment on.
@@ -132,6 +153,7 @@ const squadHubService = {
   getPosts,
   createPost,
   getPostDetail,
+  getPostComments,
   createComment,
   togglePostLike,
   toggleCommentLike,
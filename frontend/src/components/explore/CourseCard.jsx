@@ -12,8 +12,8 @@ const CourseCard = ({ course }) => {
   // NEW: State for the course viewer modal
   const [isViewerOpen, setIsViewerOpen] = useState(false);
 
-  const courseCoverImage = getCourseCoverUrl(course);
-  const teacherAvatarImage = getAvatarUrl(course.studio.owner);
+  const courseCoverImage = getCourseCoverUrl(course, 200);
+  const teacherAvatarImage = getAvatarUrl(course.studio.owner, 200);
 
   const creationDate = course.created_at
     ? new Date(course.created_at).toLocaleDateString("en-US", {
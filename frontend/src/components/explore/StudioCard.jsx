@@ -16,8 +16,8 @@ const StudioCard = ({ studio }) => {
   const [isTeacherHovered, setIsTeacherHovered] = useState(false);
   const [isDescExpanded, setIsDescExpanded] = useState(false);
 
-  const studioCoverImage = getStudioCoverUrl(studio);
-  const teacherAvatarUrl = getAvatarUrl(studio.owner);
+  const studioCoverImage = getStudioCoverUrl(studio, 200);
+  const teacherAvatarUrl = getAvatarUrl(studio.owner, 200);
 
   const creationDate = studio.created_at
     ? new Date(studio.created_at).toLocaleDateString("en-US", {
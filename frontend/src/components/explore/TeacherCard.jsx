@@ -25,7 +25,7 @@ const TeacherCard = ({ teacher }) => {
   const navigate = useNavigate();
   const { user } = useAuth();
 
-  const teacherAvatarUrl = getAvatarUrl(teacher);
+  const teacherAvatarUrl = getAvatarUrl(teacher, 200);
   const cvFileUrl = getCvFileUrl(teacher);
   const degrees = getDegrees(teacher);
   const contactEmail = getContactEmail(teacher);
@@ -23,7 +23,7 @@ dayjs.extend(relativeTime);
 
 const PostCard = ({ post, onPostDeleted }) => {
   const { user } = useContext(AuthContext);
-  const authorAvatar = getAvatarUrl(post.author);
+  const authorAvatar = getAvatarUrl(post.author, 200);
   // Check if the author is teacher
   const isTeacher = post.author.is_teacher;
   const [isConfirmingDelete, setIsConfirmingDelete] = useState(false);
@@ -115,7 +115,7 @@ const PostCard = ({ post, onPostDeleted }) => {
               <ThumbsUp size={16} /> {post.likes_count}
             </span>
             <span>
-              <MessageSquare size={16} /> {post.comments.length}
+              <MessageSquare size={16} /> {post.comments_count}
             </span>
           </div>
           <div className="footer-actions">
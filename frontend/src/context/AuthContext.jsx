@@ -83,6 +83,8 @@ export const AuthProvider = ({ children }) => {
    * Handles the user logout process.
    */
   const logout = useCallback(() => {
+    // Ask the backend to revoke the tokens, so a copy of them can't be reused.
+    authService.logout(JSON.parse(localStorage.getItem("authTokens") || "null"));
     // Clear our state and remove the tokens from storage.
     setTokens(null);
     setUser(null);
@@ -34,10 +34,11 @@ export const useExploreData = () => {
           fetchData("teacher"),
         ]);
 
+        // Each response is a page of results: { results, next }
         const initialData = {
-          studios: studioRes.data,
-          courses: courseRes.data,
-          teachers: teacherRes.data,
+          studios: studioRes.data.results,
+          courses: courseRes.data.results,
+          teachers: teacherRes.data.results,
         };
 
         setAllData(initialData);
@@ -4,33 +4,114 @@ import { useEffect } from "react";
 import { useAuth } from "../context/AuthContext";
 import meetingService from "../api/meetingService";
 
-const POLLING_INTERVAL = 5000; // Check every 5 seconds
+const POLLING_INTERVAL = 5000; // Check every 5 seconds while the stream is down
+const STREAM_RETRY_INTERVAL = 30000; // Try to reopen the stream every 30 seconds
 
 export const useInvitations = () => {
   const { user, updateInvitations } = useAuth();
 
   useEffect(() => {
-    let intervalId;
+    // We only listen for invitations if the user is logged in.
+    if (!user) return;
 
+    let stream = null;
+    let pollingId = null;
+    let retryId = null;
+    let cancelled = false;
+    let loaded = false;
+    // The created_at of the newest invitation the server sent us. Taken from the
+    // server rather than our own clock, which may be off.
+    let since = null;
+
+    // Adds new invitations to the list, skipping the ones we already have.
+    const addInvitations = (newInvitations) => {
+      updateInvitations((current) => [
+        ...newInvitations.filter((inv) => !current.some((c) => c.id === inv.id)),
+        ...current,
+      ]);
+    };
+
+    // The fallback: fetch the invitations created since our last check.
     const fetchInvitations = async () => {
-      // We only fetch if the user is logged in.
-      if (user) {
-        const response = await meetingService.getMyInvitations();
-        if (response.success) {
-          // When we get new invitations, we update the global context.
+      const response = await meetingService.getMyInvitations(since);
+      if (response.success) {
+        if (loaded) {
+          addInvitations(response.data);
+        } else {
           updateInvitations(response.data);
         }
+        loaded = true;
+        // Newest first, so the first one is our new watermark.
+        if (response.data.length > 0) {
+          since = response.data[0].created_at;
+        }
       }
     };
 
-    // Immediately check for invitations when the hook loads.
-    fetchInvitations();
+    const startPolling = () => {
+      if (!pollingId) {
+        pollingId = setInterval(fetchInvitations, POLLING_INTERVAL);
+      }
+      clearTimeout(retryId);
+      retryId = setTimeout(openStream, STREAM_RETRY_INTERVAL);
+    };
+
+    const stopPolling = () => {
+      clearInterval(pollingId);
+      clearTimeout(retryId);
+      pollingId = null;
+    };
+
+    // The stream pushes invitation events as soon as they happen.
+    const openStream = async () => {
+      stream = await meetingService.openInvitationStream();
+      if (cancelled) {
+        if (stream) stream.close();
+        return;
+      }
+      if (!stream) {
+        startPolling();
+        return;
+      }
+
+      stream.onopen = () => {
+        stopPolling();
+        // Catch up on anything we missed while the stream was down.
+        fetchInvitations();
+      };
+
+      stream.addEventListener("invitation.created", (event) => {
+        addInvitations([JSON.parse(event.data)]);
+      });
+
+      stream.addEventListener("invitation.updated", (event) => {
+        const invitation = JSON.parse(event.data);
+        if (invitation.status !== "pending") {
+          updateInvitations((current) =>
+            current.filter((inv) => inv.id !== invitation.id)
+          );
+        }
+      });
 
-    // Then, set up the timer to check repeatedly.
-    intervalId = setInterval(fetchInvitations, POLLING_INTERVAL);
+      stream.onerror = () => {
+        // The stream failed or ended (e.g. the access token expired): we close it
+        // and poll until we try again with a new ticket.
+        stream.close();
+        stream = null;
+        startPolling();
+      };
+    };
+
+    // Immediately check for invitations when the hook loads, then listen.
+    fetchInvitations();
+    openStream();
 
     // This is a crucial cleanup step. When the component unmounts,
-    // we clear the timer to prevent memory leaks.
-    return () => clearInterval(intervalId);
+    // we close the stream and clear the timers to prevent memory leaks.
+    return () => {
+      cancelled = true;
+      if (stream) stream.close();
+      stopPolling();
+    };
   }, [user, updateInvitations]); // This effect re-runs if the user logs in or out.
 };
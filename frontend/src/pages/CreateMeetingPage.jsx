@@ -3,6 +3,7 @@ import React, { useState, useEffect } from "react";
 import { useNavigate, useLocation } from "react-router-dom";
 import { X } from "lucide-react";
 import meetingService from "../api/meetingService";
+import { useAuth } from "../context/AuthContext";
 import UserSearch from "../components/meetings/UserSearch";
 import { getAvatarUrl } from "../utils/helpers";
 import "./CreateMeetingPage.css";
@@ -10,10 +11,13 @@ import "./CreateMeetingPage.css";
 const CreateMeetingPage = () => {
   const navigate = useNavigate();
   const location = useLocation();
+  const { isTeacher } = useAuth();
 
   const [title, setTitle] = useState("");
   const [description, setDescription] = useState("");
   const [invitees, setInvitees] = useState([]);
+  // Teachers can invite every subscriber of their studio in one go.
+  const [inviteSubscribers, setInviteSubscribers] = useState(false);
   const [error, setError] = useState("");
   const [isSubmitting, setIsSubmitting] = useState(false);
 
@@ -44,7 +48,7 @@ const CreateMeetingPage = () => {
     setError("");
 
     const invitee_usernames = invitees.map((user) => user.username);
-    if (invitee_usernames.length === 0) {
+    if (invitee_usernames.length === 0 && !inviteSubscribers) {
       setError("Please add at least one user to the invitation list.");
       setIsSubmitting(false);
       return;
@@ -54,6 +58,7 @@ const CreateMeetingPage = () => {
       title,
       description,
       invitees: invitee_usernames,
+      invite_subscribers: inviteSubscribers,
     });
 
     if (response.success) {
@@ -125,6 +130,19 @@ const CreateMeetingPage = () => {
             <UserSearch onAddInvitee={addInvitee} />
           </div>
 
+          {isTeacher() && (
+            <div className="form-group">
+              <label>
+                <input
+                  type="checkbox"
+                  checked={inviteSubscribers}
+                  onChange={(e) => setInviteSubscribers(e.target.checked)}
+                />{" "}
+                Invite all my studio subscribers
+              </label>
+            </div>
+          )}
+
           {error && <p className="error-message">{error}</p>}
 
           <button
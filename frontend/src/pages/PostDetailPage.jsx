@@ -112,6 +112,21 @@ const PostDetailPage = () => {
     await squadHubService.toggleCommentLike(commentId);
   };
 
+  // Loads the next page of the comment thread and appends it.
+  const handleLoadMoreComments = async () => {
+    const response = await squadHubService.getPostComments(
+      postId,
+      post.comments_next
+    );
+    if (response.success) {
+      setPost((prevPost) => ({
+        ...prevPost,
+        comments: [...prevPost.comments, ...response.data.results],
+        comments_next: response.data.next,
+      }));
+    }
+  };
+
   const handleDelete = async () => {
     if (!itemToDelete) return;
     const { type, id } = itemToDelete;
@@ -214,14 +229,14 @@ const PostDetailPage = () => {
               </button>
               <div className="comment-count">
                 <MessageSquare size={20} />
-                <span>{post.comments.length} Comments</span>
+                <span>{post.comments_count} Comments</span>
               </div>
             </footer>
           </article>
 
           <section className="post-comments-section">
             <h2>
-              <MessageSquare size={24} /> Comments ({post.comments.length})
+              <MessageSquare size={24} /> Comments ({post.comments_count})
             </h2>
 
             {user && (
@@ -293,6 +308,11 @@ const PostDetailPage = () => {
                 );
               })}
             </div>
+            {post.comments_next && (
+              <button className="btn" onClick={handleLoadMoreComments}>
+                Load more comments
+              </button>
+            )}
           </section>
         </div>
       </div>
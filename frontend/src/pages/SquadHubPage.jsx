@@ -20,7 +20,8 @@ const SquadHubPage = () => {
       setIsLoading(true);
       const response = await squadHubService.getPosts();
       if (response.success) {
-        setPosts(response.data);
+        // The feed is paginated: { results: [...], next: <cursor or null> }
+        setPosts(response.data.results);
       } else {
         setError(response.error);
       }
@@ -18,13 +18,34 @@ const isAbsoluteUrl = (url) => {
   return url.startsWith("http://") || url.startsWith("https://");
 };
 
+/**
+ * Picks the smallest resized variant of an image that is at least `width` pixels
+ * wide, from a variants map like {"200": {"webp": url, "jpeg": url}}.
+ * @param {object} variants - The `*_variants` map sent by the backend.
+ * @param {number} width - The width the image is displayed at.
+ * @returns {string|null} The variant URL (WebP when available), or null.
+ */
+const pickVariantUrl = (variants, width) => {
+  if (!variants || !width) return null;
+  const match = Object.keys(variants)
+    .map(Number)
+    .sort((a, b) => a - b)
+    .find((size) => size >= width);
+  if (!match) return null;
+  const formats = variants[match];
+  return formats.webp || formats.jpeg || null;
+};
+
 /**
  * Safely gets the correct avatar URL for a user.
  * @param {object} user - The user object from our AuthContext.
+ * @param {number} [width] - Display width, to use a resized variant when one exists.
  * @returns {string} The full URL for the avatar image.
  */
-export const getAvatarUrl = (user) => {
-  const pictureUrl = user?.profile?.profile_picture;
+export const getAvatarUrl = (user, width) => {
+  const pictureUrl =
+    pickVariantUrl(user?.profile?.profile_picture_variants, width) ||
+    user?.profile?.profile_picture;
   if (pictureUrl) {
     // If the URL is already absolute, return it. Otherwise, build it.
     return isAbsoluteUrl(pictureUrl)
@@ -67,10 +88,12 @@ export const getContactEmail = (user) => {
 /**
  * Safely gets the full URL for a course's cover image.
  * @param {object} lesson - The lesson object.
+ * @param {number} [width] - Display width, to use a resized variant when one exists.
  * @returns {string} The full URL for the course cover image.
  */
-export const getCourseCoverUrl = (lesson) => {
-  const coverUrl = lesson?.cover_image;
+export const getCourseCoverUrl = (lesson, width) => {
+  const coverUrl =
+    pickVariantUrl(lesson?.cover_image_variants, width) || lesson?.cover_image;
   if (coverUrl) {
     return isAbsoluteUrl(coverUrl) ? coverUrl : `${API_BASE_URL}${coverUrl}`;
   }
@@ -80,10 +103,12 @@ export const getCourseCoverUrl = (lesson) => {
 /**
  * Safely gets the full URL for a studio's cover image.
  * @param {object} studio - The studio object.
+ * @param {number} [width] - Display width, to use a resized variant when one exists.
  * @returns {string} The full URL for the studio cover image.
  */
-export const getStudioCoverUrl = (studio) => {
-  const coverUrl = studio?.cover_image;
+export const getStudioCoverUrl = (studio, width) => {
+  const coverUrl =
+    pickVariantUrl(studio?.cover_image_variants, width) || studio?.cover_image;
   if (coverUrl) {
     return isAbsoluteUrl(coverUrl) ? coverUrl : `${API_BASE_URL}${coverUrl}`;
   }